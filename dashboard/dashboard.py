@@ -1,37 +1,171 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from src.analisar_dados_banco import inicializar_dados, carregar_tabela
+from src.analisar_dados_banco import carregar_tabela
+from src.cache_compartilhado import abrir_cache, chave_cache, obter_ou_calcular
+from src.carga_dashboard import (
+    TABELAS_ANALISES,
+    TABELAS_DASHBOARD,
+)
+from src.snapshot_dados import (
+    ler_figura_snapshot,
+    ler_tabela_snapshot,
+    manifesto_snapshot,
+    para_pandas,
+    versao_snapshot,
+    versoes_tabelas,
+)
+from src.figuras_dashboard import (
+    FIGURAS_ESTATICAS,
+    desenhar_figura,
+    figura_de_especificacao,
+    plot_bar,
+)
+from src.historico_combates import TAMANHO_PAGINA, pagina_historico
+from src.indice_pokemon import IndiceConfrontos, construir_indice_pokemon
+from src.cubo_analitico import DIMENSOES_CUBO, construir_cubo, consultar_cubo
+from src.preditor_confrontos import modelo_de_tabela, prever_todos_pares
+from src.similaridade import comparar_taxas, construir_indice, vizinhos_mais_proximos
+from src.simulador_torneio import matriz_probabilidades, ordem_chave, simular_torneio
 
 st.set_page_config(page_title="Pokémon Analyst Dashboard", layout="wide")
 st.title("Pokémon Analyst Dashboard ⚡")
 
 
 # ------------------ Funções utilitárias ------------------ #
-def clean_df(df):
-    """Remove ID e reseta o índice para evitar colunas indesejadas."""
-    return df.drop(columns=["ID"], errors="ignore").reset_index(drop=True)
-
-
-def plot_bar(df, x, y, title, color_scale="Viridis"):
-    df_plot = clean_df(df)
-    fig = px.bar(
-        df_plot,
-        x=x,
-        y=y,
-        orientation="h",
-        text=x,
-        color=x,
-        color_continuous_scale=color_scale,
-        title=title,
+def mostrar_figura(fig, key):
+    st.plotly_chart(
+        fig, use_container_width=True, config={"displayModeBar": False}, key=key
     )
-    fig.update_layout(yaxis=dict(autorange="reversed"))
-    return fig
 
 
 # ------------------ Cache otimizado ------------------ #
-@st.cache_data(show_spinner=True)
-def carregar_analises_principais():
+# Os DataFrames carregados ficam em st.cache_resource: todas as sessões usam
+# os mesmos objetos (sem cópia por sessão, ao contrário de st.cache_data) e,
+# vindos do snapshot, as colunas apontam para os arquivos Arrow mapeados em
+# memória. Por isso são somente leitura: filtros e colunas novas devem ser
+# feitos em cópias/recortes, nunca no lugar.
+#
+# Cada tabela é carregada só quando a primeira aba que a usa é aberta: a
+# abertura do dashboard depende apenas das tabelas analíticas pequenas. Os
+# combates individuais não são carregados: duelos vêm de confrontos_diretos
+# e o histórico é paginado no banco.
+#
+# As chaves de cache são as versões (impressões) das tabelas lidas, vindas
+# do manifesto do snapshot: quando o pipeline publica uma nova execução, só
+# os datasets e cálculos que dependem de tabelas alteradas são refeitos, e
+# max_entries libera as versões antigas.
+#
+# Com várias réplicas, CACHE_COMPARTILHADO_URL liga um cache externo (disco
+# compartilhado ou Redis) para as tabelas lidas do banco e os cálculos mais
+# caros: a primeira réplica calcula e grava em Arrow, as demais só leem.
+
+# Sem snapshot, a versão de cada tabela é a impressão registrada pelo DAG no
+# banco ("banco:<impressão>"), consultada no máximo a cada VERSOES_BANCO_TTL s
+VERSAO_BANCO = "banco"
+VERSOES_BANCO_TTL = int(os.getenv("VERSOES_BANCO_TTL", "60"))
+
+# Simulações de torneio por requisição: processos do pool (cada sessão pode
+# disparar uma) e chaves diferentes mantidas em cache
+DASHBOARD_TORNEIO_WORKERS = int(os.getenv("DASHBOARD_TORNEIO_WORKERS", "1"))
+TORNEIOS_EM_CACHE = 32
+
+TABELAS_PREVISOES = ("modelo_confrontos", "atributos_pokemon")
+TABELAS_TORNEIO = TABELAS_PREVISOES + ("confrontos_diretos", "estatisticas_pokemon")
+TABELAS_INDICE = ("atributos_pokemon", "estatisticas_pokemon", "intervalos_taxa_vitoria")
+TABELAS_CUBO = ("estatisticas_pokemon", "atributos_pokemon")
+
+
+def versoes_de(nomes, versoes=None) -> tuple:
+    """
+    Chave de cache de um cálculo: pares (tabela, versão) das tabelas que ele
+    lê, tirados de 'versoes' (por padrão, do manifesto atual).
+    """
+    versoes = dict(versoes if versoes is not None else versoes_dados)
+    return tuple((nome, versoes.get(nome)) for nome in nomes)
+
+
+def ler(versoes, nome):
+    """Tabela 'nome' na versão indicada em 'versoes' (dict ou pares)."""
+    return carregar_dataset(nome, dict(versoes).get(nome))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_manifesto(versao):
+    """Manifesto de uma execução publicada (imutável: lido uma vez por versão)."""
+    return manifesto_snapshot(versao=versao)
+
+
+@st.cache_data(ttl=VERSOES_BANCO_TTL, show_spinner=False)
+def get_versoes_banco():
+    """Versão de cada tabela do dashboard no banco (impressões do DAG)."""
+    # Import local: estagios_analise importa o DAG inteiro de análises
+    from src.estagios_analise import carregar_registro
+
+    registro = carregar_registro()
+    return {
+        nome: f"{VERSAO_BANCO}:{registro.get(nome, {}).get('impressao')}"
+        for nome in TABELAS_DASHBOARD
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_cache_compartilhado():
+    """Backend do cache compartilhado entre réplicas (None se desativado)."""
+    return abrir_cache()
+
+
+def carregar_tabela_banco(nome, versao_tabela):
+    """
+    Sem snapshot publicado: a tabela lida do banco, sozinha e somente
+    leitura. Com o cache compartilhado configurado, só uma réplica consulta
+    o banco por versão.
+    """
+    cache = get_cache_compartilhado()
+    if cache is None:
+        return carregar_tabela(nome)
+    return obter_ou_calcular(
+        cache, chave_cache("tabela", nome, versao_tabela), lambda: carregar_tabela(nome)
+    )
+
+
+@st.cache_resource(show_spinner=True, max_entries=2 * len(TABELAS_DASHBOARD))
+def carregar_dataset(nome, versao_tabela):
+    """
+    Uma tabela do dashboard numa versão, lida do snapshot publicado pelo
+    pipeline (arquivo local, por memory-map). Sem snapshot, vem do banco.
+    """
+    if versao_tabela is not None and versao_tabela.startswith(f"{VERSAO_BANCO}:"):
+        return carregar_tabela_banco(nome, versao_tabela)
+    tabela = ler_tabela_snapshot(nome, versao_tabela)
+    return para_pandas(tabela) if tabela is not None else None
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(FIGURAS_ESTATICAS))
+def get_figura(nome, versao_figura, versao_tabela):
+    """
+    Figura estática (Top10, radar, correlação, distribuição, tipos) de uma
+    versão dos dados. Vem pronta do snapshot (JSON gerado pelo pipeline) ou,
+    sem ela, é montada uma vez a partir da tabela. Cada rerun reaproveita o
+    mesmo objeto, sem passar pelo plotly.express.
+    """
+    especificacao = ler_figura_snapshot(nome, versao_figura)
+    if especificacao is not None:
+        return figura_de_especificacao(especificacao)
+    tabela, _ = FIGURAS_ESTATICAS[nome]
+    return desenhar_figura(nome, carregar_dataset(tabela, versao_tabela))
+
+
+def figura(nome):
+    """Figura estática 'nome' na versão atual dos dados (None sem dados)."""
+    tabela, _ = FIGURAS_ESTATICAS[nome]
+    return get_figura(nome, versoes_figuras.get(nome), versoes_dados.get(tabela))
+
+
+@st.cache_resource(show_spinner=True, max_entries=2)
+def carregar_analises_principais(versoes):
     """
     Carrega todos os datasets principais e já remove coluna ID desnecessária.
     """
@@ -45,12 +179,14 @@ def carregar_analises_principais():
         df_top10_attr,
         comparativo,
         df_attr_geral,
-    ) = inicializar_dados()
+    ) = (ler(versoes, nome) for nome in TABELAS_ANALISES)
 
-    # Remover coluna ID das análises
-    for df in [correlacoes, comparativo, df_attr_geral]:
-        if "ID" in df.columns:
-            df.drop(columns=["ID"], inplace=True)
+    # Remover coluna ID das análises (sem alterar as tabelas carregadas, que
+    # são compartilhadas entre as sessões)
+    correlacoes, comparativo, df_attr_geral = (
+        df.drop(columns=["ID"], errors="ignore")
+        for df in [correlacoes, comparativo, df_attr_geral]
+    )
 
     correlacoes = correlacoes[correlacoes["Atributo"] != "ID"]
     comparativo = comparativo[comparativo["Atributo"] != "ID"]
@@ -68,39 +204,113 @@ def carregar_analises_principais():
     )
 
 
-@st.cache_data(show_spinner=True)
-def carregar_combate_estatisticas():
+def carregar_estatisticas(versoes):
+    """Lutas, vitórias, derrotas e taxa de vitória por Pokémon."""
+    return ler(versoes, "estatisticas_pokemon")
+
+
+def carregar_intervalos(versoes):
+    """Intervalos de confiança da taxa de vitória (Wilson e bootstrap)."""
+    return ler(versoes, "intervalos_taxa_vitoria")
+
+
+def carregar_confrontos(versoes):
+    """Confrontos diretos agregados por par de Pokémon."""
+    return ler(versoes, "confrontos_diretos")
+
+
+@st.cache_resource(show_spinner=True, max_entries=2)
+def get_indice_confrontos(versoes):
+    """Confrontos diretos indexados pelo par de Pokémon (busca por duelo)."""
+    return IndiceConfrontos(carregar_confrontos(versoes))
+
+
+@st.cache_resource(show_spinner=True, max_entries=2)
+def get_matriz_previsoes(versoes):
     """
-    Carrega combates e estatísticas com cache para acelerar filtros futuros.
+    Probabilidade prevista de vitória para todos os pares (Nome x Nome),
+    calculada uma vez a partir dos pesos salvos em 'modelo_confrontos'.
     """
-    df_combate = carregar_tabela("combates_com_nomes")
-    df_estatisticas = carregar_tabela("estatisticas_pokemon")
-    return df_combate, df_estatisticas
 
+    def calcular():
+        df_modelo = ler(versoes, "modelo_confrontos")
+        df_attr = ler(versoes, "atributos_pokemon")
+        if df_modelo is None or df_attr is None or df_modelo.empty:
+            return None
+        return prever_todos_pares(modelo_de_tabela(df_modelo), df_attr)
+
+    return obter_ou_calcular(
+        get_cache_compartilhado(), chave_cache("previsoes", versoes), calcular
+    )
+
+
+@st.cache_data(show_spinner="Simulando torneio...", max_entries=TORNEIOS_EM_CACHE)
+def get_torneio(versoes, participantes, n_simulacoes):
+    """Resultado da simulação de Monte Carlo para uma chave (tupla de nomes)."""
+
+    def calcular():
+        P = matriz_probabilidades(
+            participantes,
+            carregar_confrontos(versoes),
+            get_matriz_previsoes(versoes_de(TABELAS_PREVISOES, versoes)),
+            carregar_estatisticas(versoes),
+        )
+        return simular_torneio(
+            participantes, P, n_simulacoes=n_simulacoes, workers=DASHBOARD_TORNEIO_WORKERS
+        )
+
+    return obter_ou_calcular(
+        get_cache_compartilhado(),
+        chave_cache("torneio", versoes, participantes, n_simulacoes),
+        calcular,
+    )
+
+
+@st.cache_resource(show_spinner=True, max_entries=2)
+def get_indice_pokemon(versoes):
+    """Consultas por nome e por tipo (atributos, estatísticas, médias gerais)."""
+    return construir_indice_pokemon(
+        ler(versoes, "atributos_pokemon"),
+        carregar_estatisticas(versoes),
+        carregar_intervalos(versoes),
+    )
 
-@st.cache_data(show_spinner=True)
-def get_tipos(df_attr_geral):
-    return sorted(df_attr_geral["Types"].dropna().unique())
 
+# Argumentos com "_" não são hasheados pelo Streamlit: a chave do cache é só
+# a versão dos dados, sem percorrer os DataFrames a cada interação
 
-@st.cache_data(show_spinner=True)
-def get_pokemon_by_tipo(df_attr_geral, tipo):
-    df_tipo = df_attr_geral[df_attr_geral["Types"] == tipo].copy()
-    return clean_df(df_tipo)
+@st.cache_resource(show_spinner=True, max_entries=2)
+def get_cubo(versoes, _df_estatisticas, _df_attr_geral):
+    """Cubo analítico em memória, compartilhado entre as interações."""
+    return construir_cubo(_df_estatisticas, _df_attr_geral)
 
 
-@st.cache_data(show_spinner=True)
-def get_pokemon_list(df_attr_geral):
-    return sorted(df_attr_geral["Nome"].unique())
+# Opções do seletor "Peso do tipo": um índice por peso, para até duas versões
+PESOS_TIPO = [0.0, 0.5, 1.0, 2.0]
 
 
-@st.cache_data(show_spinner=True)
-def get_pokemon_attributes(df_attr_geral, pokemon_name):
-    df_p = df_attr_geral[df_attr_geral["Nome"] == pokemon_name].copy()
-    return clean_df(df_p)
+@st.cache_resource(show_spinner=True, max_entries=2 * len(PESOS_TIPO))
+def get_indice_similaridade(versoes, peso_tipo):
+    """Índice de vizinhos mais próximos, construído uma vez por peso de tipo."""
+    df_attr = ler(versoes, "atributos_pokemon")
+    if df_attr is None or df_attr.empty:
+        return None
+    return construir_indice(df_attr, peso_tipo=peso_tipo)
 
 
 # ------------------ Carregando dados ------------------ #
+# Consulta barata a cada interação: lê só o arquivo ATUAL do snapshot (o
+# manifesto de cada versão fica em cache). Uma nova execução do pipeline
+# aparece sem reiniciar o dashboard.
+versao_dados = versao_snapshot()
+manifesto = get_manifesto(versao_dados) if versao_dados else None
+if manifesto is not None:
+    versoes_dados = versoes_tabelas(manifesto)
+    versoes_figuras = manifesto.get("figuras", {})
+else:
+    versoes_dados = get_versoes_banco()
+    versoes_figuras = {}
+
 (
     top10_vitorias,
     top10_derrotas,
@@ -111,163 +321,94 @@ def get_pokemon_attributes(df_attr_geral, pokemon_name):
     df_top10_attr,
     comparativo,
     df_attr_geral,
-) = carregar_analises_principais()
-
-df_combate, df_estatisticas = carregar_combate_estatisticas()
-
-
-# ------------------ Layout em Tabs ------------------ #
-tabs = st.tabs(
-    [
-        "Top10",
-        "Atributos & Radar",
-        "Correlação & Distribuição",
-        "Ranking de Tipos",
-        "Filtro por Tipo",
-        "Comparação de Pokémon",
-        "📖 Histórico de Batalhas",
-    ]
+) = carregar_analises_principais(versoes_de(TABELAS_ANALISES))
+
+if manifesto is not None:
+    st.caption(f"Dados da execução {manifesto['versao']} ({manifesto['criado_em'][:16]})")
+
+
+# ------------------ Layout em Abas ------------------ #
+# Navegação por rádio horizontal em vez de st.tabs: st.tabs executa o código
+# de todas as abas a cada interação, enquanto aqui só a aba aberta roda (e
+# carrega os dados de que precisa)
+ABAS = [
+    "Top10",
+    "Atributos & Radar",
+    "Correlação & Distribuição",
+    "Ranking de Tipos",
+    "Filtro por Tipo",
+    "Comparação de Pokémon",
+    "📖 Histórico de Batalhas",
+    "🧊 Cubo Analítico",
+    "🏆 Torneio",
+    "🔎 Pokémon Semelhantes",
+]
+aba = st.radio(
+    "Navegação", ABAS, horizontal=True, key="aba", label_visibility="collapsed"
 )
 
-# ------------------ Tab 1: Top10 ------------------ #
-with tabs[0]:
+# ------------------ Aba 1: Top10 ------------------ #
+# As abas 1 a 4 só exibem figuras estáticas, prontas por versão dos dados
+if aba == ABAS[0]:
     st.subheader("🏆 Top 10 Vitórias e Derrotas")
     col1, col2 = st.columns(2)
-    if top10_vitorias is not None and not top10_vitorias.empty:
+    fig_vitorias, fig_derrotas = figura("top10_vitorias"), figura("top10_derrotas")
+    if fig_vitorias is not None:
         with col1:
-            st.plotly_chart(
-                plot_bar(top10_vitorias, "Vitorias", "Pokemon", "Top 10 Vitórias"),
-                use_container_width=True,
-                config={"displayModeBar": False},
-                key="top10_vitorias_plot",
-            )
-    if top10_derrotas is not None and not top10_derrotas.empty:
+            mostrar_figura(fig_vitorias, key="top10_vitorias_plot")
+    if fig_derrotas is not None:
         with col2:
-            st.plotly_chart(
-                plot_bar(
-                    top10_derrotas,
-                    "Derrotas",
-                    "Pokemon",
-                    "Top 10 Derrotas",
-                    color_scale="Reds",
-                ),
-                use_container_width=True,
-                config={"displayModeBar": False},
-                key="top10_derrotas_plot",
-            )
-    if top10_taxa is not None and not top10_taxa.empty:
+            mostrar_figura(fig_derrotas, key="top10_derrotas_plot")
+    fig_taxa = figura("top10_taxa")
+    if fig_taxa is not None:
         st.subheader("🔥 Top 10 por Taxa de Vitória (%)")
-        st.plotly_chart(
-            plot_bar(
-                top10_taxa,
-                "Taxa_Vitoria(%)",
-                "Pokemon",
-                "Top 10 Taxa de Vitória (%)",
-                color_scale="Blues",
-            ),
-            use_container_width=True,
-            config={"displayModeBar": False},
-            key="top10_taxa_plot",
-        )
+        mostrar_figura(fig_taxa, key="top10_taxa_plot")
 
-# ------------------ Tab 2: Atributos & Radar ------------------ #
-with tabs[1]:
+    fig_ic = figura("top10_intervalos")
+    if fig_ic is not None:
+        st.subheader("📏 Top 10 pelo Limite Inferior do IC 95% (Wilson)")
+        mostrar_figura(fig_ic, key="top10_ic_plot")
+
+# ------------------ Aba 2: Atributos & Radar ------------------ #
+if aba == ABAS[1]:
     st.subheader("📊 Comparativo de Atributos Top10 vs Média Geral")
-    if comparativo is not None and not comparativo.empty:
-        df_comp = clean_df(comparativo)
-        fig_radar = px.line_polar(
-            df_comp,
-            r="Média_Top10",
-            theta="Atributo",
-            line_close=True,
-            title="Média Top10 vs Geral",
-        )
-        fig_radar.add_scatterpolar(
-            r=df_comp["Média_Geral"],
-            theta=df_comp["Atributo"],
-            line=dict(color="red", dash="dash"),
-            name="Média Geral",
-        )
-        st.plotly_chart(
-            fig_radar,
-            use_container_width=True,
-            config={"displayModeBar": False},
-            key="radar_comparativo_top10",
-        )
+    fig_radar = figura("radar_top10")
+    if fig_radar is not None:
+        mostrar_figura(fig_radar, key="radar_comparativo_top10")
 
-# ------------------ Tab 3: Correlação & Distribuição ------------------ #
-with tabs[2]:
+# ------------------ Aba 3: Correlação & Distribuição ------------------ #
+if aba == ABAS[2]:
     st.subheader("📈 Correlação de Atributos x Vitórias")
-    if correlacoes is not None and not correlacoes.empty:
-        df_corr = clean_df(correlacoes)
-        fig_corr = px.bar(
-            df_corr,
-            x="Correlação_com_Vitórias",
-            y="Atributo",
-            orientation="h",
-            text="Correlação_com_Vitórias",
-            color="Correlação_com_Vitórias",
-            color_continuous_scale="Cividis",
-        )
-        fig_corr.update_layout(yaxis=dict(autorange="reversed"))
-        st.plotly_chart(
-            fig_corr,
-            use_container_width=True,
-            config={"displayModeBar": False},
-            key="correlacoes_plot",
-        )
+    fig_corr = figura("correlacoes")
+    if fig_corr is not None:
+        mostrar_figura(fig_corr, key="correlacoes_plot")
 
     st.subheader("📊 Distribuição da Taxa de Vitória (%)")
-    if distribuicao is not None and not distribuicao.empty:
-        df_dist = clean_df(distribuicao)
-        fig_dist = px.pie(
-            df_dist,
-            names="Faixa",
-            values="Proporção(%)",
-            color="Faixa",
-            color_discrete_sequence=px.colors.sequential.RdBu,
-        )
-        st.plotly_chart(
-            fig_dist,
-            use_container_width=True,
-            config={"displayModeBar": False},
-            key="distribuicao_plot",
-        )
+    fig_dist = figura("distribuicao")
+    if fig_dist is not None:
+        mostrar_figura(fig_dist, key="distribuicao_plot")
 
-# ------------------ Tab 4: Ranking de Tipos ------------------ #
-with tabs[3]:
+# ------------------ Aba 4: Ranking de Tipos ------------------ #
+if aba == ABAS[3]:
     st.subheader("🎨 Ranking de Tipos por Taxa de Vitória Média")
-    if ranking_tipos is not None and not ranking_tipos.empty:
-        st.plotly_chart(
-            plot_bar(
-                ranking_tipos,
-                "media_taxa_vitoria",
-                "Types",
-                "Ranking de Tipos",
-                color_scale="Viridis",
-            ),
-            use_container_width=True,
-            config={"displayModeBar": False},
-            key="ranking_tipos_plot",
-        )
+    fig_ranking = figura("ranking_tipos")
+    if fig_ranking is not None:
+        mostrar_figura(fig_ranking, key="ranking_tipos_plot")
 
-# ------------------ Tab 5: Filtro por Tipo ------------------ #
-with tabs[4]:
+# ------------------ Aba 5: Filtro por Tipo ------------------ #
+if aba == ABAS[4]:
     st.subheader("🔍 Filtrar Pokémon por Tipo")
-    tipos = get_tipos(df_attr_geral)
-    tipo_selecionado = st.selectbox("Selecione o tipo", tipos, key="select_tipo")
-    df_attr_tipo = get_pokemon_by_tipo(df_attr_geral, tipo_selecionado)
-    st.dataframe(
-        df_attr_tipo[
-            ["Nome", "Types"] + list(df_attr_tipo.select_dtypes("number").columns)
-        ],
-        use_container_width=True,
+    indice_pokemon = get_indice_pokemon(versoes_de(TABELAS_INDICE))
+    tipo_selecionado = st.selectbox(
+        "Selecione o tipo", indice_pokemon.tipos, key="select_tipo"
     )
+    st.dataframe(indice_pokemon.por_tipo(tipo_selecionado), use_container_width=True)
 
-# ------------------ Tab 6: Comparação de Dois Pokémon ------------------ #
-with tabs[5]:
+# ------------------ Aba 6: Comparação de Dois Pokémon ------------------ #
+if aba == ABAS[5]:
     st.subheader("⚡ Comparação Interativa de Dois Pokémon")
-    pokemon_options = get_pokemon_list(df_attr_geral)
+    indice_pokemon = get_indice_pokemon(versoes_de(TABELAS_INDICE))
+    pokemon_options = indice_pokemon.nomes
     col1, col2 = st.columns(2)
     with col1:
         pokemon1 = st.selectbox("Primeiro Pokémon", options=pokemon_options, key="p1")
@@ -275,13 +416,13 @@ with tabs[5]:
         pokemon2 = st.selectbox("Segundo Pokémon", options=pokemon_options, key="p2")
 
     def radar_attributes(pokemon_name, suffix):
-        df_p = get_pokemon_attributes(df_attr_geral, pokemon_name)
-        col_num = df_p.select_dtypes(include="number").columns
+        df_p = indice_pokemon.atributos(pokemon_name)
+        col_num = list(indice_pokemon.colunas_atributos)
         df_plot = pd.DataFrame(
             {
                 "Atributo": col_num,
                 "Valor do Pokémon": df_p[col_num].iloc[0],
-                "Média Geral": df_attr_geral[col_num].mean(),
+                "Média Geral": indice_pokemon.medias,
             }
         )
         fig = px.line_polar(
@@ -308,10 +449,19 @@ with tabs[5]:
     radar_attributes(pokemon2, "2")
 
     def stat_box(pokemon_name):
-        df_p = clean_df(df_estatisticas[df_estatisticas["Pokemon"] == pokemon_name])
-        if df_p.empty:
-            return None
-        return df_p.iloc[0][["Vitorias", "Derrotas", "Taxa_Vitoria(%)"]]
+        return indice_pokemon.estatisticas(pokemon_name)
+
+    def ic_caption(pokemon_name):
+        r = indice_pokemon.intervalo(pokemon_name)
+        if r is None:
+            return
+        texto = f"IC 95% Wilson: [{r['IC_Wilson_Inf(%)']}%, {r['IC_Wilson_Sup(%)']}%]"
+        if "IC_Bootstrap_Inf(%)" in r.index:
+            texto += (
+                f" · Bootstrap: [{r['IC_Bootstrap_Inf(%)']}%, "
+                f"{r['IC_Bootstrap_Sup(%)']}%]"
+            )
+        st.caption(texto)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -322,6 +472,7 @@ with tabs[5]:
             st.metric(
                 f"{pokemon1} - Taxa de Vitória (%)", float(stats1["Taxa_Vitoria(%)"])
             )
+            ic_caption(pokemon1)
     with col2:
         stats2 = stat_box(pokemon2)
         if stats2 is not None:
@@ -330,20 +481,26 @@ with tabs[5]:
             st.metric(
                 f"{pokemon2} - Taxa de Vitória (%)", float(stats2["Taxa_Vitoria(%)"])
             )
-
-    df_duelo = df_combate[
-        (
-            (df_combate["nome_first"] == pokemon1)
-            & (df_combate["nome_second"] == pokemon2)
-        )
-        | (
-            (df_combate["nome_first"] == pokemon2)
-            & (df_combate["nome_second"] == pokemon1)
+            ic_caption(pokemon2)
+
+    matriz_previsoes = get_matriz_previsoes(versoes_de(TABELAS_PREVISOES))
+    if (
+        matriz_previsoes is not None
+        and pokemon1 in matriz_previsoes.index
+        and pokemon2 in matriz_previsoes.columns
+    ):
+        prob_p1 = float(matriz_previsoes.at[pokemon1, pokemon2])
+        st.markdown("#### 🔮 Previsão do Modelo")
+        col1, col2 = st.columns(2)
+        col1.metric(f"{pokemon1} vence", f"{prob_p1:.1%}")
+        col2.metric(f"{pokemon2} vence", f"{1 - prob_p1:.1%}")
+        st.caption(
+            "Regressão logística sobre diferenças de atributos e tipos; "
+            "vale também para pares que nunca se enfrentaram."
         )
-    ]
-    vitorias_p1 = (df_duelo["nome_winner"] == pokemon1).sum()
-    vitorias_p2 = (df_duelo["nome_winner"] == pokemon2).sum()
-    total_duelos = len(df_duelo)
+
+    indice_confrontos = get_indice_confrontos(versoes_de(["confrontos_diretos"]))
+    vitorias_p1, vitorias_p2, total_duelos = indice_confrontos.duelo(pokemon1, pokemon2)
     st.write(f"Total de combates entre {pokemon1} e {pokemon2}: {total_duelos}")
     st.write(f"{pokemon1} venceu {vitorias_p1} vezes")
     st.write(f"{pokemon2} venceu {vitorias_p2} vezes")
@@ -366,54 +523,57 @@ with tabs[5]:
             key=f"duelo_{pokemon1}_{pokemon2}",
         )
 
-# ------------------ Tab 7: Histórico de Batalhas ------------------ #
-with tabs[6]:
+# ------------------ Aba 7: Histórico de Batalhas ------------------ #
+if aba == ABAS[6]:
     st.subheader("📜 Histórico de Batalhas de um Pokémon")
-    pokemon_options = get_pokemon_list(df_attr_geral)
+    indice_pokemon = get_indice_pokemon(versoes_de(TABELAS_INDICE))
+    pokemon_options = indice_pokemon.nomes
     pokemon_escolhido = st.selectbox(
         "Selecione um Pokémon", pokemon_options, key="historico"
     )
-    df_batalhas = clean_df(
-        df_combate[
-            (df_combate["nome_first"] == pokemon_escolhido)
-            | (df_combate["nome_second"] == pokemon_escolhido)
-        ]
-    )
 
-    if df_batalhas.empty:
+    # Métricas dos agregados; a lista de combates vem do banco, uma página
+    # por vez (paginação por id_combate, ver src/historico_combates.py)
+    stats = indice_pokemon.estatisticas(pokemon_escolhido)
+    if stats is None:
         st.warning("⚠️ Nenhuma batalha encontrada para este Pokémon.")
     else:
-        df_batalhas["Adversário"] = df_batalhas.apply(
-            lambda row: row["nome_second"]
-            if row["nome_first"] == pokemon_escolhido
-            else row["nome_first"],
-            axis=1,
-        )
-        df_batalhas["Resultado"] = df_batalhas.apply(
-            lambda row: "Vitória"
-            if row["nome_winner"] == pokemon_escolhido
-            else "Derrota",
-            axis=1,
-        )
-        st.markdown(f"### 🧩 {pokemon_escolhido} — Histórico de Combates")
-        st.dataframe(
-            df_batalhas[
-                ["nome_first", "nome_second", "nome_winner", "Adversário", "Resultado"]
-            ],
-            hide_index=True,
-            use_container_width=True,
-        )
-
-        total = len(df_batalhas)
-        vitorias = (df_batalhas["Resultado"] == "Vitória").sum()
-        derrotas = (df_batalhas["Resultado"] == "Derrota").sum()
-        taxa = round((vitorias / total) * 100, 2) if total > 0 else 0
+        total = int(stats["Lutas"])
+        vitorias = int(stats["Vitorias"])
+        derrotas = int(stats["Derrotas"])
+        taxa = float(stats["Taxa_Vitoria(%)"])
 
+        st.markdown(f"### 🧩 {pokemon_escolhido} — Histórico de Combates")
         col1, col2, col3 = st.columns(3)
         col1.metric("Total de Batalhas", total)
         col2.metric("Vitórias", vitorias)
         col3.metric("Taxa de Vitória (%)", taxa)
 
+        # Cursores das páginas visitadas (id_combate de onde cada uma começa)
+        if st.session_state.get("historico_pokemon") != pokemon_escolhido:
+            st.session_state["historico_pokemon"] = pokemon_escolhido
+            st.session_state["historico_cursores"] = [0]
+        cursores = st.session_state["historico_cursores"]
+
+        try:
+            pagina = pagina_historico(pokemon_escolhido, apos=cursores[-1])
+        except Exception as e:
+            pagina = None
+            st.warning(f"⚠️ Histórico de combates indisponível: {e}")
+
+        if pagina is not None:
+            st.dataframe(pagina.linhas, hide_index=True, use_container_width=True)
+            col_ant, col_pag, col_prox = st.columns([1, 2, 1])
+            col_pag.caption(
+                f"Página {len(cursores)} de {max(-(-total // TAMANHO_PAGINA), 1)}"
+            )
+            if col_ant.button("⬅️ Anterior", disabled=len(cursores) == 1):
+                cursores.pop()
+                st.rerun()
+            if col_prox.button("Próxima ➡️", disabled=pagina.proximo is None):
+                cursores.append(pagina.proximo)
+                st.rerun()
+
         fig_pie = px.pie(
             pd.DataFrame(
                 {
@@ -433,6 +593,142 @@ with tabs[6]:
             key=f"historico_pie_{pokemon_escolhido}",
         )
 
+# ------------------ Aba 8: Cubo Analítico ------------------ #
+if aba == ABAS[7]:
+    st.subheader("🧊 Cubo Analítico — Geração, Lendário, Tipo e Faixa de Vitória")
+    cubo = get_cubo(
+        versoes_de(TABELAS_CUBO), carregar_estatisticas(versoes_dados), df_attr_geral
+    )
+    if cubo:
+        dims_cubo = st.multiselect(
+            "Agrupar por",
+            DIMENSOES_CUBO,
+            default=["Generation"],
+            key="cubo_dimensoes",
+        )
+        filtros_cubo = {}
+        cols_filtro = st.columns(len(DIMENSOES_CUBO))
+        for col, dim in zip(cols_filtro, DIMENSOES_CUBO):
+            valores = consultar_cubo(cubo, [dim])[dim].tolist()
+            escolhidos = col.multiselect(dim, valores, key=f"cubo_filtro_{dim}")
+            if escolhidos:
+                filtros_cubo[dim] = escolhidos
+
+        df_cubo = consultar_cubo(cubo, dims_cubo, filtros_cubo)
+        st.dataframe(df_cubo, hide_index=True, use_container_width=True)
+
+        if len(dims_cubo) == 1 and not df_cubo.empty:
+            fig_cubo = px.bar(
+                df_cubo.astype({dims_cubo[0]: str}),
+                x=dims_cubo[0],
+                y="Taxa_Vitoria(%)",
+                text="Taxa_Vitoria(%)",
+                color="Taxa_Vitoria(%)",
+                color_continuous_scale="Viridis",
+                title=f"Taxa de Vitória (%) por {dims_cubo[0]}",
+            )
+            st.plotly_chart(
+                fig_cubo,
+                use_container_width=True,
+                config={"displayModeBar": False},
+                key="cubo_plot",
+            )
+
+# ------------------ Aba 9: Torneio ------------------ #
+if aba == ABAS[8]:
+    st.subheader("🏆 Simulação de Torneio (Monte Carlo)")
+    indice_pokemon = get_indice_pokemon(versoes_de(TABELAS_INDICE))
+    df_estatisticas = carregar_estatisticas(versoes_dados)
+    padrao = (
+        df_estatisticas.nlargest(16, "Vitorias")["Pokemon"].tolist()
+        if df_estatisticas is not None
+        else []
+    )
+    participantes = st.multiselect(
+        "Participantes (2, 4, 8 ou 16, em ordem de ranking)",
+        indice_pokemon.nomes,
+        default=padrao,
+        max_selections=16,
+        key="torneio_participantes",
+    )
+    n_simulacoes = st.select_slider(
+        "Chaveamentos simulados",
+        options=[10_000, 100_000, 1_000_000],
+        value=100_000,
+        key="torneio_simulacoes",
+    )
+    n_part = len(participantes)
+    if n_part < 2 or n_part & (n_part - 1):
+        st.info("Selecione 2, 4, 8 ou 16 Pokémon para montar a chave.")
+    else:
+        df_torneio = get_torneio(
+            versoes_de(TABELAS_TORNEIO), tuple(ordem_chave(participantes)), n_simulacoes
+        )
+        st.dataframe(df_torneio, hide_index=True, use_container_width=True)
+        st.plotly_chart(
+            plot_bar(
+                df_torneio,
+                "Campeao(%)",
+                "Pokemon",
+                "Chance de Título (%)",
+                color_scale="Oranges",
+            ),
+            use_container_width=True,
+            config={"displayModeBar": False},
+            key="torneio_plot",
+        )
+        st.download_button(
+            "⬇️ Exportar resultado (CSV)",
+            df_torneio.to_csv(index=False).encode("utf-8"),
+            file_name="simulacao_torneio.csv",
+            mime="text/csv",
+        )
+
+# ------------------ Aba 10: Pokémon Semelhantes ------------------ #
+if aba == ABAS[9]:
+    st.subheader("🔎 Pokémon Semelhantes por Atributos")
+    indice_pokemon = get_indice_pokemon(versoes_de(TABELAS_INDICE))
+    df_estatisticas = carregar_estatisticas(versoes_dados)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    pokemon_ref = col1.selectbox(
+        "Pokémon de referência", indice_pokemon.nomes, key="similar_pokemon"
+    )
+    k_vizinhos = col2.slider("Vizinhos", 3, 20, 10, key="similar_k")
+    peso_tipo = col3.select_slider(
+        "Peso do tipo", options=PESOS_TIPO, value=0.0, key="similar_peso"
+    )
+
+    indice = get_indice_similaridade(versoes_de(["atributos_pokemon"]), peso_tipo)
+    if indice is None:
+        st.warning("⚠️ Atributos indisponíveis para montar o índice.")
+    else:
+        df_similares = vizinhos_mais_proximos(indice, pokemon_ref, k_vizinhos)
+        if df_estatisticas is not None:
+            df_similares = comparar_taxas(df_similares, df_estatisticas)
+        st.caption(
+            "Distância euclidiana entre os seis atributos padronizados"
+            + (" e os tipos." if peso_tipo > 0 else ".")
+        )
+        st.dataframe(
+            df_similares.drop(columns=["Pokemon"]),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        if "Diferenca_Taxa(pp)" in df_similares.columns:
+            st.plotly_chart(
+                plot_bar(
+                    df_similares.dropna(subset=["Diferenca_Taxa(pp)"]),
+                    "Diferenca_Taxa(pp)",
+                    "Vizinho",
+                    f"Taxa de Vitória relativa a {pokemon_ref} (pp)",
+                    color_scale="RdBu",
+                ),
+                use_container_width=True,
+                config={"displayModeBar": False},
+                key=f"similar_plot_{pokemon_ref}",
+            )
+
 st.markdown("---")
 st.markdown(
     "Dashboard gerado automaticamente a partir do pipeline de análises Pokémon ⚡"
@@ -0,0 +1,331 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from sqlalchemy import text
+
+from src.analisar_dados_banco import conectar_banco, finalizar_estatisticas, salvar_tabela
+
+logging.basicConfig(level=logging.INFO)
+
+# Processos da agregação particionada (0 ou 1: agregação local em pandas no
+# DAG). Lido do ambiente uma vez, na importação
+AGREGACAO_WORKERS = int(os.getenv("AGREGACAO_WORKERS", "0"))
+
+# Combates por partição (intervalo de id_combate de uma tabela ou de linhas
+# de um arquivo)
+LINHAS_POR_PARTICAO = int(os.getenv("AGREGACAO_LINHAS_POR_PARTICAO", "200000"))
+
+# Pasta (local ou compartilhada entre máquinas) onde cada partição grava seu
+# parcial em Parquet; a combinação lê os parciais dali. Vazio: os parciais
+# voltam ao processo principal em memória
+AGREGACAO_PARCIAIS_DIR = os.getenv("AGREGACAO_PARCIAIS_DIR", "")
+
+COLUNAS_ID = ["first_pokemon", "second_pokemon", "winner"]
+
+
+@dataclass(frozen=True)
+class AgregadoParcial:
+    """
+    Contagens aditivas de um intervalo de combates, chaveadas por ID.
+
+    pokemon: ID, Lutas, Vitorias.
+    confrontos: ID_A, ID_B (ID_A <= ID_B), Lutas, Vitorias_A, Vitorias_B.
+
+    Dois parciais se combinam somando as contagens das mesmas chaves, em
+    qualquer ordem; por isso podem ser produzidos em máquinas diferentes e
+    trocados como arquivos Parquet (salvar_parcial / carregar_parcial).
+    """
+
+    pokemon: pd.DataFrame
+    confrontos: pd.DataFrame
+
+
+# ------------------ Map: agregação de uma partição ------------------ #
+
+
+def agregar_particao(first, second, winner) -> AgregadoParcial:
+    """Conta lutas, vitórias e confrontos diretos de um intervalo de combates."""
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    winner = np.asarray(winner, dtype=np.int64)
+    n = len(first)
+
+    ids, codigos = np.unique(np.concatenate([first, second, winner]), return_inverse=True)
+    lutas = np.bincount(codigos[: 2 * n], minlength=len(ids))
+    vitorias = np.bincount(codigos[2 * n :], minlength=len(ids))
+    pokemon = pd.DataFrame({"ID": ids, "Lutas": lutas, "Vitorias": vitorias})
+
+    a, b = np.minimum(first, second), np.maximum(first, second)
+    fator = int(b.max(initial=0)) + 1  # par (a, b) -> chave escalar a * fator + b
+    pares, inverso = np.unique(a * fator + b, return_inverse=True)
+    confrontos = pd.DataFrame(
+        {
+            "ID_A": pares // fator,
+            "ID_B": pares % fator,
+            "Lutas": np.bincount(inverso, minlength=len(pares)),
+            "Vitorias_A": np.bincount(inverso, weights=winner == a, minlength=len(pares)),
+            "Vitorias_B": np.bincount(inverso, weights=winner == b, minlength=len(pares)),
+        }
+    ).astype({"Vitorias_A": np.int64, "Vitorias_B": np.int64})
+
+    return AgregadoParcial(pokemon=pokemon[pokemon["Lutas"] > 0], confrontos=confrontos)
+
+
+def _entregar(parcial: AgregadoParcial, pasta: str, nome: str):
+    """Grava o parcial em pasta/nome (e devolve o caminho) ou o devolve em memória."""
+    if not pasta:
+        return parcial
+    destino = os.path.join(pasta, nome)
+    salvar_parcial(parcial, destino)
+    return destino
+
+
+def _agregar_intervalo_banco(inicio: int, fim: int, pasta: str = "") -> AgregadoParcial:
+    """
+    Lê de combates_com_nomes só os combates com id_combate em [inicio, fim] e
+    os agrega. Roda no worker, com sua própria conexão: o processo principal
+    nunca tem a tabela inteira em memória.
+    """
+    with conectar_banco().connect() as conexao:
+        df = pd.read_sql(
+            text(
+                "SELECT first_pokemon, second_pokemon, winner FROM combates_com_nomes "
+                "WHERE id_combate BETWEEN :inicio AND :fim"
+            ),
+            conexao,
+            params={"inicio": int(inicio), "fim": int(fim)},
+        ).dropna()
+    parcial = agregar_particao(*(df[c] for c in COLUNAS_ID))
+    return _entregar(parcial, pasta, f"ids_{inicio}_{fim}")
+
+
+def _agregar_intervalo_csv(
+    caminho: str, inicio: int, linhas: int, pasta: str = ""
+) -> AgregadoParcial:
+    """Lê apenas o intervalo [inicio, inicio + linhas) de um CSV e o agrega."""
+    df = pd.read_csv(
+        caminho,
+        usecols=COLUNAS_ID,
+        skiprows=range(1, inicio + 1),
+        nrows=linhas,
+    ).dropna()
+    parcial = agregar_particao(*(df[c] for c in COLUNAS_ID))
+    nome = f"{os.path.splitext(os.path.basename(caminho))[0]}_{inicio}"
+    return _entregar(parcial, pasta, nome)
+
+
+# ------------------ Reduce: combinação de parciais ------------------ #
+
+
+def combinar_parciais(parciais) -> AgregadoParcial:
+    """Soma parciais (operação associativa e comutativa)."""
+    parciais = list(parciais)
+    pokemon = (
+        pd.concat([p.pokemon for p in parciais])
+        .groupby("ID")[["Lutas", "Vitorias"]]
+        .sum()
+        .reset_index()
+    )
+    confrontos = (
+        pd.concat([p.confrontos for p in parciais])
+        .groupby(["ID_A", "ID_B"])[["Lutas", "Vitorias_A", "Vitorias_B"]]
+        .sum()
+        .reset_index()
+    )
+    return AgregadoParcial(pokemon=pokemon, confrontos=confrontos)
+
+
+def salvar_parcial(parcial: AgregadoParcial, pasta: str):
+    """Grava um parcial como pasta/pokemon.parquet e pasta/confrontos.parquet."""
+    os.makedirs(pasta, exist_ok=True)
+    parcial.pokemon.to_parquet(os.path.join(pasta, "pokemon.parquet"), index=False)
+    parcial.confrontos.to_parquet(os.path.join(pasta, "confrontos.parquet"), index=False)
+
+
+def carregar_parcial(pasta: str) -> AgregadoParcial:
+    """Lê um parcial gravado por salvar_parcial()."""
+    return AgregadoParcial(
+        pokemon=pd.read_parquet(os.path.join(pasta, "pokemon.parquet")),
+        confrontos=pd.read_parquet(os.path.join(pasta, "confrontos.parquet")),
+    )
+
+
+# ------------------ Execução no pool de processos ------------------ #
+
+
+def _executar(funcao, tarefas, workers: int) -> AgregadoParcial:
+    workers = max(1, min(workers, len(tarefas)))
+    if workers == 1:
+        parciais = [funcao(*t) for t in tarefas]
+    else:
+        # "spawn": este código também roda dentro do pool de threads dos estágios
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            parciais = list(pool.map(funcao, *zip(*tarefas)))
+    logging.info(f"Agregação particionada: {len(tarefas)} partições, {workers} processos")
+    # Parciais gravados em disco (ver AGREGACAO_PARCIAIS_DIR) são lidos de lá
+    return combinar_parciais(
+        carregar_parcial(p) if isinstance(p, str) else p for p in parciais
+    )
+
+
+def agregar_tabela(
+    workers: int = AGREGACAO_WORKERS,
+    linhas_por_particao: int = LINHAS_POR_PARTICAO,
+    pasta: str = AGREGACAO_PARCIAIS_DIR,
+) -> AgregadoParcial:
+    """
+    Agrega combates_com_nomes por intervalos de id_combate: cada worker
+    consulta e agrega só o seu intervalo (WHERE id_combate BETWEEN ...).
+    """
+    with conectar_banco().connect() as conexao:
+        minimo, maximo = conexao.execute(
+            text("SELECT MIN(id_combate), MAX(id_combate) FROM combates_com_nomes")
+        ).one()
+    if minimo is None:
+        return agregar_particao([], [], [])
+    tarefas = [
+        (inicio, min(inicio + linhas_por_particao - 1, int(maximo)), pasta)
+        for inicio in range(int(minimo), int(maximo) + 1, linhas_por_particao)
+    ]
+    return _executar(_agregar_intervalo_banco, tarefas, workers)
+
+
+def _contar_linhas(caminho: str) -> int:
+    with open(caminho, "rb") as f:
+        quebras = sum(bloco.count(b"\n") for bloco in iter(lambda: f.read(1 << 20), b""))
+    return max(quebras - 1, 0)  # desconta o cabeçalho
+
+
+def agregar_arquivos(
+    caminhos,
+    workers: int = AGREGACAO_WORKERS,
+    linhas_por_particao: int = LINHAS_POR_PARTICAO,
+    pasta: str = AGREGACAO_PARCIAIS_DIR,
+) -> AgregadoParcial:
+    """
+    Agrega arquivos CSV de combates sem carregá-los no processo principal:
+    cada partição (arquivo, intervalo de linhas) é lida e agregada pelo worker.
+    """
+    tarefas = [
+        (caminho, inicio, linhas_por_particao, pasta)
+        for caminho in caminhos
+        for inicio in range(0, _contar_linhas(caminho), linhas_por_particao)
+    ]
+    if not tarefas:
+        return agregar_particao([], [], [])
+    return _executar(_agregar_intervalo_csv, tarefas, workers)
+
+
+# ------------------ Tabelas finais ------------------ #
+
+
+def _nomes_por_id(df_attr: pd.DataFrame) -> pd.Series:
+    """Mapa ID -> Nome de atributos_pokemon (o mesmo de adicionar_nomes)."""
+    return df_attr.dropna(subset=["ID", "Nome"]).drop_duplicates("ID").set_index("ID")["Nome"]
+
+
+def estatisticas_de_agregado(total: AgregadoParcial, nomes: pd.Series) -> pd.DataFrame:
+    """Tabela 'estatisticas_pokemon' a partir do agregado (mesmo formato do pandas)."""
+    df = total.pokemon.assign(Pokemon=total.pokemon["ID"].map(nomes))
+    contagens = (
+        df.dropna(subset=["Pokemon"])
+        .groupby("Pokemon", sort=False)[["Lutas", "Vitorias"]]
+        .sum()
+        .reset_index()
+    )
+    return finalizar_estatisticas(contagens)
+
+
+def confrontos_de_agregado(total: AgregadoParcial, nomes: pd.Series) -> pd.DataFrame:
+    """Tabela 'confrontos_diretos' a partir do agregado (Pokemon_A < Pokemon_B)."""
+    df = total.confrontos.assign(
+        Nome_A=total.confrontos["ID_A"].map(nomes),
+        Nome_B=total.confrontos["ID_B"].map(nomes),
+    ).dropna(subset=["Nome_A", "Nome_B"])
+    trocar = df["Nome_A"] > df["Nome_B"]
+    confrontos = pd.DataFrame(
+        {
+            "Pokemon_A": df["Nome_A"].where(~trocar, df["Nome_B"]),
+            "Pokemon_B": df["Nome_B"].where(~trocar, df["Nome_A"]),
+            "Lutas": df["Lutas"],
+            "Vitorias_A": df["Vitorias_A"].where(~trocar, df["Vitorias_B"]),
+            "Vitorias_B": df["Vitorias_B"].where(~trocar, df["Vitorias_A"]),
+        }
+    )
+    return (
+        confrontos.groupby(["Pokemon_A", "Pokemon_B"], sort=False)[
+            ["Lutas", "Vitorias_A", "Vitorias_B"]
+        ]
+        .sum()
+        .reset_index()
+    )
+
+
+def gerar_agregados(df_attr: pd.DataFrame, workers: int = AGREGACAO_WORKERS):
+    """
+    Gera 'estatisticas_pokemon' e 'confrontos_diretos' numa única passada
+    particionada sobre combates_com_nomes, lida por intervalos de id_combate
+    nos workers (ver agregar_tabela).
+    """
+    if df_attr is None:
+        logging.error("DataFrame de atributos é None.")
+        return None, None
+
+    total = agregar_tabela(workers=workers)
+    nomes = _nomes_por_id(df_attr)
+    estatisticas = estatisticas_de_agregado(total, nomes)
+    confrontos = confrontos_de_agregado(total, nomes)
+
+    salvar_tabela(estatisticas, "estatisticas_pokemon")
+    salvar_tabela(confrontos, "confrontos_diretos")
+    return estatisticas, confrontos
+
+
+def contar_confrontos_tipos(df_confrontos: pd.DataFrame, df_attr: pd.DataFrame):
+    """
+    Agrega os confrontos diretos por par de tipos (coluna 'Types').
+
+    Cada par aparece uma única vez, com Tipo_A <= Tipo_B; como as contagens
+    por par de Pokémon são aditivas, o resultado é o mesmo de contar combate
+    a combate.
+    """
+    tipos = df_attr.set_index("Nome")["Types"]
+    df = df_confrontos.assign(
+        Tipo_A=df_confrontos["Pokemon_A"].map(tipos),
+        Tipo_B=df_confrontos["Pokemon_B"].map(tipos),
+    ).dropna(subset=["Tipo_A", "Tipo_B"])
+    trocar = df["Tipo_A"] > df["Tipo_B"]
+    df = pd.DataFrame(
+        {
+            "Tipo_A": df["Tipo_A"].where(~trocar, df["Tipo_B"]),
+            "Tipo_B": df["Tipo_B"].where(~trocar, df["Tipo_A"]),
+            "Lutas": df["Lutas"],
+            "Vitorias_A": df["Vitorias_A"].where(~trocar, df["Vitorias_B"]),
+            "Vitorias_B": df["Vitorias_B"].where(~trocar, df["Vitorias_A"]),
+        }
+    )
+    df = (
+        df.groupby(["Tipo_A", "Tipo_B"])[["Lutas", "Vitorias_A", "Vitorias_B"]]
+        .sum()
+        .reset_index()
+    )
+    df["Taxa_Vitoria_A(%)"] = (df["Vitorias_A"] / df["Lutas"] * 100).round(2)
+    return df.sort_values("Lutas", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def analisar_confrontos_tipos(df_confrontos: pd.DataFrame, df_attr: pd.DataFrame):
+    """Gera a tabela 'confrontos_tipos' (lutas e vitórias por par de tipos)."""
+    if df_confrontos is None or df_attr is None or "Types" not in df_attr.columns:
+        return pd.DataFrame()
+
+    df_tipos = contar_confrontos_tipos(df_confrontos, df_attr)
+    salvar_tabela(df_tipos, "confrontos_tipos")
+    return df_tipos
@@ -1,10 +1,33 @@
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 from src.banco_conexao import obter_engine
 import logging
+import threading
+import time
+from contextlib import contextmanager
 
 logging.basicConfig(level=logging.INFO)
 
+# Atributos de batalha usados nas análises comparativas
+COLUNAS_ATRIBUTOS = ["Hp", "Attack", "Defense", "Sp_attack", "Sp_defense", "Speed"]
+
+# Faixas da Taxa_Vitoria(%) usadas na distribuição e no cubo analítico
+FAIXAS_TAXA = [0, 25, 50, 75, 100]
+ROTULOS_FAIXAS = ["0-25%", "25-50%", "50-75%", "75-100%"]
+
+# Índices recriados sempre que a tabela é gravada (o "replace" do pandas
+# recria a tabela sem eles). Os de combates_com_nomes atendem à paginação
+# do histórico por Pokémon (ver src/historico_combates.py) e os intervalos
+# da agregação particionada (src/agregacao_distribuida.py).
+INDICES_TABELAS = {
+    "combates_com_nomes": {
+        "ix_combates_nomes_first": ("nome_first", "id_combate"),
+        "ix_combates_nomes_second": ("nome_second", "id_combate"),
+        # Intervalos de id_combate da agregação particionada
+        "ix_combates_nomes_id": ("id_combate",),
+    },
+}
+
 
 def conectar_banco():
     """Retorna SQLAlchemy engine."""
@@ -23,31 +46,128 @@ def carregar_tabela(nome_tabela: str) -> pd.DataFrame:
         return None
 
 
-def salvar_tabela(df: pd.DataFrame, nome_tabela: str):
-    """Salva DataFrame no banco (replace)."""
+def carregar_tabelas(nomes_tabelas) -> tuple:
+    """
+    Carrega várias tabelas numa única conexão (e numa única transação, para
+    que todas venham do mesmo estado do banco).
+
+    As tabelas inexistentes são identificadas numa consulta ao catálogo antes
+    das leituras e retornam None.
+
+    Returns:
+        tuple[dict, dict]: {tabela: DataFrame ou None} e {tabela: segundos}.
+    """
+    tabelas, tempos = {}, {}
+    engine = conectar_banco()
+    try:
+        with engine.connect() as conexao:
+            if engine.dialect.name == "postgresql":
+                conexao = conexao.execution_options(isolation_level="REPEATABLE READ")
+            with conexao.begin():
+                existentes = set(inspect(conexao).get_table_names())
+                for nome_tabela in nomes_tabelas:
+                    if nome_tabela not in existentes:
+                        logging.warning(f"Tabela '{nome_tabela}' não encontrada.")
+                        tabelas[nome_tabela] = None
+                        continue
+                    inicio = time.perf_counter()
+                    tabelas[nome_tabela] = pd.read_sql(
+                        text(f"SELECT * FROM {nome_tabela}"), conexao
+                    )
+                    tempos[nome_tabela] = time.perf_counter() - inicio
+    except Exception as e:
+        logging.warning(f"Não foi possível carregar as tabelas {list(nomes_tabelas)}: {e}")
+        return {nome: tabelas.get(nome) for nome in nomes_tabelas}, tempos
+
+    if tempos:
+        linhas = [
+            f"  {nome:<35} {len(tabelas[nome]):>9} linhas {duracao:>8.3f}s"
+            for nome, duracao in tempos.items()
+        ]
+        logging.info("Tabelas carregadas (uma conexão):\n" + "\n".join(linhas))
+    return tabelas, tempos
+
+
+# Gravações que falharam, por thread, dentro de acompanhar_gravacoes()
+_gravacoes = threading.local()
+
+
+@contextmanager
+def acompanhar_gravacoes():
+    """
+    Coleta os nomes das tabelas que salvar_tabela não conseguiu gravar na
+    thread atual durante o bloco. salvar_tabela só registra o erro no log;
+    quem precisa saber se tudo foi gravado (ex.: um estágio do DAG, antes de
+    registrar suas saídas) confere a lista ao final.
+    """
+    anteriores = getattr(_gravacoes, "falhas", None)
+    _gravacoes.falhas = falhas = []
+    try:
+        yield falhas
+    finally:
+        _gravacoes.falhas = anteriores
+
+
+def salvar_tabela(df: pd.DataFrame, nome_tabela: str, if_exists: str = "replace"):
+    """Salva DataFrame no banco ("replace" por padrão ou "append")."""
     engine = conectar_banco()
     try:
-        df.to_sql(nome_tabela, engine, if_exists="replace", index=False, method="multi")
+        df.to_sql(nome_tabela, engine, if_exists=if_exists, index=False, method="multi")
         logging.info(f"Tabela '{nome_tabela}' salva com {len(df)} linhas")
+        criar_indices(nome_tabela, engine)
     except Exception as e:
         logging.error(f"Erro ao salvar tabela '{nome_tabela}': {e}")
+        falhas = getattr(_gravacoes, "falhas", None)
+        if falhas is not None:
+            falhas.append(nome_tabela)
 
 
-# ------------------ Pipeline principal ------------------ #
+def salvar_tabelas_transacao(gravacoes):
+    """
+    Grava várias tabelas numa única transação: ou todas são gravadas, ou
+    nenhuma. Ao contrário de salvar_tabela, erros são propagados.
 
+    Args:
+        gravacoes (iterable): Tuplas (DataFrame, nome_tabela, if_exists).
+    """
+    engine = conectar_banco()
+    with engine.begin() as conexao:
+        for df, nome_tabela, if_exists in gravacoes:
+            df.to_sql(nome_tabela, conexao, if_exists=if_exists, index=False, method="multi")
+            _criar_indices(conexao, nome_tabela)
+    for df, nome_tabela, _ in gravacoes:
+        logging.info(f"Tabela '{nome_tabela}' salva com {len(df)} linhas (transação)")
+
+
+def criar_indices(nome_tabela: str, engine=None):
+    """Cria (se ainda não existirem) os índices registrados para a tabela."""
+    if not INDICES_TABELAS.get(nome_tabela):
+        return
+    engine = engine or conectar_banco()
+    with engine.begin() as conexao:
+        _criar_indices(conexao, nome_tabela)
+
+
+def _criar_indices(conexao, nome_tabela: str):
+    for nome_indice, colunas in INDICES_TABELAS.get(nome_tabela, {}).items():
+        lista = ", ".join(f'"{c}"' for c in colunas)
+        conexao.execute(
+            text(f"CREATE INDEX IF NOT EXISTS {nome_indice} ON {nome_tabela} ({lista})")
+        )
 
-def combinar_tabelas():
-    """Combina combates com atributos, adicionando nomes e salvando 'combates_com_nomes'."""
-    df_attr = carregar_tabela("atributos_pokemon")
-    df_combates = carregar_tabela("combates")
 
-    if df_attr is None or df_combates is None:
-        logging.error(
-            "Tabelas necessárias não encontradas (atributos_pokemon/combates)."
-        )
-        return None
+# ------------------ Pipeline principal ------------------ #
+
 
-    df_merged = (
+def adicionar_nomes(
+    df_combates: pd.DataFrame, df_attr: pd.DataFrame, primeiro_id: int = 1
+) -> pd.DataFrame:
+    """
+    Acrescenta nome_first, nome_second e nome_winner aos combates (IDs) e um
+    identificador sequencial 'id_combate', a partir de 'primeiro_id' (chave
+    da paginação do histórico).
+    """
+    return (
         df_combates.merge(
             df_attr[["ID", "Nome"]], left_on="first_pokemon", right_on="ID", how="left"
         )
@@ -61,38 +181,100 @@ def combinar_tabelas():
         .merge(df_attr[["ID", "Nome"]], left_on="winner", right_on="ID", how="left")
         .rename(columns={"Nome": "nome_winner"})
         .drop(columns=["ID"])
+        .assign(id_combate=lambda df: range(primeiro_id, primeiro_id + len(df)))
     )
 
+
+def combinar_tabelas():
+    """Combina combates com atributos, adicionando nomes e salvando 'combates_com_nomes'."""
+    df_attr = carregar_tabela("atributos_pokemon")
+    df_combates = carregar_tabela("combates")
+
+    if df_attr is None or df_combates is None:
+        logging.error(
+            "Tabelas necessárias não encontradas (atributos_pokemon/combates)."
+        )
+        return None
+
+    df_merged = adicionar_nomes(df_combates, df_attr)
+
     salvar_tabela(df_merged, "combates_com_nomes")
     return df_merged
 
 
+def contar_estatisticas(df: pd.DataFrame) -> pd.DataFrame:
+    """Conta lutas e vitórias por Pokémon (contagens aditivas, sem taxas)."""
+    vitorias = df["nome_winner"].value_counts()
+    participacoes = pd.concat([df["nome_first"], df["nome_second"]]).value_counts()
+
+    contagens = pd.DataFrame({"Lutas": participacoes})
+    contagens["Vitorias"] = vitorias.reindex(contagens.index).fillna(0).astype(int)
+    contagens.index.name = "Pokemon"
+    return contagens.reset_index()
+
+
+def finalizar_estatisticas(contagens: pd.DataFrame) -> pd.DataFrame:
+    """Deriva derrotas e taxa de vitória a partir das contagens de lutas e vitórias."""
+    estatisticas = contagens[["Pokemon", "Lutas", "Vitorias"]].copy()
+    estatisticas["Vitorias"] = estatisticas["Vitorias"].astype(int)
+    estatisticas["Derrotas"] = estatisticas["Lutas"] - estatisticas["Vitorias"]
+    lutas = estatisticas["Lutas"].where(estatisticas["Lutas"] > 0)
+    estatisticas["Taxa_Vitoria(%)"] = (
+        (estatisticas["Vitorias"] / lutas * 100).fillna(0).round(2)
+    )
+    return estatisticas.sort_values("Lutas", ascending=False, kind="stable").reset_index(
+        drop=True
+    )
+
+
 def gerar_estatisticas(df: pd.DataFrame):
     """Calcula vitórias, lutas, derrotas e taxa de vitória por Pokémon."""
     if df is None:
         logging.error("DataFrame de combates é None.")
         return None
 
-    vitorias = df["nome_winner"].value_counts().reset_index()
-    vitorias.columns = ["Pokemon", "Vitorias"]
+    estatisticas = finalizar_estatisticas(contar_estatisticas(df))
+
+    salvar_tabela(estatisticas, "estatisticas_pokemon")
+    return estatisticas
+
+
+def contar_confrontos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conta combates diretos por par de Pokémon.
 
-    participacoes = (
-        pd.concat([df["nome_first"], df["nome_second"]]).value_counts().reset_index()
+    Cada par aparece uma única vez, com Pokemon_A < Pokemon_B em ordem alfabética.
+    """
+    df = df.dropna(subset=["nome_first", "nome_second"])
+    a = df["nome_first"].astype(str)
+    b = df["nome_second"].astype(str)
+    pares = pd.DataFrame(
+        {
+            "Pokemon_A": a.where(a <= b, b),
+            "Pokemon_B": b.where(a <= b, a),
+        }
+    )
+    pares["Vitorias_A"] = (df["nome_winner"].astype(str) == pares["Pokemon_A"]).astype(int)
+    pares["Vitorias_B"] = (df["nome_winner"].astype(str) == pares["Pokemon_B"]).astype(int)
+    pares["Lutas"] = 1
+    return (
+        pares.groupby(["Pokemon_A", "Pokemon_B"], sort=False)[
+            ["Lutas", "Vitorias_A", "Vitorias_B"]
+        ]
+        .sum()
+        .reset_index()
     )
-    participacoes.columns = ["Pokemon", "Lutas"]
 
-    estatisticas = participacoes.merge(vitorias, on="Pokemon", how="left").fillna(0)
-    estatisticas["Vitorias"] = estatisticas["Vitorias"].astype(int)
-    estatisticas["Derrotas"] = estatisticas["Lutas"] - estatisticas["Vitorias"]
-    estatisticas["Taxa_Vitoria(%)"] = (
-        estatisticas.apply(
-            lambda r: (r["Vitorias"] / r["Lutas"] * 100) if r["Lutas"] > 0 else 0,
-            axis=1,
-        )
-    ).round(2)
 
-    salvar_tabela(estatisticas, "estatisticas_pokemon")
-    return estatisticas
+def gerar_confrontos(df: pd.DataFrame):
+    """Gera a tabela agregada 'confrontos_diretos' (lutas e vitórias por par)."""
+    if df is None:
+        logging.error("DataFrame de combates é None.")
+        return None
+
+    confrontos = contar_confrontos(df)
+    salvar_tabela(confrontos, "confrontos_diretos")
+    return confrontos
 
 
 def analisar_top10(df_estatisticas: pd.DataFrame):
@@ -119,9 +301,10 @@ def analisar_top10_taxa_vitoria(df_estatisticas: pd.DataFrame, min_lutas: int =
     return top10_taxa
 
 
-def analisar_atributos_top10(top10_vitorias: pd.DataFrame):
+def analisar_atributos_top10(top10_vitorias: pd.DataFrame, df_attr: pd.DataFrame = None):
     """Compara atributos do top10 com a média geral."""
-    df_attr = carregar_tabela("atributos_pokemon")
+    if df_attr is None:
+        df_attr = carregar_tabela("atributos_pokemon")
     if df_attr is None:
         logging.error("atributos_pokemon não encontrada.")
         return None, None, None
@@ -174,18 +357,16 @@ def analisar_distribuicao_taxa(df_estatisticas: pd.DataFrame):
     if df_estatisticas is None:
         return pd.DataFrame()
 
-    bins = [0, 25, 50, 75, 100]
-    labels = ["0-25%", "25-50%", "50-75%", "75-100%"]
-    df_estatisticas["Faixa_Taxa_Vitoria"] = pd.cut(
+    faixas = pd.cut(
         df_estatisticas["Taxa_Vitoria(%)"].fillna(0),
-        bins=bins,
-        labels=labels,
+        bins=FAIXAS_TAXA,
+        labels=ROTULOS_FAIXAS,
         include_lowest=True,
     )
     dist = (
-        df_estatisticas["Faixa_Taxa_Vitoria"]
+        faixas.rename("Faixa_Taxa_Vitoria")
         .value_counts(normalize=True)
-        .reindex(labels)
+        .reindex(ROTULOS_FAIXAS)
         .fillna(0)
         .reset_index()
     )
@@ -246,59 +427,36 @@ def analisar_tipo(df_estatisticas, df_atributos):
 
 # ------------------ Ajuste final de limpeza ------------------ #
 
-def inicializar_dados():
-    """Carrega tabelas analíticas existentes ou gera se necessário."""
-    # Carregar tudo o que existir
-    top10_vitorias = carregar_tabela("top10_vitorias")
-    top10_derrotas = carregar_tabela("top10_derrotas")
-    top10_taxa = carregar_tabela("top10_taxa_vitoria")
-    correlacoes = carregar_tabela("correlacao_atributos_vitorias")
-    distribuicao = carregar_tabela("distribuicao_taxa_vitoria")
-    ranking_tipos = carregar_tabela("ranking_tipos_vitoria")
-    comparativo = carregar_tabela("comparativo_atributos_top10")
-    df_top10_attr = carregar_tabela("atributos_top10_vencedores")
-    df_attr_geral = carregar_tabela("atributos_pokemon")
-
-    if df_attr_geral is None:
-        logging.info("Base de atributos não encontrada. Abortando.")
-        return None
-
-    df_completo = carregar_tabela("combates_com_nomes")
-    if df_completo is None:
-        df_completo = combinar_tabelas()
-
-    df_estatisticas = carregar_tabela("estatisticas_pokemon")
-    if df_estatisticas is None and df_completo is not None:
-        df_estatisticas = gerar_estatisticas(df_completo)
-
-    if top10_vitorias is None or top10_derrotas is None:
-        top10_vitorias, top10_derrotas = analisar_top10(df_estatisticas)
-
-    if top10_taxa is None:
-        top10_taxa = analisar_top10_taxa_vitoria(df_estatisticas)
-
-    if df_top10_attr is None or comparativo is None:
-        df_top10_attr, comparativo, df_attr_geral = analisar_atributos_top10(
-            top10_vitorias
-        )
-
-    if correlacoes is None:
-        correlacoes = analisar_correlacao(df_estatisticas, df_attr_geral)
+def inicializar_dados(recalcular: bool = False):
+    """
+    Carrega as tabelas analíticas, reprocessando apenas os estágios cujas
+    entradas mudaram desde a última execução (ver src/estagios_analise.py).
 
-    if distribuicao is None:
-        distribuicao = analisar_distribuicao_taxa(df_estatisticas)
+    Args:
+        recalcular (bool): Reexecuta todos os estágios, ignorando o cache.
+    """
+    # Import local: estagios_analise depende das funções deste módulo
+    from src.estagios_analise import executar_estagios
+
+    tabelas_retorno = [
+        "top10_vitorias",
+        "top10_derrotas",
+        "top10_taxa_vitoria",
+        "correlacao_atributos_vitorias",
+        "distribuicao_taxa_vitoria",
+        "ranking_tipos_vitoria",
+        "atributos_top10_vencedores",
+        "comparativo_atributos_top10",
+        "atributos_pokemon",
+    ]
+    try:
+        tabelas = executar_estagios(recalcular=recalcular, carregar=tabelas_retorno)
+    except LookupError as e:
+        logging.info(f"{e} Abortando.")
+        return None
 
-    if ranking_tipos is None:
-        ranking_tipos = analisar_tipo(df_estatisticas, df_attr_geral)
+    if tabelas["atributos_pokemon"] is None:
+        logging.info("Base de atributos não encontrada. Abortando.")
+        return None
 
-    return (
-        top10_vitorias,
-        top10_derrotas,
-        top10_taxa,
-        correlacoes,
-        distribuicao,
-        ranking_tipos,
-        df_top10_attr,
-        comparativo,
-        df_attr_geral,
-    )
+    return tuple(tabelas[t] for t in tabelas_retorno)
@@ -0,0 +1,426 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+from flask import Flask, Response, jsonify, request
+
+from src.cache_compartilhado import tabela_para_bytes
+from src.analisar_dados_banco import carregar_tabelas
+from src.carga_dashboard import TABELAS_DASHBOARD
+from src.historico_combates import (
+    TAMANHO_MAXIMO,
+    TAMANHO_PAGINA,
+    pagina_historico,
+    proximo_id_combate,
+)
+from src.indice_pokemon import IndiceConfrontos, IndicePokemon, construir_indice_pokemon
+from src.snapshot_dados import (
+    PASTA_SNAPSHOTS,
+    ler_tabela_snapshot,
+    manifesto_snapshot,
+    para_pandas,
+    versao_snapshot,
+    versoes_tabelas,
+)
+
+logging.basicConfig(level=logging.INFO)
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORTA = int(os.getenv("API_PORTA", "8600"))
+# Intervalo (s) entre consultas à versão publicada do snapshot
+API_VERSAO_TTL = float(os.getenv("API_VERSAO_TTL", "5"))
+# Respostas prontas mantidas em memória (por versão dos dados)
+API_CACHE_RESPOSTAS = int(os.getenv("API_CACHE_RESPOSTAS", "4096"))
+# max-age do Cache-Control (s); depois disso o cliente revalida pelo ETag
+API_MAX_AGE = int(os.getenv("API_MAX_AGE", "60"))
+# Itens por requisição nos endpoints em lote
+API_LOTE_MAX = int(os.getenv("API_LOTE_MAX", "500"))
+
+# Prefixo das versões lidas do banco (sem snapshot): "banco:<impressão>"
+VERSAO_BANCO = "banco"
+
+TIPO_JSON = "application/json"
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+
+TABELAS_RANKINGS = [
+    "top10_vitorias",
+    "top10_derrotas",
+    "top10_taxa_vitoria",
+    "ranking_tipos_vitoria",
+]
+
+
+# ------------------ Dados em memória ------------------ #
+
+
+@dataclass(frozen=True)
+class EstadoAPI:
+    """
+    Uma versão dos dados servida pela API.
+
+    versao: execução do pipeline (snapshot) ou "banco:..."; versoes: impressão de
+    cada tabela; tabelas: DataFrames somente leitura; indice e confrontos:
+    buscas por Pokémon e por par, montadas uma vez por versão.
+    """
+
+    versao: str
+    versoes: dict
+    tabelas: dict
+    indice: IndicePokemon
+    confrontos: IndiceConfrontos
+
+
+def _montar_estado(versao: str, versoes: dict, tabelas: dict) -> EstadoAPI:
+    return EstadoAPI(
+        versao=versao,
+        versoes=versoes,
+        tabelas=tabelas,
+        indice=construir_indice_pokemon(
+            tabelas["atributos_pokemon"],
+            tabelas.get("estatisticas_pokemon"),
+            tabelas.get("intervalos_taxa_vitoria"),
+        ),
+        confrontos=IndiceConfrontos(tabelas.get("confrontos_diretos")),
+    )
+
+
+class FonteDados:
+    """
+    Mantém o EstadoAPI da versão publicada mais recente.
+
+    A versão do snapshot (arquivo ATUAL) é consultada no máximo a cada
+    'intervalo' segundos; entre consultas, cada requisição só lê um atributo.
+    Numa versão nova, só as tabelas cuja impressão mudou são relidas. Sem
+    snapshot, a versão vem do registro de impressões do DAG no banco e as
+    tabelas alteradas são relidas do banco (somente leitura).
+    """
+
+    def __init__(self, pasta: str = PASTA_SNAPSHOTS, intervalo: float = API_VERSAO_TTL):
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self.trava = threading.Lock()
+        self._estado = None
+        self._proxima_consulta = 0.0
+
+    def estado(self) -> EstadoAPI:
+        if self._estado is not None and time.monotonic() < self._proxima_consulta:
+            return self._estado
+        with self.trava:
+            if self._estado is None or time.monotonic() >= self._proxima_consulta:
+                try:
+                    self._atualizar()
+                finally:
+                    self._proxima_consulta = time.monotonic() + self.intervalo
+        if self._estado is None:
+            raise LookupError("Nenhum dado analítico disponível.")
+        return self._estado
+
+    def _atualizar(self):
+        versao = versao_snapshot(self.pasta)
+        manifesto = manifesto_snapshot(self.pasta, versao) if versao else None
+        if manifesto is None:
+            self._atualizar_banco()
+            return
+        if self._estado is not None and self._estado.versao == manifesto["versao"]:
+            return
+
+        def ler_snapshot(nomes):
+            tabelas = {}
+            for nome in nomes:
+                tabela = ler_tabela_snapshot(nome, versoes.get(nome), self.pasta)
+                tabelas[nome] = para_pandas(tabela) if tabela is not None else None
+            return tabelas
+
+        versoes = versoes_tabelas(manifesto)
+        self._trocar_estado(manifesto["versao"], versoes, ler_snapshot)
+
+    def _atualizar_banco(self):
+        # Import local: estagios_analise importa o DAG inteiro de análises
+        from src.estagios_analise import carregar_registro
+
+        registro = carregar_registro()
+        versoes = {
+            nome: f"{VERSAO_BANCO}:{registro.get(nome, {}).get('impressao')}"
+            for nome in TABELAS_DASHBOARD
+        }
+        resumo = hashlib.sha256(repr(sorted(versoes.items())).encode("utf-8")).hexdigest()
+        versao = f"{VERSAO_BANCO}:{resumo[:16]}"
+        if self._estado is not None and self._estado.versao == versao:
+            return
+        self._trocar_estado(versao, versoes, lambda nomes: carregar_tabelas(nomes)[0])
+
+    def _trocar_estado(self, versao: str, versoes: dict, ler_tabelas):
+        """Monta o estado da versão nova relendo só as tabelas alteradas."""
+        anterior = self._estado
+        tabelas, alteradas = {}, []
+        for nome in TABELAS_DASHBOARD:
+            if anterior is not None and anterior.versoes.get(nome) == versoes.get(nome):
+                tabelas[nome] = anterior.tabelas.get(nome)
+            else:
+                alteradas.append(nome)
+        if alteradas:
+            tabelas.update(ler_tabelas(alteradas))
+
+        if tabelas.get("atributos_pokemon") is None:
+            logging.warning(f"Versão {versao} sem base de atributos; ignorada.")
+            return
+        self._estado = _montar_estado(versao, versoes, tabelas)
+        logging.info(f"API servindo a versão {versao} ({len(alteradas)} tabelas lidas)")
+
+
+# ------------------ Respostas em cache ------------------ #
+
+
+@dataclass(frozen=True)
+class Resposta:
+    corpo: bytes
+    tipo: str
+    etag: str
+    status: int = 200
+
+
+class CacheRespostas:
+    """
+    LRU em memória de respostas já serializadas (corpo e ETag).
+
+    As chaves valem para uma versão dos dados: quando a versão muda, o cache
+    é esvaziado. Uma requisição repetida não serializa nada de novo.
+    """
+
+    def __init__(self, maximo: int = API_CACHE_RESPOSTAS):
+        self.maximo = maximo
+        self.trava = threading.Lock()
+        self.versao = None
+        self.itens = OrderedDict()
+
+    def obter_ou_gerar(self, versao: str, chave: tuple, gerar) -> Resposta:
+        with self.trava:
+            if versao != self.versao:
+                self.itens.clear()
+                self.versao = versao
+            resposta = self.itens.get(chave)
+            if resposta is not None:
+                self.itens.move_to_end(chave)
+                return resposta
+
+        resposta = gerar()
+        with self.trava:
+            if versao == self.versao:
+                self.itens[chave] = resposta
+                while len(self.itens) > self.maximo:
+                    self.itens.popitem(last=False)
+        return resposta
+
+
+def _serializar(dados, formato: str) -> Resposta:
+    """
+    DataFrame (JSON em registros ou Arrow IPC) ou objeto JSON como Resposta;
+    None vira 404.
+    """
+    if dados is None:
+        corpo = json.dumps({"erro": "Não encontrado."}, ensure_ascii=False).encode("utf-8")
+        return Resposta(corpo=corpo, tipo=TIPO_JSON, etag="", status=404)
+    if isinstance(dados, pd.DataFrame) and formato == "arrow":
+        corpo, tipo = tabela_para_bytes(dados), TIPO_ARROW
+    else:
+        if isinstance(dados, pd.DataFrame):
+            dados = _registros(dados)
+        corpo, tipo = json.dumps(dados, ensure_ascii=False).encode("utf-8"), TIPO_JSON
+    return Resposta(corpo=corpo, tipo=tipo, etag=hashlib.sha1(corpo).hexdigest()[:20])
+
+
+def _registros(df: pd.DataFrame) -> list:
+    """Linhas como dicionários (NaN vira null), via o conversor JSON do pandas."""
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def _formato() -> str:
+    """'arrow' via ?formato=arrow ou cabeçalho Accept; senão 'json'."""
+    formato = request.args.get("formato")
+    if formato:
+        return formato.lower()
+    melhor = request.accept_mimetypes.best_match([TIPO_JSON, TIPO_ARROW], default=TIPO_JSON)
+    return "arrow" if melhor == TIPO_ARROW else "json"
+
+
+# ------------------ Consultas ------------------ #
+
+
+def _dados_pokemon(estado: EstadoAPI, nome: str):
+    """Atributos, estatísticas e intervalos de um Pokémon (None se não existir)."""
+    atributos = estado.indice.atributos(nome)
+    if atributos.empty:
+        return None
+    dados = {"Nome": nome, "atributos": _registros(atributos)[0]}
+    for campo, serie in [
+        ("estatisticas", estado.indice.estatisticas(nome)),
+        ("intervalo", estado.indice.intervalo(nome)),
+    ]:
+        dados[campo] = json.loads(serie.to_json()) if serie is not None else None
+    return dados
+
+
+def _dados_duelo(estado: EstadoAPI, pokemon1: str, pokemon2: str) -> dict:
+    vitorias1, vitorias2, total = estado.confrontos.duelo(pokemon1, pokemon2)
+    return {
+        "pokemon1": pokemon1,
+        "pokemon2": pokemon2,
+        "vitorias_pokemon1": vitorias1,
+        "vitorias_pokemon2": vitorias2,
+        "total": total,
+    }
+
+
+def _dados_historico(pokemon: str, apos: int, tamanho: int) -> dict:
+    pagina = pagina_historico(pokemon, apos=apos, tamanho=tamanho)
+    return {
+        "pokemon": pokemon,
+        "combates": _registros(pagina.linhas),
+        "proximo": pagina.proximo,
+    }
+
+
+# ------------------ Aplicação ------------------ #
+
+
+def criar_app(fonte: FonteDados = None) -> Flask:
+    """
+    API HTTP somente leitura das análises (JSON ou Arrow).
+
+    Toda resposta de dados leva ETag e Cache-Control; requisições com
+    If-None-Match recebem 304 sem corpo. Exceto o histórico de combates
+    (paginado no banco), nenhuma rota consulta o banco: os dados vêm do
+    snapshot publicado pelo pipeline, mantido em memória.
+    """
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    fonte = fonte or FonteDados()
+    respostas = CacheRespostas()
+
+    def responder(chave: tuple, gerar, formato: str = "json"):
+        try:
+            estado = fonte.estado()
+        except LookupError as e:
+            return jsonify(erro=str(e)), 503
+        resposta = respostas.obter_ou_gerar(
+            estado.versao, (*chave, formato), lambda: _serializar(gerar(estado), formato)
+        )
+        r = Response(resposta.corpo, status=resposta.status, content_type=resposta.tipo)
+        r.headers["X-Versao-Dados"] = estado.versao
+        if resposta.status != 200:
+            return r
+        r.set_etag(resposta.etag)
+        r.headers["Cache-Control"] = f"public, max-age={API_MAX_AGE}"
+        return r.make_conditional(request)
+
+    @app.get("/api/versao")
+    def versao():
+        def gerar(estado):
+            return {
+                "versao": estado.versao,
+                "tabelas": {
+                    nome: {
+                        "versao": estado.versoes.get(nome),
+                        "linhas": None if df is None else len(df),
+                    }
+                    for nome, df in estado.tabelas.items()
+                },
+            }
+
+        return responder(("versao",), gerar)
+
+    @app.get("/api/tabelas/<nome>")
+    def tabela(nome):
+        if nome not in TABELAS_DASHBOARD:
+            return jsonify(erro=f"Tabela desconhecida: {nome}"), 404
+
+        return responder(("tabela", nome), lambda estado: estado.tabelas.get(nome), _formato())
+
+    @app.get("/api/rankings")
+    def rankings():
+        def gerar(estado):
+            return {
+                nome: _registros(estado.tabelas[nome])
+                for nome in TABELAS_RANKINGS
+                if estado.tabelas.get(nome) is not None
+            }
+
+        return responder(("rankings",), gerar)
+
+    @app.get("/api/pokemon/<nome>")
+    def pokemon(nome):
+        return responder(("pokemon", nome), lambda estado: _dados_pokemon(estado, nome))
+
+    @app.get("/api/duelos/<pokemon1>/<pokemon2>")
+    def duelo(pokemon1, pokemon2):
+        return responder(
+            ("duelo", pokemon1, pokemon2),
+            lambda estado: _dados_duelo(estado, pokemon1, pokemon2),
+        )
+
+    @app.get("/api/historico/<nome>")
+    def historico(nome):
+        try:
+            apos = int(request.args.get("apos", 0))
+            tamanho = int(request.args.get("tamanho", TAMANHO_PAGINA))
+        except ValueError:
+            return jsonify(erro="'apos' e 'tamanho' devem ser inteiros."), 400
+        if tamanho < 1:
+            return jsonify(erro="'tamanho' deve ser maior que zero."), 400
+        tamanho = min(tamanho, TAMANHO_MAXIMO)
+        try:
+            # O histórico vem do banco, não do snapshot: a chave inclui o
+            # próximo id_combate, e combates novos não servem páginas antigas
+            return responder(
+                ("historico", nome, apos, tamanho, proximo_id_combate()),
+                lambda estado: _dados_historico(nome, apos, tamanho),
+            )
+        except Exception as e:
+            logging.warning(f"Histórico de '{nome}' indisponível: {e}")
+            return jsonify(erro="Histórico indisponível no momento."), 503
+
+    @app.post("/api/lote")
+    def lote():
+        """
+        Várias consultas numa requisição:
+        {"pokemon": [nomes], "duelos": [[pokemon1, pokemon2], ...]}.
+        """
+        corpo = request.get_json(silent=True)
+        if not isinstance(corpo, dict):
+            return jsonify(erro="O corpo deve ser um objeto JSON."), 400
+        nomes = corpo.get("pokemon") or []
+        pares = corpo.get("duelos") or []
+        if not isinstance(nomes, list) or not all(isinstance(n, str) for n in nomes):
+            return jsonify(erro="'pokemon' deve ser uma lista de nomes."), 400
+        if not isinstance(pares, list) or not all(
+            isinstance(par, list) and len(par) == 2 and all(isinstance(p, str) for p in par)
+            for par in pares
+        ):
+            return jsonify(erro="Cada duelo deve ser um par [pokemon1, pokemon2]."), 400
+        if len(nomes) + len(pares) > API_LOTE_MAX:
+            return jsonify(erro=f"No máximo {API_LOTE_MAX} itens por lote."), 413
+        try:
+            estado = fonte.estado()
+        except LookupError as e:
+            return jsonify(erro=str(e)), 503
+        r = jsonify(
+            versao=estado.versao,
+            pokemon={nome: _dados_pokemon(estado, nome) for nome in nomes},
+            duelos=[_dados_duelo(estado, p1, p2) for p1, p2 in pares],
+        )
+        r.headers["X-Versao-Dados"] = estado.versao
+        return r
+
+    return app
+
+
+if __name__ == "__main__":
+    # Servidor de desenvolvimento; em produção, use um servidor WSGI com
+    # várias threads/processos apontando para criar_app()
+    criar_app().run(host=API_HOST, port=API_PORTA, threaded=True)
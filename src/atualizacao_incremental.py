@@ -0,0 +1,202 @@
+import logging
+
+import pandas as pd
+
+from src.analisar_dados_banco import (
+    acompanhar_gravacoes,
+    carregar_tabela,
+    salvar_tabelas_transacao,
+    adicionar_nomes,
+    contar_estatisticas,
+    finalizar_estatisticas,
+    contar_confrontos,
+    analisar_top10,
+    analisar_top10_taxa_vitoria,
+    analisar_atributos_top10,
+    analisar_correlacao,
+    analisar_distribuicao_taxa,
+    analisar_tipo,
+)
+from src.agregacao_distribuida import analisar_confrontos_tipos
+from src.historico_combates import proximo_id_combate
+from src.estagios_analise import (
+    carregar_registro,
+    impressao_encadeada,
+    marcar_estagios_atualizados,
+)
+
+logging.basicConfig(level=logging.INFO)
+
+COLUNAS_COMBATE = ["first_pokemon", "second_pokemon", "winner"]
+
+
+# ------------------ Identificação do delta ------------------ #
+
+
+def identificar_delta(df_novo: pd.DataFrame, df_anterior: pd.DataFrame):
+    """
+    Separa os combates novos comparando a carga atual com a anterior.
+
+    Args:
+        df_novo (pd.DataFrame): Combates da execução atual (sem duplicados).
+        df_anterior (pd.DataFrame): Combates já carregados no banco.
+
+    Returns:
+        pd.DataFrame ou None: Apenas os combates novos, ou None quando a
+        atualização incremental não é possível (sem carga anterior ou com
+        combates removidos desde a última execução).
+    """
+    if df_anterior is None or df_anterior.empty:
+        logging.info("Sem carga anterior de combates: atualização completa.")
+        return None
+
+    comparacao = df_novo[COLUNAS_COMBATE].merge(
+        df_anterior[COLUNAS_COMBATE].drop_duplicates(),
+        on=COLUNAS_COMBATE,
+        how="outer",
+        indicator=True,
+    )
+    removidos = (comparacao["_merge"] == "right_only").sum()
+    if removidos:
+        logging.warning(
+            f"{removidos} combates anteriores não aparecem na nova carga: "
+            "atualização completa."
+        )
+        return None
+
+    delta = comparacao.loc[comparacao["_merge"] == "left_only", COLUNAS_COMBATE]
+    logging.info(f"Delta de combates identificado: {len(delta)} novos registros")
+    return delta.reset_index(drop=True)
+
+
+# ------------------ Soma de agregados ------------------ #
+
+
+def somar_estatisticas(df_estatisticas: pd.DataFrame, contagens: pd.DataFrame):
+    """Soma contagens de lutas/vitórias do delta às estatísticas existentes."""
+    total = (
+        pd.concat([df_estatisticas[["Pokemon", "Lutas", "Vitorias"]], contagens])
+        .groupby("Pokemon", sort=False)[["Lutas", "Vitorias"]]
+        .sum()
+        .reset_index()
+    )
+    return finalizar_estatisticas(total)
+
+
+def somar_confrontos(df_confrontos: pd.DataFrame, delta_confrontos: pd.DataFrame):
+    """Soma contagens de confrontos diretos do delta às existentes."""
+    return (
+        pd.concat([df_confrontos, delta_confrontos])
+        .groupby(["Pokemon_A", "Pokemon_B"], sort=False)[
+            ["Lutas", "Vitorias_A", "Vitorias_B"]
+        ]
+        .sum()
+        .reset_index()
+    )
+
+
+# ------------------ Atualização incremental ------------------ #
+
+
+def aplicar_delta_combates(df_delta: pd.DataFrame):
+    """
+    Aplica um lote de combates novos às tabelas analíticas sem reprocessar o histórico.
+
+    'combates_com_nomes' recebe apenas as linhas novas (append); estatísticas e
+    confrontos diretos são somados ao que já existe; top10, distribuição,
+    correlação e ranking de tipos são recalculados a partir das estatísticas,
+    que têm uma linha por Pokémon, e os confrontos por tipo a partir dos
+    confrontos diretos.
+
+    Args:
+        df_delta (pd.DataFrame): Combates novos (first_pokemon, second_pokemon, winner).
+
+    Returns:
+        tuple ou None: Mesma tupla de inicializar_dados(), ou None quando as
+        tabelas agregadas não existem e é preciso uma carga completa.
+    """
+    df_attr = carregar_tabela("atributos_pokemon")
+    df_estatisticas = carregar_tabela("estatisticas_pokemon")
+    df_confrontos = carregar_tabela("confrontos_diretos")
+
+    if df_attr is None or df_estatisticas is None or df_confrontos is None:
+        logging.warning("Agregados ausentes; atualização incremental indisponível.")
+        return None
+
+    df_delta = df_delta.copy()
+    if "inserido_em" not in df_delta.columns:
+        df_delta["inserido_em"] = pd.Timestamp.utcnow()  # mesmo esquema de 'combates'
+
+    atualizadas = {}
+    if not df_delta.empty:
+        try:
+            primeiro_id = proximo_id_combate()
+        except Exception as e:
+            logging.warning(f"id_combate indisponível ({e}); atualização completa.")
+            return None
+        delta_nomes = adicionar_nomes(df_delta, df_attr, primeiro_id=primeiro_id)
+        df_estatisticas = somar_estatisticas(
+            df_estatisticas, contar_estatisticas(delta_nomes)
+        )
+        df_confrontos = somar_confrontos(df_confrontos, contar_confrontos(delta_nomes))
+
+        # Combates e agregados na mesma transação: uma falha no meio não
+        # deixa os agregados divergentes da tabela de combates
+        try:
+            salvar_tabelas_transacao(
+                [
+                    (delta_nomes, "combates_com_nomes", "append"),
+                    (df_estatisticas, "estatisticas_pokemon", "replace"),
+                    (df_confrontos, "confrontos_diretos", "replace"),
+                ]
+            )
+        except Exception as e:
+            logging.error(f"Falha ao gravar o delta ({e}); atualização completa.")
+            return None
+        anterior = carregar_registro().get("combates_com_nomes", {}).get("impressao")
+        atualizadas["combates_com_nomes"] = impressao_encadeada(anterior, delta_nomes)
+
+    logging.info(f"Delta de {len(df_delta)} combates aplicado aos agregados.")
+
+    with acompanhar_gravacoes() as falhas:
+        top10_vitorias, top10_derrotas = analisar_top10(df_estatisticas)
+        top10_taxa = analisar_top10_taxa_vitoria(df_estatisticas)
+        df_top10_attr, comparativo, _ = analisar_atributos_top10(top10_vitorias, df_attr)
+        if comparativo is not None:
+            comparativo = comparativo.reset_index().rename(columns={"index": "Atributo"})
+        correlacoes = analisar_correlacao(df_estatisticas, df_attr)
+        distribuicao = analisar_distribuicao_taxa(df_estatisticas)
+        ranking_tipos = analisar_tipo(df_estatisticas, df_attr)
+        confrontos_tipos = analisar_confrontos_tipos(df_confrontos, df_attr)
+
+    # As tabelas agora equivalem às que o DAG geraria para as fontes atuais
+    atualizadas.update(
+        {
+            "estatisticas_pokemon": df_estatisticas,
+            "confrontos_diretos": df_confrontos,
+            "top10_vitorias": top10_vitorias,
+            "top10_derrotas": top10_derrotas,
+            "top10_taxa_vitoria": top10_taxa,
+            "atributos_top10_vencedores": df_top10_attr,
+            "comparativo_atributos_top10": comparativo,
+            "correlacao_atributos_vitorias": correlacoes,
+            "distribuicao_taxa_vitoria": distribuicao,
+            "ranking_tipos_vitoria": ranking_tipos,
+            "confrontos_tipos": confrontos_tipos,
+        }
+    )
+    for tabela in falhas:
+        atualizadas.pop(tabela, None)  # não gravada: o DAG a refaz depois
+    marcar_estagios_atualizados(atualizadas)
+
+    return (
+        top10_vitorias,
+        top10_derrotas,
+        top10_taxa,
+        correlacoes,
+        distribuicao,
+        ranking_tipos,
+        df_top10_attr,
+        comparativo,
+        df_attr,
+    )
@@ -1,4 +1,5 @@
 import os
+import threading
 from urllib.parse import quote_plus
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
@@ -6,10 +7,16 @@ from dotenv import load_dotenv
 # Carrega variáveis de ambiente do arquivo .env
 load_dotenv()
 
+# Engines já criados, por URL: cada engine mantém seu pool de conexões, então
+# reaproveitá-lo evita abrir uma conexão nova a cada leitura ou gravação
+_ENGINES = {}
+_TRAVA_ENGINES = threading.Lock()
+
 
 def obter_engine():
     """
-    Cria e retorna um engine SQLAlchemy configurado para o banco de dados PostgreSQL.
+    Retorna o engine SQLAlchemy configurado para o banco de dados PostgreSQL.
+    O engine é criado uma vez por URL e reaproveitado nas chamadas seguintes.
     As variáveis de ambiente necessárias são:
         - POSTGRES_USERNAME: Nome de usuário do banco de dados
         - POSTGRES_PASSWORD: Senha do banco de dados
@@ -44,6 +51,8 @@ def obter_engine():
     # Constrói a URL de conexão
     DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}{REQUISITOS_SSL}"
 
-    # Cria e retorna o engine SQLAlchemy
-    engine = create_engine(DATABASE_URL)
-    return engine
+    # Cria o engine SQLAlchemy na primeira chamada e o reaproveita depois
+    with _TRAVA_ENGINES:
+        if DATABASE_URL not in _ENGINES:
+            _ENGINES[DATABASE_URL] = create_engine(DATABASE_URL, pool_pre_ping=True)
+        return _ENGINES[DATABASE_URL]
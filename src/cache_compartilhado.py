@@ -0,0 +1,218 @@
+import hashlib
+import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from src.snapshot_dados import para_pandas
+
+logging.basicConfig(level=logging.INFO)
+
+# Cache compartilhado entre réplicas do dashboard. Vazio: desativado;
+# caminho (ou file:///caminho): pasta em disco compartilhada; redis://...:
+# servidor Redis (ou compatível), exige o pacote 'redis'
+CACHE_COMPARTILHADO_URL = os.getenv("CACHE_COMPARTILHADO_URL", "")
+CACHE_COMPARTILHADO_TTL = int(os.getenv("CACHE_COMPARTILHADO_TTL", "86400"))
+# Tempo máximo (s) de espera por outra réplica que já está calculando a chave
+CACHE_COMPARTILHADO_ESPERA = float(os.getenv("CACHE_COMPARTILHADO_ESPERA", "30"))
+# Validade (s) da trava de cálculo: maior que o cálculo mais demorado, para
+# que outra réplica só a tome se quem a criou tiver caído no meio
+CACHE_COMPARTILHADO_TRAVA = float(os.getenv("CACHE_COMPARTILHADO_TRAVA", "900"))
+
+PREFIXO = "pokemon:dashboard:"
+
+
+# ------------------ Serialização ------------------ #
+
+
+def tabela_para_bytes(df: pd.DataFrame) -> bytes:
+    """DataFrame em Arrow IPC (formato stream), com o índice nos metadados."""
+    tabela = pa.Table.from_pandas(df)
+    saida = pa.BufferOutputStream()
+    with pa.ipc.new_stream(saida, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return saida.getvalue().to_pybytes()
+
+
+def bytes_para_tabela(dados: bytes) -> pd.DataFrame:
+    """Inverso de tabela_para_bytes (colunas somente leitura, ver para_pandas)."""
+    return para_pandas(pa.ipc.open_stream(pa.py_buffer(dados)).read_all())
+
+
+def chave_cache(tipo: str, *partes) -> str:
+    """Chave do cache: tipo do dado + hash das partes que o identificam."""
+    resumo = hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()[:24]
+    return f"{PREFIXO}{tipo}:{resumo}"
+
+
+# ------------------ Backends ------------------ #
+
+
+class CacheDisco:
+    """
+    Backend em disco: um arquivo por chave numa pasta compartilhada (volume
+    montado em todas as réplicas). Entradas mais antigas que o TTL contam
+    como ausentes e são apagadas na gravação seguinte; travas são arquivos
+    criados com O_EXCL.
+    """
+
+    def __init__(self, pasta: str):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+
+    def _arquivo(self, chave: str) -> str:
+        return os.path.join(self.pasta, chave.replace(":", "_"))
+
+    def obter(self, chave: str, ttl: int = CACHE_COMPARTILHADO_TTL):
+        arquivo = self._arquivo(chave)
+        try:
+            if time.time() - os.path.getmtime(arquivo) > ttl:
+                return None
+            with open(arquivo, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def salvar(self, chave: str, dados: bytes, ttl: int = CACHE_COMPARTILHADO_TTL):
+        arquivo = self._arquivo(chave)
+        temporario = f"{arquivo}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(dados)
+        os.replace(temporario, arquivo)
+        self._remover_expiradas(ttl)
+
+    def _remover_expiradas(self, ttl: int):
+        limite = time.time() - ttl
+        with os.scandir(self.pasta) as entradas:
+            for entrada in entradas:
+                if not entrada.name.startswith(PREFIXO.replace(":", "_")):
+                    continue
+                if entrada.name.endswith((".trava", ".tmp")):
+                    continue
+                try:
+                    if entrada.stat().st_mtime < limite:
+                        os.remove(entrada.path)
+                except OSError:
+                    pass  # já removida por outra réplica
+
+    def travar(self, chave: str, segundos: float) -> bool:
+        trava = f"{self._arquivo(chave)}.trava"
+        try:
+            # Trava abandonada (réplica que caiu no meio do cálculo)
+            if time.time() - os.path.getmtime(trava) > segundos:
+                os.remove(trava)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def liberar(self, chave: str):
+        try:
+            os.remove(f"{self._arquivo(chave)}.trava")
+        except OSError:
+            pass
+
+
+class CacheRedis:
+    """Backend Redis (ou compatível): TTL e travas (SET NX EX) do próprio servidor."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "CACHE_COMPARTILHADO_URL aponta para Redis, mas o pacote 'redis' "
+                "não está instalado: pip install redis"
+            ) from e
+        self.cliente = redis.Redis.from_url(url)
+
+    def obter(self, chave: str, ttl: int = CACHE_COMPARTILHADO_TTL):
+        return self.cliente.get(chave)
+
+    def salvar(self, chave: str, dados: bytes, ttl: int = CACHE_COMPARTILHADO_TTL):
+        self.cliente.set(chave, dados, ex=ttl)
+
+    def travar(self, chave: str, segundos: float) -> bool:
+        return bool(self.cliente.set(f"{chave}:trava", b"1", nx=True, ex=max(1, int(segundos))))
+
+    def liberar(self, chave: str):
+        self.cliente.delete(f"{chave}:trava")
+
+
+def abrir_cache(url: str = CACHE_COMPARTILHADO_URL):
+    """Backend configurado em 'url', ou None se o cache compartilhado estiver desativado."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return CacheRedis(url)
+    return CacheDisco(url.removeprefix("file://"))
+
+
+# ------------------ Leitura com cálculo único ------------------ #
+
+
+def obter_ou_calcular(
+    cache,
+    chave: str,
+    calcular,
+    ttl: int = CACHE_COMPARTILHADO_TTL,
+    espera: float = CACHE_COMPARTILHADO_ESPERA,
+    trava: float = CACHE_COMPARTILHADO_TRAVA,
+):
+    """
+    Lê o DataFrame 'chave' do cache; na falta, só uma réplica o calcula.
+
+    A réplica que obtém a trava executa calcular() e grava o resultado; as
+    outras aguardam até 'espera' segundos pelo valor em vez de repetirem a
+    consulta ao banco (evita a avalanche de leituras após um deploy). A trava
+    vale 'trava' segundos, independente da espera, para não expirar durante
+    um cálculo longo. Falhas do cache nunca impedem o cálculo: o valor é
+    calculado localmente.
+
+    Args:
+        cache: Backend de abrir_cache(), ou None (calcula direto).
+        chave (str): Chave de chave_cache().
+        calcular (callable): Função sem argumentos que retorna o DataFrame (ou None).
+    """
+    if cache is None:
+        return calcular()
+
+    prazo = time.monotonic() + espera
+    try:
+        while True:
+            dados = cache.obter(chave, ttl)
+            if dados is not None:
+                return bytes_para_tabela(dados)
+            if cache.travar(chave, trava):
+                # Outra réplica pode ter gravado entre a leitura e a trava
+                dados = cache.obter(chave, ttl)
+                if dados is not None:
+                    cache.liberar(chave)
+                    return bytes_para_tabela(dados)
+                break
+            if time.monotonic() > prazo:
+                logging.warning(f"Tempo esgotado aguardando '{chave}'; calculando localmente.")
+                return calcular()
+            time.sleep(0.2)
+    except Exception as e:
+        logging.warning(f"Cache compartilhado indisponível ({e}); calculando localmente.")
+        return calcular()
+
+    try:
+        df = calcular()
+        if df is not None:
+            try:
+                cache.salvar(chave, tabela_para_bytes(df), ttl)
+            except Exception as e:
+                logging.warning(f"Não foi possível gravar '{chave}' no cache compartilhado: {e}")
+        return df
+    finally:
+        try:
+            cache.liberar(chave)
+        except Exception:
+            pass
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+import matplotlib
+
+matplotlib.use("Agg")  # backend sem dependência de Tcl/Tk
+import matplotlib.pyplot as plt
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+
+CACHE_GRAFICOS_DIR = os.getenv(
+    "CACHE_GRAFICOS_DIR", os.path.join(os.getenv("REPORT_DIR", "report"), ".cache_graficos")
+)
+CACHE_GRAFICOS_MB = float(os.getenv("CACHE_GRAFICOS_MB", "50"))
+
+# Incrementar ao mudar o código de desenho dos gráficos (invalida o cache)
+VERSAO_GRAFICOS = 1
+
+
+class CacheGraficos:
+    """
+    Cache em disco de imagens renderizadas, endereçado pelo conteúdo.
+
+    Cada arquivo é nomeado pela chave (hash das entradas do gráfico). Leituras
+    atualizam a data de modificação; ao gravar, os arquivos menos usados
+    recentemente são removidos até o total caber em 'limite_bytes'.
+    """
+
+    def __init__(self, pasta: str = CACHE_GRAFICOS_DIR, limite_mb: float = CACHE_GRAFICOS_MB):
+        self.pasta = pasta
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.acertos = 0
+        self.falhas = 0
+
+    def _arquivo(self, chave: str, formato: str) -> str:
+        return os.path.join(self.pasta, f"{chave}.{formato}")
+
+    def obter(self, chave: str, formato: str = "png"):
+        arquivo = self._arquivo(chave, formato)
+        # Outro processo pode remover o arquivo (remover_excedente) entre a
+        # leitura e o utime: qualquer falha aqui conta como ausência no cache
+        try:
+            with open(arquivo, "rb") as f:
+                conteudo = f.read()
+            os.utime(arquivo)
+        except OSError:
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return conteudo
+
+    def salvar(self, chave: str, conteudo: bytes, formato: str = "png"):
+        os.makedirs(self.pasta, exist_ok=True)
+        arquivo = self._arquivo(chave, formato)
+        temporario = f"{arquivo}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, arquivo)  # atômico: vários processos podem gravar
+        self.remover_excedente()
+
+    def remover_excedente(self):
+        """Remove os arquivos usados há mais tempo até respeitar o limite."""
+        entradas = []
+        with os.scandir(self.pasta) as it:
+            for e in it:
+                if e.is_file() and not e.name.endswith(".tmp"):
+                    try:
+                        info = e.stat()
+                    except FileNotFoundError:
+                        continue  # removido por outro processo
+                    entradas.append((info.st_mtime, info.st_size, e.path))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except OSError:
+                pass
+
+
+def chave_grafico(desenho: str, df: pd.DataFrame, **parametros) -> str:
+    """Chave do gráfico: desenho, versão, conteúdo do DataFrame e parâmetros."""
+    h = hashlib.sha256()
+    h.update(f"{desenho}|{VERSAO_GRAFICOS}|{matplotlib.__version__}".encode("utf-8"))
+    h.update(repr(sorted(parametros.items())).encode("utf-8"))
+    h.update("|".join(f"{c}:{t}" for c, t in df.dtypes.items()).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:32]
+
+
+def renderizar_grafico(
+    desenhar, df: pd.DataFrame, cache: CacheGraficos = None, figsize=(8, 4), formato="png", **parametros
+) -> bytes:
+    """
+    Renderiza desenhar(ax, df, **parametros) em PNG/SVG, reaproveitando o cache
+    quando o mesmo desenho já foi feito para o mesmo conteúdo.
+    """
+    chave = None
+    if cache is not None:
+        chave = chave_grafico(desenhar.__name__, df, figsize=figsize, formato=formato, **parametros)
+        conteudo = cache.obter(chave, formato)
+        if conteudo is not None:
+            return conteudo
+
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        desenhar(ax, df, **parametros)
+        buf = BytesIO()
+        fig.savefig(buf, format=formato, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+
+    conteudo = buf.getvalue()
+    if cache is not None:
+        # O cache é só uma otimização: pasta sem escrita, disco cheio ou
+        # arquivo removido por outro processo não impedem o gráfico
+        try:
+            cache.salvar(chave, conteudo, formato)
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar o gráfico no cache: {e}")
+    return conteudo
@@ -0,0 +1,123 @@
+import logging
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.analisar_dados_banco import carregar_tabelas
+
+logging.basicConfig(level=logging.INFO)
+
+# Tabelas usadas pelo dashboard, na ordem de PacoteDashboard
+TABELAS_ANALISES = [
+    "top10_vitorias",
+    "top10_derrotas",
+    "top10_taxa_vitoria",
+    "correlacao_atributos_vitorias",
+    "distribuicao_taxa_vitoria",
+    "ranking_tipos_vitoria",
+    "atributos_top10_vencedores",
+    "comparativo_atributos_top10",
+    "atributos_pokemon",
+]
+# Os combates individuais ficam de fora: duelos vêm de confrontos_diretos e o
+# histórico é paginado direto no banco (src/historico_combates.py)
+TABELAS_DETALHE = [
+    "estatisticas_pokemon",
+    "intervalos_taxa_vitoria",
+    "confrontos_diretos",
+    "modelo_confrontos",
+]
+TABELAS_DASHBOARD = TABELAS_ANALISES + TABELAS_DETALHE
+
+
+@dataclass(frozen=True)
+class PacoteDashboard:
+    """
+    Todos os datasets do dashboard, lidos de uma vez (ver carregar_pacote_dashboard).
+
+    Tabelas ausentes no banco ficam como None. 'tempos' guarda a duração da
+    leitura de cada tabela lida do banco, em segundos.
+    """
+
+    top10_vitorias: pd.DataFrame
+    top10_derrotas: pd.DataFrame
+    top10_taxa_vitoria: pd.DataFrame
+    correlacao_atributos_vitorias: pd.DataFrame
+    distribuicao_taxa_vitoria: pd.DataFrame
+    ranking_tipos_vitoria: pd.DataFrame
+    atributos_top10_vencedores: pd.DataFrame
+    comparativo_atributos_top10: pd.DataFrame
+    atributos_pokemon: pd.DataFrame
+    estatisticas_pokemon: pd.DataFrame
+    intervalos_taxa_vitoria: pd.DataFrame
+    confrontos_diretos: pd.DataFrame
+    modelo_confrontos: pd.DataFrame
+    tempos: dict = field(default_factory=dict)
+
+    def analises(self) -> tuple:
+        """As tabelas na mesma ordem da tupla de inicializar_dados()."""
+        return tuple(getattr(self, t) for t in TABELAS_ANALISES)
+
+
+def ler_pacote_dashboard():
+    """
+    Lê, sem executar o DAG, as tabelas do dashboard já gravadas no banco.
+
+    Somente leitura: é o caminho usado por dashboard e API quando não há
+    snapshot publicado. Tabelas e registro de impressões são atualizados
+    apenas pelo pipeline (carregar_pacote_dashboard).
+
+    Returns:
+        PacoteDashboard ou None se a base de atributos não existir.
+    """
+    inicio = time.perf_counter()
+    tabelas, tempos = carregar_tabelas(TABELAS_DASHBOARD)
+    if tabelas.get("atributos_pokemon") is None:
+        logging.info("Base de atributos não encontrada. Abortando.")
+        return None
+
+    logging.info(
+        f"Pacote do dashboard lido do banco em {time.perf_counter() - inicio:.2f}s"
+    )
+    return PacoteDashboard(**{t: tabelas.get(t) for t in TABELAS_DASHBOARD}, tempos=tempos)
+
+
+def carregar_pacote_dashboard(recalcular: bool = False):
+    """
+    Atualiza os estágios analíticos e carrega todos os datasets do dashboard.
+
+    Primeiro atualiza os estágios analíticos desatualizados (o DAG só lê o
+    que precisa reprocessar); depois lê, numa só conexão e transação, todas
+    as tabelas que o DAG não deixou em memória. Grava tabelas e o registro
+    de impressões: uso exclusivo do pipeline (leitores: ler_pacote_dashboard).
+
+    Args:
+        recalcular (bool): Reexecuta todos os estágios, ignorando o cache.
+
+    Returns:
+        PacoteDashboard ou None se a base de atributos não existir.
+    """
+    # Import local: estagios_analise importa o DAG inteiro de análises
+    from src.estagios_analise import executar_estagios
+
+    inicio = time.perf_counter()
+    try:
+        tabelas = executar_estagios(recalcular=recalcular)
+    except LookupError as e:
+        logging.info(f"{e} Abortando.")
+        return None
+
+    faltantes = [t for t in TABELAS_DASHBOARD if t not in tabelas]
+    lidas, tempos = carregar_tabelas(faltantes) if faltantes else ({}, {})
+    tabelas.update(lidas)
+
+    if tabelas.get("atributos_pokemon") is None:
+        logging.info("Base de atributos não encontrada. Abortando.")
+        return None
+
+    logging.info(
+        f"Pacote do dashboard carregado em {time.perf_counter() - inicio:.2f}s "
+        f"({len(lidas)} tabelas lidas do banco)"
+    )
+    return PacoteDashboard(**{t: tabelas.get(t) for t in TABELAS_DASHBOARD}, tempos=tempos)
@@ -0,0 +1,169 @@
+import logging
+from itertools import combinations
+
+import pandas as pd
+
+from src.analisar_dados_banco import COLUNAS_ATRIBUTOS, FAIXAS_TAXA, ROTULOS_FAIXAS
+
+logging.basicConfig(level=logging.INFO)
+
+# Dimensões do cubo, na ordem canônica usada como chave dos cuboides
+DIMENSOES_CUBO = [
+    "Generation",
+    "Legendary",
+    "Tipo_Primario",
+    "Tipo_Secundario",
+    "Faixa_Taxa_Vitoria",
+]
+
+# Medidas aditivas: podem ser somadas em qualquer roll-up
+MEDIDAS_CUBO = ["Pokemons", "Lutas", "Vitorias", "Derrotas"] + [
+    f"Soma_{c}" for c in COLUNAS_ATRIBUTOS
+]
+
+SEM_TIPO = "(nenhum)"
+
+
+# ------------------ Preparação das dimensões ------------------ #
+
+
+def normalizar_dimensoes(df_attr: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza as colunas usadas como dimensão a partir de atributos_pokemon.
+
+    - Generation: extrai o número da geração ("Gen2" -> 2)
+    - Legendary: converte "true"/"false"/"No" para booleano
+    - Types: separa em Tipo_Primario e Tipo_Secundario ("Grass/Poison")
+    """
+    df = df_attr.copy()
+
+    df["Generation"] = pd.to_numeric(
+        df["Generation"].astype(str).str.extract(r"(\d+)", expand=False),
+        errors="coerce",
+    ).astype("Int64")
+
+    df["Legendary"] = (
+        df["Legendary"].astype(str).str.strip().str.lower().isin(["true", "1", "yes", "sim"])
+    )
+
+    tipos = df["Types"].fillna("").astype(str).str.split("/", n=1, expand=True)
+    tipos = tipos.reindex(columns=[0, 1])
+    df["Tipo_Primario"] = tipos[0].str.strip().replace("", SEM_TIPO).fillna(SEM_TIPO)
+    df["Tipo_Secundario"] = tipos[1].str.strip().replace("", SEM_TIPO).fillna(SEM_TIPO)
+    return df
+
+
+def _base_cubo(df_estatisticas: pd.DataFrame, df_attr: pd.DataFrame) -> pd.DataFrame:
+    """Junta estatísticas e atributos em uma linha por Pokémon com as dimensões do cubo."""
+    df = normalizar_dimensoes(df_attr)
+    colunas_est = ["Pokemon", "Lutas", "Vitorias", "Derrotas", "Taxa_Vitoria(%)"]
+    df = df.merge(
+        df_estatisticas[colunas_est], left_on="Nome", right_on="Pokemon", how="left"
+    )
+    for col in ["Lutas", "Vitorias", "Derrotas", "Taxa_Vitoria(%)"]:
+        df[col] = df[col].fillna(0)
+
+    df["Faixa_Taxa_Vitoria"] = pd.cut(
+        df["Taxa_Vitoria(%)"],
+        bins=FAIXAS_TAXA,
+        labels=ROTULOS_FAIXAS,
+        include_lowest=True,
+    ).astype(str)
+    df["Pokemons"] = 1
+    for c in COLUNAS_ATRIBUTOS:
+        df[f"Soma_{c}"] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+    return df
+
+
+def _derivar_medidas(cuboide: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta taxa de vitória e médias de atributos calculadas a partir das somas."""
+    lutas = cuboide["Lutas"].where(cuboide["Lutas"] > 0)
+    cuboide["Taxa_Vitoria(%)"] = (cuboide["Vitorias"] / lutas * 100).fillna(0).round(2)
+    for c in COLUNAS_ATRIBUTOS:
+        cuboide[f"Media_{c}"] = (cuboide[f"Soma_{c}"] / cuboide["Pokemons"]).round(2)
+    return cuboide
+
+
+# ------------------ Construção e consulta ------------------ #
+
+
+def construir_cubo(df_estatisticas: pd.DataFrame, df_attr: pd.DataFrame) -> dict:
+    """
+    Pré-calcula todos os cuboides (2^5 combinações de dimensões) de lutas,
+    vitórias e somas de atributos.
+
+    O cuboide base é agregado uma única vez a partir dos dados; os demais são
+    roll-ups do próprio cuboide base, que tem no máximo algumas centenas de linhas.
+
+    Returns:
+        dict: {tupla_de_dimensoes: DataFrame indexado pelas dimensões}
+    """
+    if df_estatisticas is None or df_attr is None:
+        logging.error("Estatísticas ou atributos ausentes; cubo não construído.")
+        return {}
+
+    base = (
+        _base_cubo(df_estatisticas, df_attr)
+        .groupby(DIMENSOES_CUBO, dropna=False, observed=True)[MEDIDAS_CUBO]
+        .sum()
+        .reset_index()
+    )
+
+    cubo = {}
+    for n in range(len(DIMENSOES_CUBO) + 1):
+        for dims in combinations(DIMENSOES_CUBO, n):
+            if dims:
+                cuboide = base.groupby(list(dims), dropna=False)[MEDIDAS_CUBO].sum()
+                cuboide = cuboide.sort_index()
+            else:
+                cuboide = base[MEDIDAS_CUBO].sum().to_frame().T
+            cubo[dims] = _derivar_medidas(cuboide)
+
+    logging.info(
+        f"Cubo analítico construído: {len(cubo)} cuboides, "
+        f"{len(base)} células no cuboide base"
+    )
+    return cubo
+
+
+def consultar_cubo(cubo: dict, dimensoes=(), filtros: dict = None) -> pd.DataFrame:
+    """
+    Consulta o cubo em memória com roll-up e slice.
+
+    Args:
+        cubo (dict): Cubo retornado por construir_cubo().
+        dimensoes (iterable): Dimensões mantidas no resultado (roll-up nas demais).
+        filtros (dict, optional): {dimensao: valor ou lista de valores} para fatiar.
+
+    Returns:
+        pd.DataFrame: Medidas agregadas por combinação das dimensões pedidas.
+    """
+    filtros = filtros or {}
+    pedidas = set(dimensoes) | set(filtros)
+    desconhecidas = pedidas - set(DIMENSOES_CUBO)
+    if desconhecidas:
+        raise ValueError(f"Dimensões inexistentes no cubo: {sorted(desconhecidas)}")
+
+    chave = tuple(d for d in DIMENSOES_CUBO if d in pedidas)
+    cuboide = cubo[chave]
+
+    if filtros:
+        mascara = pd.Series(True, index=cuboide.index)
+        for dim, valor in filtros.items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            mascara &= cuboide.index.get_level_values(dim).isin(valores)
+        cuboide = cuboide[mascara.values]
+
+    manter = [d for d in chave if d in set(dimensoes)]
+    if not chave:
+        return cuboide.reset_index(drop=True)
+    if len(manter) == len(chave):
+        return cuboide.reset_index()
+
+    # Fatias que deixaram dimensões de filtro fora do resultado: soma e recalcula
+    resultado = (
+        cuboide.groupby(level=manter)[MEDIDAS_CUBO].sum()
+        if manter
+        else cuboide[MEDIDAS_CUBO].sum().to_frame().T
+    )
+    return _derivar_medidas(resultado).reset_index(drop=not manter)
@@ -0,0 +1,264 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.tratamento_dados import desenhar_linha
+
+logging.basicConfig(level=logging.INFO)
+
+# Armazém persistente das impressões dos combates já carregados
+PASTA_IMPRESSOES = os.path.join(os.getenv("OUT_DIR", "out"), "impressoes_combates")
+
+# Partições do armazém (pelos bits mais altos da impressão); potência de 2
+PARTICOES = 64
+
+# Linhas processadas por lote ao deduplicar um DataFrame grande
+LINHAS_POR_LOTE = 1_000_000
+
+# Lotes de impressões mantidos separados antes de consolidar em um só array
+MAX_BLOCOS_VISTOS = 8
+
+
+def impressoes_linhas(df: pd.DataFrame, subset=None) -> np.ndarray:
+    """Impressão de 64 bits de cada linha (hash vetorizado do pandas, sem índice)."""
+    dados = df[list(subset)] if subset else df
+    return pd.util.hash_pandas_object(dados, index=False).to_numpy(dtype=np.uint64)
+
+
+def _contidos(ordenado: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    """Máscara de 'valores' presentes no array ordenado 'ordenado'."""
+    if len(ordenado) == 0:
+        return np.zeros(len(valores), dtype=bool)
+    posicoes = np.searchsorted(ordenado, valores)
+    posicoes[posicoes == len(ordenado)] = 0
+    return ordenado[posicoes] == valores
+
+
+# ------------------ Armazém em disco ------------------ #
+
+
+class ArmazemImpressoes:
+    """
+    Conjunto de impressões de 64 bits persistido em disco, particionado.
+
+    Cada partição é um .npy ordenado, lido por memory-map: uma consulta só
+    toca as páginas necessárias à busca binária, então o histórico não precisa
+    caber em memória. Inclusões ficam pendentes até salvar(), que regrava
+    cada partição alterada de forma atômica.
+    """
+
+    def __init__(self, pasta: str = PASTA_IMPRESSOES, particoes: int = PARTICOES):
+        self.pasta = pasta
+        self.particoes = particoes
+        self._deslocamento = np.uint64(64 - int(np.log2(particoes)))
+        self._pendentes = {}
+
+    def _arquivo(self, particao: int) -> str:
+        return os.path.join(self.pasta, f"parte_{particao:03d}.npy")
+
+    def _ler(self, particao: int) -> np.ndarray:
+        arquivo = self._arquivo(particao)
+        if not os.path.exists(arquivo):
+            return np.empty(0, dtype=np.uint64)
+        return np.load(arquivo, mmap_mode="r")
+
+    def _particao(self, impressoes: np.ndarray) -> np.ndarray:
+        return (impressoes >> self._deslocamento).astype(np.int64)
+
+    def __len__(self) -> int:
+        return sum(len(self._ler(p)) for p in range(self.particoes)) + sum(
+            len(a) for a in self._pendentes.values()
+        )
+
+    def contem(self, impressoes: np.ndarray) -> np.ndarray:
+        """Máscara das impressões já presentes (em disco ou pendentes)."""
+        presentes = np.zeros(len(impressoes), dtype=bool)
+        particoes = self._particao(impressoes)
+        for p in np.unique(particoes):
+            selecao = particoes == p
+            valores = impressoes[selecao]
+            achados = _contidos(self._ler(p), valores)
+            if p in self._pendentes:
+                achados |= _contidos(self._pendentes[p], valores)
+            presentes[selecao] = achados
+        return presentes
+
+    def adicionar(self, impressoes: np.ndarray):
+        """Inclui impressões (gravadas em disco só em salvar())."""
+        particoes = self._particao(impressoes)
+        for p in np.unique(particoes):
+            novos = impressoes[particoes == p]
+            atuais = self._pendentes.get(p, np.empty(0, dtype=np.uint64))
+            self._pendentes[p] = np.union1d(atuais, novos)
+
+    def substituir(self, impressoes: np.ndarray):
+        """
+        Troca todo o conteúdo do armazém (ex.: após uma carga completa).
+
+        Todas as partições novas são gravadas em temporários antes de qualquer
+        os.replace(): uma falha na gravação mantém o armazém anterior intacto.
+        """
+        os.makedirs(self.pasta, exist_ok=True)
+        impressoes = np.unique(np.asarray(impressoes, dtype=np.uint64))
+        particoes = self._particao(impressoes)
+        temporarios = []
+        try:
+            for p in range(self.particoes):
+                temporario = self._arquivo(p) + ".tmp.npy"
+                np.save(temporario, impressoes[particoes == p])
+                temporarios.append(temporario)
+        except Exception:
+            for temporario in temporarios:
+                os.remove(temporario)
+            raise
+        for p, temporario in enumerate(temporarios):
+            os.replace(temporario, self._arquivo(p))
+        self._pendentes = {}
+
+    def salvar(self):
+        """Consolida as inclusões pendentes nas partições em disco."""
+        os.makedirs(self.pasta, exist_ok=True)
+        for p, novos in self._pendentes.items():
+            combinado = np.union1d(np.asarray(self._ler(p)), novos)
+            temporario = self._arquivo(p) + ".tmp.npy"
+            np.save(temporario, combinado)
+            os.replace(temporario, self._arquivo(p))
+        self._pendentes = {}
+
+
+# ------------------ Deduplicação em fluxo ------------------ #
+
+
+class Deduplicador:
+    """
+    Deduplica lotes de linhas em sequência (ex.: páginas de combates).
+
+    Para cada lote separa as linhas únicas na execução (primeira ocorrência,
+    comparando com todos os lotes anteriores) e, entre elas, as que ainda não
+    constam no histórico do armazém. Só as impressões (8 bytes por linha)
+    ficam em memória.
+    """
+
+    def __init__(self, armazem: ArmazemImpressoes, subset=None):
+        self.armazem = armazem
+        self.subset = subset
+        self._vistos = []
+        self._novas = []
+        self.analisados = 0
+        self.unicos = 0
+        self.novos = 0
+
+    def processar(self, lote: pd.DataFrame):
+        """
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]: Linhas únicas do lote e, entre
+            elas, as novas (fora do histórico).
+        """
+        impressoes = impressoes_linhas(lote, self.subset)
+        _, primeiras = np.unique(impressoes, return_index=True)
+        unica = np.zeros(len(lote), dtype=bool)
+        unica[primeiras] = True
+        for vistos in self._vistos:
+            unica &= ~_contidos(vistos, impressoes)
+
+        nova = unica & ~self.armazem.contem(impressoes)
+
+        self._vistos.append(np.sort(impressoes[unica]))
+        if len(self._vistos) > MAX_BLOCOS_VISTOS:
+            self._vistos = [np.sort(np.concatenate(self._vistos))]
+
+        self.analisados += len(lote)
+        self.unicos += int(unica.sum())
+        self.novos += int(nova.sum())
+        self._novas.append(impressoes[nova])
+        return lote[unica], lote[nova]
+
+    def impressoes(self) -> np.ndarray:
+        """Impressões de todas as linhas únicas vistas na execução."""
+        if not self._vistos:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self._vistos))
+
+    @property
+    def impressoes_novas(self) -> np.ndarray:
+        """Impressões das linhas novas em relação ao histórico."""
+        return np.concatenate(self._novas) if self._novas else np.empty(0, np.uint64)
+
+    @property
+    def presentes_historico(self) -> int:
+        return self.unicos - self.novos
+
+
+def remover_duplicados_hash(
+    df: pd.DataFrame,
+    armazem: ArmazemImpressoes,
+    subset=None,
+    linhas_por_lote: int = LINHAS_POR_LOTE,
+):
+    """
+    Remove duplicados de um DataFrame em lotes, por impressões de 64 bits,
+    e identifica as linhas que não constam no histórico do armazém.
+
+    O armazém não é alterado; use registrar_historico() depois que a carga
+    no banco for concluída.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, Deduplicador]: Linhas únicas, linhas
+        novas e o deduplicador (contagens e impressões da execução).
+    """
+    deduplicador = Deduplicador(armazem, subset)
+    unicos, novos = [], []
+    for inicio in range(0, len(df), linhas_por_lote):
+        u, n = deduplicador.processar(df.iloc[inicio : inicio + linhas_por_lote])
+        unicos.append(u)
+        novos.append(n)
+
+    df_unicos = pd.concat(unicos) if unicos else df.iloc[:0]
+    df_novos = pd.concat(novos) if novos else df.iloc[:0]
+
+    print(desenhar_linha("Remoção de Duplicados"))
+    if subset:
+        print(f"Colunas consideradas: {subset}")
+    print(f"Registros antes: {deduplicador.analisados}")
+    print(f"Registros depois: {deduplicador.unicos}")
+    print(f"Duplicados removidos: {deduplicador.analisados - deduplicador.unicos}")
+    print(f"Já presentes no histórico: {deduplicador.presentes_historico}")
+    print(f"Novos em relação ao histórico: {deduplicador.novos}")
+    print(desenhar_linha())
+
+    return df_unicos, df_novos, deduplicador
+
+
+def delta_do_historico(df_novos: pd.DataFrame, deduplicador: Deduplicador):
+    """
+    Combates novos em relação ao histórico, ou None quando o delta não basta:
+    armazém vazio (primeira execução) ou combates do histórico ausentes da
+    carga atual.
+    """
+    total_historico = len(deduplicador.armazem)
+    if total_historico == 0:
+        return None
+    if deduplicador.presentes_historico < total_historico:
+        logging.warning(
+            f"{total_historico - deduplicador.presentes_historico} combates do "
+            "histórico não aparecem na nova carga: atualização completa."
+        )
+        return None
+    logging.info(f"Delta de combates identificado: {len(df_novos)} novos registros")
+    return df_novos.reset_index(drop=True)
+
+
+def registrar_historico(deduplicador: Deduplicador, completo: bool):
+    """
+    Atualiza o armazém após a carga no banco: acrescenta apenas as impressões
+    novas ou, numa carga completa, substitui o histórico pelo da execução.
+    """
+    armazem = deduplicador.armazem
+    if completo:
+        armazem.substituir(deduplicador.impressoes())
+    else:
+        armazem.adicionar(deduplicador.impressoes_novas)
+        armazem.salvar()
+    logging.info(f"Histórico de impressões atualizado: {len(armazem)} combates")
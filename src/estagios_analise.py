@@ -0,0 +1,432 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.analisar_dados_banco import (
+    acompanhar_gravacoes,
+    carregar_tabela,
+    carregar_tabelas,
+    salvar_tabela,
+    adicionar_nomes,
+    gerar_estatisticas,
+    gerar_confrontos,
+    analisar_top10,
+    analisar_top10_taxa_vitoria,
+    analisar_atributos_top10,
+    analisar_correlacao,
+    analisar_distribuicao_taxa,
+    analisar_tipo,
+)
+from src.agregacao_distribuida import (
+    AGREGACAO_WORKERS,
+    analisar_confrontos_tipos,
+    gerar_agregados,
+)
+from src.intervalos_confianca import analisar_intervalos_taxa
+from src.preditor_confrontos import analisar_preditor
+
+logging.basicConfig(level=logging.INFO)
+
+# Tabela com a impressão digital de cada fonte e de cada saída de estágio
+TABELA_IMPRESSOES = "impressoes_estagios"
+
+# Tabelas carregadas pelo pipeline (entradas sem estágio produtor)
+FONTES = ["combates", "atributos_pokemon"]
+
+# Impressões gravadas por registrar_fonte neste processo ({tabela: impressão})
+_FONTES_REGISTRADAS = {}
+
+# Colunas de controle que não fazem parte do conteúdo
+COLUNAS_CONTROLE = ["inserido_em"]
+
+# Número de estágios independentes executados em paralelo
+ANALISE_WORKERS = int(os.getenv("ANALISE_WORKERS", "4"))
+
+
+# ------------------ Impressões digitais ------------------ #
+
+
+def impressao_digital(df: pd.DataFrame) -> str:
+    """
+    Calcula uma impressão digital do conteúdo de um DataFrame.
+
+    Usa o hash vetorizado do pandas linha a linha e resume tudo em SHA-256,
+    ignorando o índice e as colunas de controle (ex.: 'inserido_em').
+    """
+    df = df.drop(columns=COLUNAS_CONTROLE, errors="ignore")
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def impressao_encadeada(anterior: str, df_acrescimo: pd.DataFrame) -> str:
+    """Impressão de uma tabela que recebeu linhas novas (append) sem ser relida."""
+    base = f"{anterior}+{impressao_digital(df_acrescimo)}"
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
+
+
+def carregar_registro() -> dict:
+    """
+    Retorna o registro {tabela: {"impressao": ..., "chave": ...}} salvo no banco.
+
+    'impressao' identifica o conteúdo da tabela; 'chave' identifica as entradas
+    (e a versão do estágio) que a produziram. Fontes não têm chave.
+    """
+    df = carregar_tabela(TABELA_IMPRESSOES)
+    if df is None or df.empty:
+        return {}
+    df = df.astype({"impressao": object, "chave": object}).where(df.notna(), None)
+    return {
+        r["tabela"]: {"impressao": r["impressao"], "chave": r["chave"]}
+        for r in df.to_dict("records")
+    }
+
+
+def salvar_registro(registro: dict):
+    """Grava o registro de impressões digitais (replace)."""
+    df = pd.DataFrame(
+        [{"tabela": t, **v} for t, v in registro.items()],
+        columns=["tabela", "impressao", "chave"],
+    )
+    df["atualizado_em"] = pd.Timestamp.utcnow()
+    salvar_tabela(df, TABELA_IMPRESSOES)
+
+
+def registrar_fonte(df: pd.DataFrame, tabela: str):
+    """
+    Registra a impressão de uma tabela de origem no momento em que é carregada
+    no banco, evitando reler a tabela só para verificar se mudou.
+    """
+    impressao = impressao_digital(df)
+    registro = carregar_registro()
+    registro[tabela] = {"impressao": impressao, "chave": None}
+    salvar_registro(registro)
+    _FONTES_REGISTRADAS[tabela] = impressao
+
+
+# ------------------ Declaração do DAG ------------------ #
+
+
+@dataclass(frozen=True)
+class Estagio:
+    """
+    Estágio analítico: lê 'entradas', grava 'saidas' no banco.
+
+    As entradas em 'sob_demanda' chegam à função como callables sem argumentos
+    (que leem a tabela só se chamados), para estágios que podem consultá-la
+    em partes direto no banco.
+    """
+
+    nome: str
+    entradas: tuple
+    saidas: tuple
+    funcao: object
+    versao: int = 1
+    sob_demanda: tuple = ()
+
+    def chave(self, impressoes_entrada: list) -> str:
+        """Impressão das saídas: depende do código (versão) e das entradas."""
+        base = f"{self.nome}:{self.versao}:" + ":".join(impressoes_entrada)
+        return hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
+
+
+def _combinar(df_combates, df_attr):
+    df_merged = adicionar_nomes(df_combates, df_attr)
+    salvar_tabela(df_merged, "combates_com_nomes")
+    return (df_merged,)
+
+
+def _agregar_combates(ler_combates, df_attr):
+    # Particionado: os workers leem intervalos de id_combate do banco, sem
+    # carregar combates_com_nomes aqui; senão, pandas sobre a tabela inteira
+    if AGREGACAO_WORKERS > 1:
+        return gerar_agregados(df_attr, workers=AGREGACAO_WORKERS)
+    df_combates = ler_combates()
+    return gerar_estatisticas(df_combates), gerar_confrontos(df_combates)
+
+
+def _atributos_top10(top10_vitorias, df_attr):
+    df_top10_attr, comparativo, _ = analisar_atributos_top10(top10_vitorias, df_attr)
+    if comparativo is None:
+        return None, None
+    return df_top10_attr, comparativo.reset_index().rename(columns={"index": "Atributo"})
+
+
+ESTAGIOS = [
+    Estagio(
+        "combinar_tabelas",
+        ("combates", "atributos_pokemon"),
+        ("combates_com_nomes",),
+        _combinar,
+        versao=2,
+    ),
+    # Contagens por Pokémon e por par, num só estágio: pandas em processo único
+    # ou, com AGREGACAO_WORKERS > 1, uma passada particionada num pool de processos
+    Estagio(
+        "agregar_combates",
+        ("combates_com_nomes", "atributos_pokemon"),
+        ("estatisticas_pokemon", "confrontos_diretos"),
+        _agregar_combates,
+        versao=2,
+        sob_demanda=("combates_com_nomes",),
+    ),
+    Estagio(
+        "analisar_top10",
+        ("estatisticas_pokemon",),
+        ("top10_vitorias", "top10_derrotas"),
+        analisar_top10,
+    ),
+    Estagio(
+        "analisar_top10_taxa_vitoria",
+        ("estatisticas_pokemon",),
+        ("top10_taxa_vitoria",),
+        lambda df: (analisar_top10_taxa_vitoria(df),),
+    ),
+    Estagio(
+        "analisar_atributos_top10",
+        ("top10_vitorias", "atributos_pokemon"),
+        ("atributos_top10_vencedores", "comparativo_atributos_top10"),
+        _atributos_top10,
+    ),
+    Estagio(
+        "analisar_correlacao",
+        ("estatisticas_pokemon", "atributos_pokemon"),
+        ("correlacao_atributos_vitorias",),
+        lambda est, attr: (analisar_correlacao(est, attr),),
+    ),
+    Estagio(
+        "analisar_distribuicao_taxa",
+        ("estatisticas_pokemon",),
+        ("distribuicao_taxa_vitoria",),
+        lambda df: (analisar_distribuicao_taxa(df),),
+    ),
+    Estagio(
+        "analisar_tipo",
+        ("estatisticas_pokemon", "atributos_pokemon"),
+        ("ranking_tipos_vitoria",),
+        lambda est, attr: (analisar_tipo(est, attr),),
+    ),
+    Estagio(
+        "analisar_intervalos_taxa",
+        ("combates_com_nomes", "estatisticas_pokemon"),
+        ("intervalos_taxa_vitoria",),
+        lambda comb, est: (analisar_intervalos_taxa(comb, est),),
+    ),
+    Estagio(
+        "analisar_preditor",
+        ("combates", "atributos_pokemon"),
+        ("modelo_confrontos",),
+        lambda comb, attr: (analisar_preditor(comb, attr),),
+    ),
+    Estagio(
+        "analisar_confrontos_tipos",
+        ("confrontos_diretos", "atributos_pokemon"),
+        ("confrontos_tipos",),
+        lambda conf, attr: (analisar_confrontos_tipos(conf, attr),),
+    ),
+]
+
+
+# ------------------ Execução ------------------ #
+
+
+def _registrar_fontes(registro: dict, tabelas: dict) -> dict:
+    """
+    Confere a impressão de cada fonte lendo a tabela. Só dispensa a leitura a
+    impressão que este processo acabou de registrar (registrar_fonte): uma
+    fonte alterada por qualquer outro caminho é detectada como nova versão.
+    A tabela lida fica em 'tabelas' para os estágios que a usam.
+    """
+    for fonte in FONTES:
+        impressao = registro.get(fonte, {}).get("impressao")
+        if impressao is not None and _FONTES_REGISTRADAS.get(fonte) == impressao:
+            continue
+        if fonte not in tabelas:
+            tabelas[fonte] = carregar_tabela(fonte)
+        if tabelas[fonte] is None:
+            raise LookupError(f"Tabela de origem '{fonte}' não encontrada.")
+        registro[fonte] = {"impressao": impressao_digital(tabelas[fonte]), "chave": None}
+    return registro
+
+
+def _chave_atual(estagio: Estagio, registro: dict):
+    """Chave do estágio para as impressões atuais das entradas (None se faltar alguma)."""
+    impressoes = [registro.get(e, {}).get("impressao") for e in estagio.entradas]
+    if any(i is None for i in impressoes):
+        return None
+    return estagio.chave(impressoes)
+
+
+def _executar_estagio(estagio: Estagio, obter):
+    """Lê as entradas, executa o estágio (com suas gravações) e mede o tempo."""
+    inicio = time.perf_counter()
+    entradas = [
+        (lambda e=e: obter(e)) if e in estagio.sob_demanda else obter(e)
+        for e in estagio.entradas
+    ]
+    if any(df is None for df in entradas):
+        raise LookupError(f"Estágio '{estagio.nome}' sem entradas disponíveis.")
+    with acompanhar_gravacoes() as falhas:
+        resultados = estagio.funcao(*entradas)
+    if falhas:
+        # Sem a gravação, registrar a chave faria o estágio nunca mais rodar
+        raise RuntimeError(f"Estágio '{estagio.nome}' não gravou: {', '.join(falhas)}")
+    return resultados, time.perf_counter() - inicio
+
+
+def _relatorio_tempos(tempos: dict, total: float) -> str:
+    """Resumo textual do tempo por estágio e do tempo total (parede)."""
+    linhas = [f"  {nome:<30} {duracao:>8.3f}s" for nome, duracao in tempos.items()]
+    soma = sum(tempos.values())
+    linhas.append(f"  {'Soma dos estágios':<30} {soma:>8.3f}s")
+    linhas.append(f"  {'Tempo total (parede)':<30} {total:>8.3f}s")
+    return "Tempos dos estágios analíticos:\n" + "\n".join(linhas)
+
+
+def executar_estagios(
+    recalcular: bool = False, carregar=(), max_workers: int = None
+) -> dict:
+    """
+    Executa o DAG de estágios analíticos, reprocessando só o que mudou.
+
+    Um estágio roda quando a chave registrada de alguma saída difere da chave
+    calculada a partir das impressões atuais das entradas (ou quando
+    recalcular=True). Como a impressão de cada saída é a do seu conteúdo, um
+    estágio que reexecuta e produz o mesmo resultado não invalida os seguintes.
+    Saídas de estágios válidos só são lidas do banco se forem necessárias; as
+    pedidas em 'carregar' são lidas ao final, todas numa única conexão.
+
+    Estágios cujas dependências já terminaram rodam em paralelo num pool de
+    threads (leituras, cálculo e gravações no banco de cada estágio); o tempo
+    de cada um é registrado no log.
+
+    Args:
+        recalcular (bool): Executa todos os estágios, ignorando o cache.
+        carregar (iterable): Tabelas que devem constar no retorno.
+        max_workers (int, optional): Tamanho do pool (padrão: ANALISE_WORKERS).
+
+    Returns:
+        dict: {tabela: DataFrame ou None} com as tabelas lidas ou geradas.
+    """
+    inicio = time.perf_counter()
+    tabelas = {}
+    registro = carregar_registro()
+    registrado = {tabela: dict(valores) for tabela, valores in registro.items()}
+    registro = _registrar_fontes(registro, tabelas)
+
+    trava = threading.Lock()
+    travas_tabela = {}
+
+    def obter(tabela):
+        with trava:
+            trava_tabela = travas_tabela.setdefault(tabela, threading.Lock())
+        with trava_tabela:
+            if tabela not in tabelas:
+                tabelas[tabela] = carregar_tabela(tabela)
+        return tabelas[tabela]
+
+    produtores = {s: e.nome for e in ESTAGIOS for s in e.saidas}
+    pendentes = list(ESTAGIOS)
+    concluidos = set()
+    em_execucao = {}
+    tempos = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or ANALISE_WORKERS) as pool:
+        while pendentes or em_execucao:
+            # Despacha tudo o que já tem as dependências resolvidas
+            despachou = True
+            while despachou:
+                despachou = False
+                for estagio in list(pendentes):
+                    if any(
+                        e in produtores and produtores[e] not in concluidos
+                        for e in estagio.entradas
+                    ):
+                        continue
+                    pendentes.remove(estagio)
+                    despachou = True
+
+                    chave = _chave_atual(estagio, registro)
+                    valido = chave is not None and not recalcular and all(
+                        registro.get(s, {}).get("chave") == chave
+                        for s in estagio.saidas
+                    )
+                    if chave is None:
+                        logging.error(f"Estágio '{estagio.nome}' sem entradas disponíveis.")
+                        concluidos.add(estagio.nome)
+                    elif valido:
+                        logging.info(f"Estágio '{estagio.nome}' em cache; sem reprocessamento.")
+                        concluidos.add(estagio.nome)
+                    else:
+                        logging.info(f"Estágio '{estagio.nome}' desatualizado; executando.")
+                        futuro = pool.submit(_executar_estagio, estagio, obter)
+                        em_execucao[futuro] = (estagio, chave)
+
+            if not em_execucao:
+                break
+
+            prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                estagio, chave = em_execucao.pop(futuro)
+                concluidos.add(estagio.nome)
+                try:
+                    resultados, duracao = futuro.result()
+                except Exception as e:
+                    logging.error(f"Falha no estágio '{estagio.nome}': {e}")
+                    for saida in estagio.saidas:
+                        tabelas.setdefault(saida, None)
+                        registro.pop(saida, None)
+                    continue
+
+                tempos[estagio.nome] = duracao
+                logging.info(f"Estágio '{estagio.nome}' concluído em {duracao:.3f}s")
+                for saida, df in zip(estagio.saidas, resultados):
+                    tabelas[saida] = df
+                    if df is not None:
+                        registro[saida] = {
+                            "impressao": impressao_digital(df),
+                            "chave": chave,
+                        }
+                    else:
+                        registro.pop(saida, None)
+
+    # Leituras com tudo em cache não gravam: só estágios executados (ou
+    # fontes registradas pela primeira vez) alteram o registro
+    if registro != registrado:
+        salvar_registro(registro)
+    if tempos:
+        logging.info(_relatorio_tempos(tempos, time.perf_counter() - inicio))
+    # Tabelas pedidas que nenhum estágio gerou: lidas juntas, numa só conexão
+    faltantes = [t for t in carregar if t not in tabelas]
+    if faltantes:
+        tabelas.update(carregar_tabelas(faltantes)[0])
+    return tabelas
+
+
+def marcar_estagios_atualizados(atualizadas: dict):
+    """
+    Registra saídas gravadas fora do DAG como consistentes com as fontes atuais.
+
+    Usado após uma atualização incremental, que grava as mesmas tabelas que o
+    DAG produziria sem passar por ele.
+
+    Args:
+        atualizadas (dict): {tabela: DataFrame ou impressão já calculada}.
+    """
+    registro = _registrar_fontes(carregar_registro(), {})
+    for estagio in ESTAGIOS:
+        chave = _chave_atual(estagio, registro)
+        for saida in estagio.saidas:
+            valor = atualizadas.get(saida)
+            if valor is None or chave is None:
+                continue
+            impressao = valor if isinstance(valor, str) else impressao_digital(valor)
+            registro[saida] = {"impressao": impressao, "chave": chave}
+    salvar_registro(registro)
@@ -0,0 +1,148 @@
+import plotly.express as px
+import plotly.io as pio
+
+
+# ------------------ Funções utilitárias ------------------ #
+def clean_df(df):
+    """Remove ID e reseta o índice para evitar colunas indesejadas."""
+    return df.drop(columns=["ID"], errors="ignore").reset_index(drop=True)
+
+
+def plot_bar(df, x, y, title, color_scale="Viridis"):
+    df_plot = clean_df(df)
+    fig = px.bar(
+        df_plot,
+        x=x,
+        y=y,
+        orientation="h",
+        text=x,
+        color=x,
+        color_continuous_scale=color_scale,
+        title=title,
+    )
+    fig.update_layout(yaxis=dict(autorange="reversed"))
+    return fig
+
+
+# ------------------ Figuras estáticas ------------------ #
+# Gráficos que dependem só de uma tabela analítica, sem interação do
+# usuário: mudam uma vez por execução do pipeline
+
+
+def _top10_vitorias(df):
+    return plot_bar(df, "Vitorias", "Pokemon", "Top 10 Vitórias")
+
+
+def _top10_derrotas(df):
+    return plot_bar(df, "Derrotas", "Pokemon", "Top 10 Derrotas", color_scale="Reds")
+
+
+def _top10_taxa(df):
+    return plot_bar(
+        df, "Taxa_Vitoria(%)", "Pokemon", "Top 10 Taxa de Vitória (%)", color_scale="Blues"
+    )
+
+
+def _top10_intervalos(df):
+    df_ic_top = df.nlargest(10, "IC_Wilson_Inf(%)").iloc[::-1]
+    return px.scatter(
+        df_ic_top,
+        x="Taxa_Vitoria(%)",
+        y="Pokemon",
+        error_x=df_ic_top["IC_Wilson_Sup(%)"] - df_ic_top["Taxa_Vitoria(%)"],
+        error_x_minus=df_ic_top["Taxa_Vitoria(%)"] - df_ic_top["IC_Wilson_Inf(%)"],
+        hover_data=["Lutas", "IC_Wilson_Inf(%)", "IC_Wilson_Sup(%)"],
+        title="Taxa de Vitória (%) com intervalo de confiança",
+    )
+
+
+def _radar_top10(df):
+    df_comp = clean_df(df)
+    df_comp = df_comp[df_comp["Atributo"] != "ID"]
+    fig_radar = px.line_polar(
+        df_comp,
+        r="Média_Top10",
+        theta="Atributo",
+        line_close=True,
+        title="Média Top10 vs Geral",
+    )
+    fig_radar.add_scatterpolar(
+        r=df_comp["Média_Geral"],
+        theta=df_comp["Atributo"],
+        line=dict(color="red", dash="dash"),
+        name="Média Geral",
+    )
+    return fig_radar
+
+
+def _correlacoes(df):
+    df_corr = clean_df(df)
+    df_corr = df_corr[df_corr["Atributo"] != "ID"]
+    fig_corr = px.bar(
+        df_corr,
+        x="Correlação_com_Vitórias",
+        y="Atributo",
+        orientation="h",
+        text="Correlação_com_Vitórias",
+        color="Correlação_com_Vitórias",
+        color_continuous_scale="Cividis",
+    )
+    fig_corr.update_layout(yaxis=dict(autorange="reversed"))
+    return fig_corr
+
+
+def _distribuicao(df):
+    return px.pie(
+        clean_df(df),
+        names="Faixa",
+        values="Proporção(%)",
+        color="Faixa",
+        color_discrete_sequence=px.colors.sequential.RdBu,
+    )
+
+
+def _ranking_tipos(df):
+    return plot_bar(
+        df, "media_taxa_vitoria", "Types", "Ranking de Tipos", color_scale="Viridis"
+    )
+
+
+# Nome da figura -> (tabela de origem, função de desenho)
+FIGURAS_ESTATICAS = {
+    "top10_vitorias": ("top10_vitorias", _top10_vitorias),
+    "top10_derrotas": ("top10_derrotas", _top10_derrotas),
+    "top10_taxa": ("top10_taxa_vitoria", _top10_taxa),
+    "top10_intervalos": ("intervalos_taxa_vitoria", _top10_intervalos),
+    "radar_top10": ("comparativo_atributos_top10", _radar_top10),
+    "correlacoes": ("correlacao_atributos_vitorias", _correlacoes),
+    "distribuicao": ("distribuicao_taxa_vitoria", _distribuicao),
+    "ranking_tipos": ("ranking_tipos_vitoria", _ranking_tipos),
+}
+
+
+def desenhar_figura(nome: str, df):
+    """Figura estática 'nome' a partir da sua tabela (None se não houver dados)."""
+    if df is None or df.empty:
+        return None
+    _, desenhar = FIGURAS_ESTATICAS[nome]
+    return desenhar(df)
+
+
+def especificacoes_figuras(pacote) -> dict:
+    """
+    Especificação JSON (plotly) de cada figura estática do pacote.
+
+    Gerada pelo pipeline junto com o snapshot, para que o dashboard não
+    precise montar essas figuras com plotly.express.
+    """
+    especificacoes = {}
+    for nome, (tabela, _) in FIGURAS_ESTATICAS.items():
+        fig = desenhar_figura(nome, getattr(pacote, tabela))
+        if fig is not None:
+            especificacoes[nome] = fig.to_json()
+    return especificacoes
+
+
+def figura_de_especificacao(especificacao: str):
+    """Reconstrói a figura plotly a partir da especificação JSON."""
+    return pio.from_json(especificacao)
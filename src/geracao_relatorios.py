@@ -0,0 +1,95 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+logging.basicConfig(level=logging.INFO)
+
+# Processos usados para renderizar os PDFs (um relatório por tarefa)
+RELATORIOS_WORKERS = int(
+    os.getenv("RELATORIOS_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+
+def _gerar(funcao, args, kwargs):
+    """Executa uma função de relatório e mede o tempo (roda no worker)."""
+    inicio = time.perf_counter()
+    caminho = funcao(*args, **kwargs)
+    return caminho, time.perf_counter() - inicio
+
+
+class FilaRelatorios:
+    """
+    Gera relatórios PDF em paralelo, um processo por relatório.
+
+    O matplotlib não é thread-safe e a renderização é limitada por CPU, por
+    isso cada PDF roda num processo separado ("spawn"). Relatórios podem ser
+    enviados assim que seus dados ficam prontos; aguardar() devolve o caminho
+    de cada um, registra o tempo de cada relatório e isola falhas (um PDF que
+    falha não impede os demais).
+
+    Uso:
+        with FilaRelatorios() as fila:
+            fila.enviar("combates", gerar_pdf_report, df, nome="combates")
+            caminhos = fila.aguardar()
+    """
+
+    def __init__(self, workers: int = RELATORIOS_WORKERS):
+        self.workers = max(1, workers)
+        self._pool = None
+        self._tarefas = {}
+        self._inicio = time.perf_counter()
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        return False
+
+    def enviar(self, rotulo: str, funcao, /, *args, **kwargs):
+        """
+        Agenda um relatório; 'funcao' precisa ser de nível de módulo.
+        'rotulo' identifica o relatório no retorno de aguardar() e no log.
+        """
+        if self._pool is None:
+            try:
+                self._tarefas[rotulo] = _gerar(funcao, args, kwargs)
+            except Exception as e:
+                self._tarefas[rotulo] = e
+        else:
+            self._tarefas[rotulo] = self._pool.submit(_gerar, funcao, args, kwargs)
+
+    def aguardar(self) -> dict:
+        """
+        Espera todos os relatórios enviados.
+
+        Returns:
+            dict: {nome: caminho do PDF ou None em caso de falha}.
+        """
+        caminhos, tempos = {}, {}
+        for nome, tarefa in self._tarefas.items():
+            try:
+                resultado = tarefa if self._pool is None else tarefa.result()
+                if isinstance(resultado, Exception):
+                    raise resultado
+                caminhos[nome], tempos[nome] = resultado
+                logging.info(f"📄 Relatório '{nome}' gerado em {tempos[nome]:.2f}s")
+            except Exception as e:
+                caminhos[nome] = None
+                logging.warning(f"⚠️ Erro ao gerar relatório '{nome}': {e}")
+
+        if tempos:
+            linhas = [f"  {n:<30} {d:>8.2f}s" for n, d in tempos.items()]
+            linhas.append(
+                f"  {'Tempo total (parede)':<30} {time.perf_counter() - self._inicio:>8.2f}s"
+            )
+            logging.info("Tempos dos relatórios:\n" + "\n".join(linhas))
+        self._tarefas = {}
+        return caminhos
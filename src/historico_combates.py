@@ -0,0 +1,100 @@
+import logging
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.analisar_dados_banco import conectar_banco
+
+logging.basicConfig(level=logging.INFO)
+
+# Combates por página no histórico do dashboard
+TAMANHO_PAGINA = int(os.getenv("HISTORICO_TAMANHO_PAGINA", "50"))
+# Limite de combates por página aceito por pagina_historico
+TAMANHO_MAXIMO = 500
+
+# Paginação por chave (keyset): cada ramo usa um dos índices
+# (nome_first, id_combate) / (nome_second, id_combate) e para em :limite
+# linhas, então o custo de uma página não depende do tamanho do histórico
+# nem da página pedida (ao contrário de OFFSET)
+CONSULTA_PAGINA = text(
+    """
+    SELECT id_combate, nome_first, nome_second, nome_winner FROM (
+        SELECT id_combate, nome_first, nome_second, nome_winner
+        FROM combates_com_nomes
+        WHERE nome_first = :pokemon AND id_combate > :apos
+        ORDER BY id_combate
+        LIMIT :limite
+    ) AS como_primeiro
+    UNION ALL
+    SELECT id_combate, nome_first, nome_second, nome_winner FROM (
+        SELECT id_combate, nome_first, nome_second, nome_winner
+        FROM combates_com_nomes
+        WHERE nome_second = :pokemon AND nome_first <> :pokemon AND id_combate > :apos
+        ORDER BY id_combate
+        LIMIT :limite
+    ) AS como_segundo
+    ORDER BY id_combate
+    LIMIT :limite
+    """
+)
+
+
+@dataclass(frozen=True)
+class PaginaHistorico:
+    """
+    Uma página do histórico de um Pokémon.
+
+    linhas: id_combate, Adversário, Vencedor e Resultado, em ordem de id.
+    proximo: cursor da página seguinte (último id_combate da página), ou
+    None se esta é a última.
+    """
+
+    pokemon: str
+    linhas: pd.DataFrame
+    proximo: int = None
+
+
+def pagina_historico(
+    pokemon: str, apos: int = 0, tamanho: int = TAMANHO_PAGINA, engine=None
+) -> PaginaHistorico:
+    """
+    Busca os 'tamanho' combates do Pokémon com id_combate maior que 'apos'.
+
+    Lê uma linha a mais para saber se existe página seguinte. 'tamanho' é
+    limitado a TAMANHO_MAXIMO; valores menores que 1 geram ValueError.
+    """
+    if tamanho < 1:
+        raise ValueError(f"Tamanho de página inválido: {tamanho}")
+    tamanho = min(int(tamanho), TAMANHO_MAXIMO)
+    engine = engine or conectar_banco()
+    with engine.connect() as conexao:
+        df = pd.read_sql(
+            CONSULTA_PAGINA,
+            conexao,
+            params={"pokemon": pokemon, "apos": int(apos), "limite": tamanho + 1},
+        )
+
+    tem_proxima = len(df) > tamanho
+    df = df.head(tamanho)
+    linhas = pd.DataFrame(
+        {
+            "id_combate": df["id_combate"],
+            "Adversário": df["nome_second"].where(df["nome_first"] == pokemon, df["nome_first"]),
+            "Vencedor": df["nome_winner"],
+            "Resultado": (df["nome_winner"] == pokemon).map({True: "Vitória", False: "Derrota"}),
+        }
+    )
+    proximo = int(df["id_combate"].iloc[-1]) if tem_proxima else None
+    return PaginaHistorico(pokemon=pokemon, linhas=linhas, proximo=proximo)
+
+
+def proximo_id_combate(engine=None) -> int:
+    """Primeiro id_combate livre em combates_com_nomes (1 se a tabela estiver vazia)."""
+    engine = engine or conectar_banco()
+    with engine.connect() as conexao:
+        maximo = conexao.execute(
+            text("SELECT MAX(id_combate) FROM combates_com_nomes")
+        ).scalar()
+    return int(maximo or 0) + 1
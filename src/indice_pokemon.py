@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Colunas de estatísticas e intervalos anexadas a cada Pokémon
+COLUNAS_ESTATISTICAS = ["Lutas", "Vitorias", "Derrotas", "Taxa_Vitoria(%)"]
+COLUNAS_INTERVALOS = [
+    "IC_Wilson_Inf(%)",
+    "IC_Wilson_Sup(%)",
+    "IC_Bootstrap_Inf(%)",
+    "IC_Bootstrap_Sup(%)",
+]
+
+
+@dataclass(frozen=True)
+class IndicePokemon:
+    """
+    Consultas por Pokémon e por tipo, pré-calculadas uma vez por versão dos dados.
+
+    tabela: uma linha por Pokémon com atributos, estatísticas e intervalos
+    (colunas ausentes ficam NaN). posicao: Nome -> linha em 'tabela'.
+    posicoes_por_tipo: Tipo -> linhas em 'tabela'. medias: média geral de
+    cada atributo numérico. Assim, cada interação do dashboard é uma busca
+    em dicionário em vez de um filtro sobre o DataFrame inteiro.
+    """
+
+    tabela: pd.DataFrame
+    nomes: tuple
+    tipos: tuple
+    posicao: dict
+    posicoes_por_tipo: dict
+    colunas_atributos: tuple
+    medias: pd.Series
+
+    def atributos(self, nome: str) -> pd.DataFrame:
+        """Linha de atributos do Pokémon (vazia se não existir), sem ID."""
+        colunas = ["Nome", "Types", *self.colunas_atributos]
+        posicao = self.posicao.get(nome)
+        if posicao is None:
+            return self.tabela.iloc[:0][colunas]
+        return self.tabela.iloc[[posicao]][colunas].reset_index(drop=True)
+
+    def estatisticas(self, nome: str):
+        """Lutas, vitórias, derrotas e taxa do Pokémon, ou None sem combates."""
+        posicao = self.posicao.get(nome)
+        if posicao is None:
+            return None
+        linha = self.tabela.iloc[posicao]
+        if pd.isna(linha.get("Lutas")):
+            return None
+        return linha[COLUNAS_ESTATISTICAS]
+
+    def intervalo(self, nome: str):
+        """Intervalos de confiança da taxa de vitória, ou None se ausentes."""
+        posicao = self.posicao.get(nome)
+        if posicao is None or "IC_Wilson_Inf(%)" not in self.tabela.columns:
+            return None
+        linha = self.tabela.iloc[posicao]
+        if pd.isna(linha["IC_Wilson_Inf(%)"]):
+            return None
+        return linha[[c for c in COLUNAS_INTERVALOS if c in self.tabela.columns]]
+
+    def por_tipo(self, tipo: str) -> pd.DataFrame:
+        """Pokémon de um tipo (Nome, Types e atributos numéricos)."""
+        posicoes = self.posicoes_por_tipo.get(tipo, [])
+        colunas = ["Nome", "Types", *self.colunas_atributos]
+        return self.tabela.iloc[posicoes][colunas].reset_index(drop=True)
+
+
+def construir_indice_pokemon(
+    df_attr: pd.DataFrame, df_estatisticas: pd.DataFrame = None, df_intervalos: pd.DataFrame = None
+) -> IndicePokemon:
+    """
+    Monta o IndicePokemon a partir das tabelas do dashboard.
+
+    Args:
+        df_attr (pd.DataFrame): atributos_pokemon (com ou sem ID).
+        df_estatisticas (pd.DataFrame, optional): estatisticas_pokemon.
+        df_intervalos (pd.DataFrame, optional): intervalos_taxa_vitoria.
+    """
+    tabela = df_attr.drop(columns=["ID"], errors="ignore").drop_duplicates("Nome")
+    colunas_atributos = tuple(tabela.select_dtypes(include="number").columns)
+
+    if df_estatisticas is not None:
+        tabela = tabela.merge(
+            df_estatisticas[["Pokemon", *COLUNAS_ESTATISTICAS]],
+            left_on="Nome",
+            right_on="Pokemon",
+            how="left",
+        ).drop(columns=["Pokemon"])
+    if df_intervalos is not None:
+        colunas = [c for c in COLUNAS_INTERVALOS if c in df_intervalos.columns]
+        tabela = tabela.merge(
+            df_intervalos[["Pokemon", *colunas]], left_on="Nome", right_on="Pokemon", how="left"
+        ).drop(columns=["Pokemon"])
+    tabela = tabela.reset_index(drop=True)
+
+    nomes = tabela["Nome"].astype(str).to_numpy()
+    tipos = tabela["Types"].astype(object).where(tabela["Types"].notna()).to_numpy()
+    posicoes_por_tipo = {
+        tipo: np.flatnonzero(tipos == tipo) for tipo in pd.unique(tipos[pd.notna(tipos)])
+    }
+
+    return IndicePokemon(
+        tabela=tabela,
+        nomes=tuple(sorted(nomes)),
+        tipos=tuple(sorted(posicoes_por_tipo)),
+        posicao={nome: i for i, nome in enumerate(nomes)},
+        posicoes_por_tipo=posicoes_por_tipo,
+        colunas_atributos=colunas_atributos,
+        medias=tabela[list(colunas_atributos)].mean(),
+    )
+
+
+class IndiceConfrontos:
+    """
+    Busca de confrontos diretos por par: {(Pokemon_A, Pokemon_B): contagens}.
+
+    Substitui o filtro sobre a tabela de combates individuais: o resultado de
+    um duelo vem do agregado 'confrontos_diretos', de tamanho fixo pelo
+    número de pares.
+    """
+
+    def __init__(self, df_confrontos: pd.DataFrame = None):
+        self.pares = {}
+        if df_confrontos is not None:
+            self.pares = {
+                (a, b): (int(lutas), int(va), int(vb))
+                for a, b, lutas, va, vb in zip(
+                    df_confrontos["Pokemon_A"].astype(str),
+                    df_confrontos["Pokemon_B"].astype(str),
+                    df_confrontos["Lutas"],
+                    df_confrontos["Vitorias_A"],
+                    df_confrontos["Vitorias_B"],
+                )
+            }
+
+    def duelo(self, pokemon1: str, pokemon2: str) -> tuple:
+        """Vitórias de pokemon1, vitórias de pokemon2 e total de combates entre eles."""
+        a, b = sorted([pokemon1, pokemon2])
+        lutas, vitorias_a, vitorias_b = self.pares.get((a, b), (0, 0, 0))
+        if pokemon1 == a:
+            return vitorias_a, vitorias_b, lutas
+        return vitorias_b, vitorias_a, lutas
@@ -0,0 +1,203 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from src.analisar_dados_banco import salvar_tabela
+
+logging.basicConfig(level=logging.INFO)
+
+IC_CONFIANCA = float(os.getenv("IC_CONFIANCA", "0.95"))
+IC_REAMOSTRAGENS = int(os.getenv("IC_REAMOSTRAGENS", "1000"))
+IC_WORKERS = int(os.getenv("IC_WORKERS") or os.cpu_count() or 1)
+
+# Elementos (réplicas x combates) das matrizes de pesos em memória, somados
+# entre os workers (~20 bytes por elemento nos temporários do bincount)
+IC_ELEMENTOS_MEMORIA = int(os.getenv("IC_ELEMENTOS_MEMORIA", "4000000"))
+
+# Abaixo deste total de elementos (reamostragens x combates) o bootstrap roda
+# no próprio processo: subir o pool custaria mais que o cálculo
+ELEMENTOS_MIN_POOL = int(os.getenv("IC_ELEMENTOS_MIN_POOL", "50000000"))
+
+# Réplicas por tarefa do pool; cada bloco tem sua própria semente
+REAMOSTRAGENS_POR_BLOCO = 50
+
+
+# ------------------ Wilson ------------------ #
+
+
+def intervalo_wilson(vitorias, lutas, confianca: float = IC_CONFIANCA):
+    """
+    Intervalo de Wilson para proporções, vetorizado.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Limites inferior e superior (0 a 1).
+        Pokémon sem lutas recebem o intervalo [0, 1].
+    """
+    vitorias = np.asarray(vitorias, dtype=float)
+    lutas = np.asarray(lutas, dtype=float)
+    z = NormalDist().inv_cdf(0.5 + confianca / 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = vitorias / lutas
+        denominador = 1 + z**2 / lutas
+        centro = (p + z**2 / (2 * lutas)) / denominador
+        margem = z * np.sqrt(p * (1 - p) / lutas + z**2 / (4 * lutas**2)) / denominador
+
+    inferior = np.where(lutas > 0, np.clip(centro - margem, 0, 1), 0.0)
+    superior = np.where(lutas > 0, np.clip(centro + margem, 0, 1), 1.0)
+    return inferior, superior
+
+
+# ------------------ Bootstrap em lotes ------------------ #
+
+# Arrays de combates de cada processo do pool (enviados uma vez por worker)
+_COMBATES = {}
+
+
+def _iniciar_worker(first, second, winner, n_pokemon, elementos_por_lote):
+    _COMBATES.update(
+        first=first,
+        second=second,
+        winner=winner,
+        n_pokemon=n_pokemon,
+        elementos_por_lote=elementos_por_lote,
+    )
+
+
+def _reamostrar(semente, n_reamostragens: int) -> np.ndarray:
+    """
+    Gera taxas de vitória para n_reamostragens réplicas bootstrap de Poisson.
+
+    Cada réplica dá a cada combate um peso Poisson(1); um lote de réplicas é
+    resolvido com um único bincount sobre índices deslocados por réplica.
+
+    Returns:
+        np.ndarray: Matriz (n_reamostragens, n_pokemon) de taxas (NaN sem lutas).
+    """
+    first, second, winner = _COMBATES["first"], _COMBATES["second"], _COMBATES["winner"]
+    k = _COMBATES["n_pokemon"]
+    n = len(winner)
+    rng = np.random.default_rng(semente)
+
+    tamanho_lote = max(
+        1, min(n_reamostragens, _COMBATES["elementos_por_lote"] // max(n, 1))
+    )
+    taxas = []
+    for inicio in range(0, n_reamostragens, tamanho_lote):
+        b = min(tamanho_lote, n_reamostragens - inicio)
+        pesos = rng.poisson(1.0, size=(b, n)).astype(np.float32).ravel()
+        deslocamento = (np.arange(b, dtype=np.int64) * k)[:, None]
+
+        vitorias = np.bincount(
+            (winner[None, :] + deslocamento).ravel(), weights=pesos, minlength=b * k
+        )
+        lutas = np.bincount(
+            (first[None, :] + deslocamento).ravel(), weights=pesos, minlength=b * k
+        ) + np.bincount(
+            (second[None, :] + deslocamento).ravel(), weights=pesos, minlength=b * k
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            taxas.append((vitorias / lutas).reshape(b, k).astype(np.float32))
+    return np.vstack(taxas)
+
+
+def intervalo_bootstrap(
+    df: pd.DataFrame,
+    n_reamostragens: int = IC_REAMOSTRAGENS,
+    confianca: float = IC_CONFIANCA,
+    workers: int = IC_WORKERS,
+    semente: int = 42,
+) -> pd.DataFrame:
+    """
+    Intervalos bootstrap (percentis) da taxa de vitória de cada Pokémon.
+
+    As réplicas são divididas em blocos de tamanho fixo com sementes
+    independentes (SeedSequence.spawn) e, com dados acima de ELEMENTOS_MIN_POOL,
+    distribuídas num pool de processos; o resultado é reprodutível para a mesma
+    semente, com qualquer número de workers. A memória das matrizes de pesos
+    (IC_ELEMENTOS_MEMORIA) é dividida entre os workers.
+
+    Args:
+        df (pd.DataFrame): combates_com_nomes (nome_first, nome_second, nome_winner).
+
+    Returns:
+        pd.DataFrame: Pokemon, IC_Bootstrap_Inf, IC_Bootstrap_Sup (0 a 1).
+    """
+    df = df.dropna(subset=["nome_first", "nome_second"])
+    codigos, nomes = pd.factorize(
+        pd.concat([df["nome_first"], df["nome_second"], df["nome_winner"]]),
+        use_na_sentinel=False,
+    )
+    n = len(df)
+    first = codigos[:n].astype(np.int64)
+    second = codigos[n : 2 * n].astype(np.int64)
+    winner = codigos[2 * n :].astype(np.int64)
+
+    tamanhos = [
+        min(REAMOSTRAGENS_POR_BLOCO, n_reamostragens - inicio)
+        for inicio in range(0, n_reamostragens, REAMOSTRAGENS_POR_BLOCO)
+    ]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    tarefas = list(zip(sementes, tamanhos))
+    workers = max(1, min(workers, len(tarefas)))
+    if n_reamostragens * n < ELEMENTOS_MIN_POOL:
+        workers = 1
+    dados = (first, second, winner, len(nomes), IC_ELEMENTOS_MEMORIA // workers)
+
+    if workers == 1:
+        _iniciar_worker(*dados)
+        partes = [_reamostrar(s, b) for s, b in tarefas]
+    else:
+        # "spawn": este código também roda dentro do pool de threads dos estágios
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_worker,
+            initargs=dados,
+        ) as pool:
+            partes = list(pool.map(_reamostrar, *zip(*tarefas)))
+
+    taxas = np.vstack(partes)
+    alfa = (1 - confianca) / 2
+    with np.errstate(all="ignore"):
+        inferior, superior = np.nanpercentile(taxas, [100 * alfa, 100 * (1 - alfa)], axis=0)
+
+    resultado = pd.DataFrame(
+        {"Pokemon": nomes, "IC_Bootstrap_Inf": inferior, "IC_Bootstrap_Sup": superior}
+    )
+    return resultado[resultado["Pokemon"].notna()]
+
+
+# ------------------ Estágio analítico ------------------ #
+
+
+def analisar_intervalos_taxa(
+    df_combates: pd.DataFrame,
+    df_estatisticas: pd.DataFrame,
+    n_reamostragens: int = IC_REAMOSTRAGENS,
+):
+    """
+    Calcula intervalos de confiança da Taxa_Vitoria(%) de cada Pokémon
+    (Wilson e bootstrap) e salva 'intervalos_taxa_vitoria'.
+    """
+    if df_combates is None or df_estatisticas is None:
+        return pd.DataFrame()
+
+    df_ic = df_estatisticas[["Pokemon", "Lutas", "Vitorias", "Taxa_Vitoria(%)"]].copy()
+    inferior, superior = intervalo_wilson(df_ic["Vitorias"], df_ic["Lutas"])
+    df_ic["IC_Wilson_Inf(%)"] = (inferior * 100).round(2)
+    df_ic["IC_Wilson_Sup(%)"] = (superior * 100).round(2)
+
+    if n_reamostragens > 0:
+        df_boot = intervalo_bootstrap(df_combates, n_reamostragens=n_reamostragens)
+        df_ic = df_ic.merge(df_boot, on="Pokemon", how="left")
+        df_ic["IC_Bootstrap_Inf(%)"] = (df_ic.pop("IC_Bootstrap_Inf") * 100).round(2)
+        df_ic["IC_Bootstrap_Sup(%)"] = (df_ic.pop("IC_Bootstrap_Sup") * 100).round(2)
+
+    salvar_tabela(df_ic, "intervalos_taxa_vitoria")
+    return df_ic
@@ -0,0 +1,352 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Linhas por lote quando o perfil é calculado sobre um DataFrame em memória
+LINHAS_POR_LOTE = 500_000
+
+# Tamanho da amostra uniforme (quantis e gráficos); exata abaixo disso
+PERFIL_AMOSTRA = int(os.getenv("PERFIL_AMOSTRA", "20000"))
+
+# Contagem exata de distintos até estes limites; acima, estimativa KMV
+LIMITE_DISTINTOS_EXATOS = 100_000
+LIMITE_LINHAS_EXATAS = 10_000_000
+K_MINIMOS = 4096
+
+# Máximo de categorias contadas por coluna (acima disso, mantém as mais frequentes)
+MAX_CATEGORIAS = 10_000
+
+# Colunas numéricas com até este número de valores distintos têm frequências
+# exatas (histograma exato); acima disso o histograma vem da amostra
+MAX_VALORES_EXATOS = 2_000
+
+QUANTIS = (0.25, 0.5, 0.75)
+
+
+# ------------------ Sketches ------------------ #
+
+
+def _uniao_ordenada(ordenado: np.ndarray, novos: np.ndarray) -> np.ndarray:
+    """União de um array ordenado sem repetições com novos valores (por ordenação)."""
+    valores = np.sort(np.concatenate([ordenado, novos]))
+    if len(valores) == 0:
+        return valores
+    return valores[np.concatenate(([True], valores[1:] != valores[:-1]))]
+
+
+class ContadorDistintos:
+    """
+    Conta valores distintos por hash de 64 bits.
+
+    Mantém o conjunto exato até 'limite' elementos; acima disso guarda só os
+    k menores hashes (sketch KMV), com erro relativo da ordem de 1/sqrt(k).
+    """
+
+    def __init__(self, limite: int = LIMITE_DISTINTOS_EXATOS, k: int = K_MINIMOS):
+        self.limite = limite
+        self.k = k
+        self.aproximado = False
+        self.valores = np.empty(0, dtype=np.uint64)
+
+    def atualizar(self, hashes: np.ndarray):
+        if self.aproximado:
+            hashes = hashes[hashes < self.valores[-1]]
+        valores = _uniao_ordenada(self.valores, hashes)
+        if len(valores) > self.limite:
+            self.aproximado = True
+        self.valores = valores[: self.k] if self.aproximado else valores
+
+    def estimativa(self) -> int:
+        if not self.aproximado:
+            return len(self.valores)
+        return int((self.k - 1) / (float(self.valores[self.k - 1]) / 2.0**64))
+
+    def margem(self) -> int:
+        """Erro absoluto da estimativa (~95%: dois desvios de 1/sqrt(k - 2)); 0 se exata."""
+        if not self.aproximado:
+            return 0
+        return int(np.ceil(2 * self.estimativa() / np.sqrt(self.k - 2)))
+
+
+class _MomentosColuna:
+    """Contagem, mínimo, máximo, média e M2 combináveis entre lotes (Chan et al.)."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def atualizar(self, valores: np.ndarray):
+        valores = valores[~np.isnan(valores)]
+        n_b = len(valores)
+        if n_b == 0:
+            return
+        media_b = valores.mean()
+        m2_b = ((valores - media_b) ** 2).sum()
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta**2 * self.n * n_b / n
+        self.n = n
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+    def desvio(self) -> float:
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else np.nan
+
+
+# ------------------ Resultado ------------------ #
+
+
+@dataclass
+class PerfilColuna:
+    nome: str
+    tipo: str
+    nao_nulos: int
+    nulos: int
+    distintos: int
+    distintos_aproximado: bool
+    numerica: bool
+    minimo: float = np.nan
+    maximo: float = np.nan
+    media: float = np.nan
+    desvio: float = np.nan
+    quantis: dict = field(default_factory=dict)
+    top: object = None
+    freq: int = 0
+    frequencias: pd.Series = None
+
+
+@dataclass
+class PerfilDataset:
+    """Perfil de um dataset calculado numa única passada (ver perfilar)."""
+
+    nome: str
+    linhas: int
+    colunas: list
+    memoria_bytes: int
+    duplicados: int
+    duplicados_aproximado: bool
+    amostra: pd.DataFrame
+    # Erro (~95%) da contagem aproximada de duplicados; com 'duplicados' None,
+    # a estimativa ficou abaixo desse erro e não é informada
+    duplicados_margem: int = 0
+
+    @property
+    def shape(self) -> tuple:
+        return (self.linhas, len(self.colunas))
+
+    @property
+    def amostra_exata(self) -> bool:
+        return len(self.amostra) == self.linhas
+
+    def nulos(self) -> pd.Series:
+        return pd.Series({c.nome: c.nulos for c in self.colunas}, dtype="int64")
+
+    def texto_duplicados(self) -> str:
+        """Duplicados para relatórios: exato, aproximado com margem ou indisponível."""
+        if not self.duplicados_aproximado:
+            return str(self.duplicados)
+        if self.duplicados is None:
+            return f"indisponível (abaixo do erro da estimativa, ±{self.duplicados_margem})"
+        return f"~{self.duplicados} (±{self.duplicados_margem}, 95%)"
+
+    def tabela_estrutura(self) -> pd.DataFrame:
+        """Equivalente a DataFrame.info(): tipo, não nulos, nulos e distintos."""
+        return pd.DataFrame(
+            {
+                "Coluna": [c.nome for c in self.colunas],
+                "Tipo": [c.tipo for c in self.colunas],
+                "Nao_Nulos": [c.nao_nulos for c in self.colunas],
+                "Nulos": [c.nulos for c in self.colunas],
+                "Distintos": [
+                    f"~{c.distintos}" if c.distintos_aproximado else c.distintos
+                    for c in self.colunas
+                ],
+            }
+        )
+
+    def tabela_numerica(self) -> pd.DataFrame:
+        """Equivalente a describe().transpose() das colunas numéricas."""
+        linhas = {
+            c.nome: {
+                "count": c.nao_nulos,
+                "mean": c.media,
+                "std": c.desvio,
+                "min": c.minimo,
+                **{f"{int(q * 100)}%": v for q, v in c.quantis.items()},
+                "max": c.maximo,
+            }
+            for c in self.colunas
+            if c.numerica
+        }
+        return pd.DataFrame.from_dict(linhas, orient="index")
+
+    def histograma(self, coluna: str, bins: int = 15):
+        """
+        Histograma de uma coluna numérica sem reler os dados.
+
+        Usa as frequências exatas quando a coluna tem poucos valores distintos;
+        caso contrário, a amostra uniforme com pesos escalados ao total de
+        registros não nulos.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, bool]: Contagens, bordas das faixas e
+            se o histograma é exato.
+        """
+        perfil = next(c for c in self.colunas if c.nome == coluna)
+        if perfil.frequencias is not None:
+            valores = perfil.frequencias.index.to_numpy(dtype=float)
+            pesos = perfil.frequencias.to_numpy(dtype=float)
+            exato = True
+        else:
+            valores = pd.to_numeric(self.amostra[coluna], errors="coerce").dropna().to_numpy()
+            pesos = np.full(len(valores), perfil.nao_nulos / max(len(valores), 1))
+            exato = self.amostra_exata
+        contagens, bordas = np.histogram(
+            valores, bins=bins, range=(perfil.minimo, perfil.maximo), weights=pesos
+        )
+        return contagens, bordas, exato
+
+    def tabela_categorica(self) -> pd.DataFrame:
+        """Equivalente a describe().transpose() das colunas categóricas."""
+        linhas = {
+            c.nome: {"count": c.nao_nulos, "unique": c.distintos, "top": c.top, "freq": c.freq}
+            for c in self.colunas
+            if not c.numerica
+        }
+        return pd.DataFrame.from_dict(linhas, orient="index")
+
+
+# ------------------ Passada única ------------------ #
+
+
+def _lotes(dados, linhas_por_lote: int):
+    if isinstance(dados, pd.DataFrame):
+        for inicio in range(0, max(len(dados), 1), linhas_por_lote):
+            yield dados.iloc[inicio : inicio + linhas_por_lote]
+    else:
+        yield from dados
+
+
+def perfilar(
+    dados,
+    nome: str = "Dataset",
+    tamanho_amostra: int = PERFIL_AMOSTRA,
+    linhas_por_lote: int = LINHAS_POR_LOTE,
+    semente: int = 42,
+) -> PerfilDataset:
+    """
+    Calcula o perfil de um dataset lendo cada lote uma única vez.
+
+    Contagens de linhas, nulos, mínimo, máximo, média e desvio são exatos;
+    distintos e duplicados são exatos até LIMITE_DISTINTOS_EXATOS /
+    LIMITE_LINHAS_EXATAS e estimados (KMV) acima disso. Quantis vêm de uma
+    amostra uniforme de tamanho fixo (bottom-k por prioridade aleatória),
+    exata quando o dataset cabe nela. A memória fica limitada por esses
+    limites e pelo tamanho da amostra, qualquer que seja o número de linhas.
+
+    Args:
+        dados (pd.DataFrame ou iterable): DataFrame ou sequência de lotes
+            (ex.: pd.read_csv(..., chunksize=...)).
+    """
+    rng = np.random.default_rng(semente)
+    linhas = 0
+    memoria = 0
+    tipos, nulos, distintos, momentos, categorias = {}, {}, {}, {}, {}
+    frequencias = {}
+    linhas_distintas = ContadorDistintos(limite=LIMITE_LINHAS_EXATAS)
+    amostra = None
+
+    for lote in _lotes(dados, linhas_por_lote):
+        if lote.empty and linhas:
+            continue
+        linhas += len(lote)
+        memoria += int(lote.memory_usage(index=False, deep=False).sum())
+        if len(lote):
+            linhas_distintas.atualizar(
+                pd.util.hash_pandas_object(lote, index=False).to_numpy(np.uint64)
+            )
+
+        for coluna in lote.columns:
+            serie = lote[coluna]
+            tipos.setdefault(coluna, str(serie.dtype))
+            presentes = serie.dropna()
+            nulos[coluna] = nulos.get(coluna, 0) + len(serie) - len(presentes)
+            distintos.setdefault(coluna, ContadorDistintos()).atualizar(
+                pd.util.hash_array(presentes.to_numpy()).astype(np.uint64)
+            )
+            if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+                momentos.setdefault(coluna, _MomentosColuna()).atualizar(
+                    presentes.to_numpy(dtype=float)
+                )
+                contagens = frequencias.get(coluna, pd.Series(dtype="int64"))
+                if contagens is not None:
+                    contagens = contagens.add(presentes.value_counts(), fill_value=0)
+                    frequencias[coluna] = (
+                        contagens if len(contagens) <= MAX_VALORES_EXATOS else None
+                    )
+            else:
+                contagens = categorias.get(coluna, pd.Series(dtype="int64"))
+                contagens = contagens.add(presentes.value_counts(), fill_value=0)
+                if len(contagens) > MAX_CATEGORIAS:
+                    contagens = contagens.nlargest(MAX_CATEGORIAS // 2)
+                categorias[coluna] = contagens
+
+        # Amostra uniforme: mantém as linhas de menor prioridade aleatória
+        candidatos = lote.assign(_prioridade=rng.random(len(lote)))
+        if amostra is not None and len(amostra) >= tamanho_amostra:
+            candidatos = candidatos[candidatos["_prioridade"] < amostra["_prioridade"].max()]
+        amostra = pd.concat([amostra, candidatos]) if amostra is not None else candidatos
+        if len(amostra) > tamanho_amostra:
+            amostra = amostra.nsmallest(tamanho_amostra, "_prioridade")
+
+    if amostra is None:  # nenhum lote (sequência vazia)
+        amostra = pd.DataFrame()
+    else:
+        amostra = amostra.drop(columns="_prioridade").sort_index()
+
+    colunas = []
+    for coluna, tipo in tipos.items():
+        perfil = PerfilColuna(
+            nome=coluna,
+            tipo=tipo,
+            nao_nulos=linhas - nulos[coluna],
+            nulos=nulos[coluna],
+            distintos=distintos[coluna].estimativa(),
+            distintos_aproximado=distintos[coluna].aproximado,
+            numerica=coluna in momentos,
+        )
+        if coluna in momentos and momentos[coluna].n:
+            m = momentos[coluna]
+            perfil.minimo, perfil.maximo = float(m.minimo), float(m.maximo)
+            perfil.media, perfil.desvio = float(m.media), m.desvio()
+            valores = pd.to_numeric(amostra[coluna], errors="coerce").dropna()
+            perfil.quantis = {q: float(valores.quantile(q)) for q in QUANTIS}
+            perfil.frequencias = frequencias.get(coluna)
+        elif coluna in categorias and len(categorias[coluna]):
+            perfil.top = categorias[coluna].idxmax()
+            perfil.freq = int(categorias[coluna].max())
+        colunas.append(perfil)
+
+    # Acima de LIMITE_LINHAS_EXATAS, linhas - distintas subtrai uma estimativa
+    # com erro de alguns por cento: só é informada se superar esse erro
+    margem = linhas_distintas.margem()
+    duplicados = linhas - linhas_distintas.estimativa()
+    if linhas_distintas.aproximado and duplicados <= margem:
+        duplicados = None
+
+    return PerfilDataset(
+        nome=nome,
+        linhas=linhas,
+        colunas=colunas,
+        memoria_bytes=memoria,
+        duplicados=duplicados,
+        duplicados_aproximado=linhas_distintas.aproximado,
+        duplicados_margem=margem,
+        amostra=amostra,
+    )
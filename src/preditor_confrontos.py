@@ -0,0 +1,216 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.analisar_dados_banco import COLUNAS_ATRIBUTOS, salvar_tabela
+from src.cubo_analitico import SEM_TIPO, normalizar_dimensoes
+
+logging.basicConfig(level=logging.INFO)
+
+# Linhas por lote ao acumular gradiente e Hessiana (memória limitada)
+LINHAS_POR_LOTE = 250_000
+
+VARIAVEL_INTERCEPTO = "(posicao_first)"
+
+
+@dataclass(frozen=True)
+class ModeloConfrontos:
+    """Regressão logística sobre diferenças de atributos (first - second)."""
+
+    variaveis: tuple
+    pesos: np.ndarray
+    desvio: np.ndarray
+    intercepto: float
+
+
+# ------------------ Variáveis ------------------ #
+
+
+def _tipos(df_attr: pd.DataFrame) -> list:
+    df = normalizar_dimensoes(df_attr)
+    tipos = set(df["Tipo_Primario"]) | set(df["Tipo_Secundario"])
+    return sorted(tipos - {SEM_TIPO})
+
+
+def matriz_variaveis(df_attr: pd.DataFrame, variaveis=None) -> pd.DataFrame:
+    """
+    Monta a matriz de variáveis por Pokémon (indexada por ID): os seis
+    atributos de batalha, Legendary (0/1) e um indicador por tipo.
+
+    Args:
+        variaveis (iterable, optional): Colunas esperadas (as do modelo treinado);
+            tipos ausentes viram zero.
+    """
+    df = normalizar_dimensoes(df_attr).set_index("ID")
+    X = df[COLUNAS_ATRIBUTOS].apply(pd.to_numeric, errors="coerce")
+    X = X.fillna(X.mean())
+    X["Legendary"] = df["Legendary"].astype(float)
+
+    for tipo in _tipos(df_attr):
+        X[f"Tipo_{tipo}"] = (
+            (df["Tipo_Primario"] == tipo) | (df["Tipo_Secundario"] == tipo)
+        ).astype(float)
+
+    if variaveis is not None:
+        X = X.reindex(columns=list(variaveis), fill_value=0.0)
+    return X
+
+
+# ------------------ Treino ------------------ #
+
+
+def _sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def _lotes(valores, i_first, i_second, desvio):
+    """Gera, por lote, as diferenças padronizadas com a coluna de intercepto."""
+    for inicio in range(0, len(i_first), LINHAS_POR_LOTE):
+        fim = min(inicio + LINHAS_POR_LOTE, len(i_first))
+        diferencas = valores[i_first[inicio:fim]] - valores[i_second[inicio:fim]]
+        yield inicio, fim, np.column_stack([diferencas / desvio, np.ones(fim - inicio)])
+
+
+def treinar_preditor(
+    df_combates: pd.DataFrame,
+    df_attr: pd.DataFrame,
+    regularizacao: float = 1.0,
+    iteracoes: int = 25,
+    tolerancia: float = 1e-6,
+) -> ModeloConfrontos:
+    """
+    Treina a regressão logística P(first vence) por Newton-Raphson.
+
+    Cada combate é representado por X[first] - X[second] (padronizado); gradiente
+    e Hessiana são acumulados em lotes de LINHAS_POR_LOTE linhas, então o custo
+    de memória não cresce com o histórico de combates.
+
+    Args:
+        df_combates (pd.DataFrame): combates (first_pokemon, second_pokemon, winner).
+        df_attr (pd.DataFrame): atributos_pokemon.
+        regularizacao (float): Penalidade L2 sobre os pesos (exceto intercepto).
+    """
+    X_pokemon = matriz_variaveis(df_attr)
+    posicao = pd.Series(np.arange(len(X_pokemon)), index=X_pokemon.index)
+    validos = df_combates["first_pokemon"].isin(posicao.index) & df_combates[
+        "second_pokemon"
+    ].isin(posicao.index)
+    df = df_combates[validos]
+
+    i_first = posicao.loc[df["first_pokemon"]].to_numpy()
+    i_second = posicao.loc[df["second_pokemon"]].to_numpy()
+    y = (df["winner"] == df["first_pokemon"]).to_numpy(dtype=float)
+    valores = X_pokemon.to_numpy(dtype=float)
+    n, p = len(y), valores.shape[1] + 1
+
+    # Desvio das diferenças (centradas em zero por simetria), também em lotes
+    soma_quadrados = np.zeros(p - 1)
+    for _, _, Z in _lotes(valores, i_first, i_second, np.ones(p - 1)):
+        soma_quadrados += (Z[:, :-1] ** 2).sum(axis=0)
+    desvio = np.sqrt(soma_quadrados / max(n, 1))
+    desvio[desvio == 0] = 1.0
+
+    theta = np.zeros(p)
+    penalidade = np.full(p, regularizacao)
+    penalidade[-1] = 0.0
+
+    for iteracao in range(iteracoes):
+        gradiente = penalidade * theta
+        hessiana = np.diag(penalidade)
+        for inicio, fim, Z in _lotes(valores, i_first, i_second, desvio):
+            prob = _sigmoide(Z @ theta)
+            gradiente += Z.T @ (prob - y[inicio:fim])
+            hessiana += (Z * (prob * (1 - prob))[:, None]).T @ Z
+
+        passo = np.linalg.solve(hessiana, gradiente)
+        theta -= passo
+        if np.abs(passo).max() < tolerancia:
+            break
+
+    acertos = 0
+    for inicio, fim, Z in _lotes(valores, i_first, i_second, desvio):
+        acertos += ((Z @ theta >= 0) == (y[inicio:fim] == 1)).sum()
+    logging.info(
+        f"Preditor de confrontos treinado: {n} combates, {p - 1} variáveis, "
+        f"{iteracao + 1} iterações, acurácia (treino) {acertos / max(n, 1):.3f}"
+    )
+    return ModeloConfrontos(
+        variaveis=tuple(X_pokemon.columns),
+        pesos=theta[:-1],
+        desvio=desvio,
+        intercepto=float(theta[-1]),
+    )
+
+
+# ------------------ Persistência ------------------ #
+
+
+def modelo_para_tabela(modelo: ModeloConfrontos) -> pd.DataFrame:
+    """Serializa o modelo em formato tabular (uma linha por variável)."""
+    return pd.DataFrame(
+        {
+            "Variavel": list(modelo.variaveis) + [VARIAVEL_INTERCEPTO],
+            "Peso": np.append(modelo.pesos, modelo.intercepto),
+            "Desvio": np.append(modelo.desvio, 1.0),
+        }
+    )
+
+
+def modelo_de_tabela(df_modelo: pd.DataFrame) -> ModeloConfrontos:
+    """Reconstrói o modelo a partir da tabela 'modelo_confrontos'."""
+    df = df_modelo.set_index("Variavel")
+    intercepto = float(df.loc[VARIAVEL_INTERCEPTO, "Peso"])
+    df = df.drop(index=VARIAVEL_INTERCEPTO)
+    return ModeloConfrontos(
+        variaveis=tuple(df.index),
+        pesos=df["Peso"].to_numpy(dtype=float),
+        desvio=df["Desvio"].to_numpy(dtype=float),
+        intercepto=intercepto,
+    )
+
+
+def analisar_preditor(df_combates: pd.DataFrame, df_attr: pd.DataFrame):
+    """Treina o preditor e salva seus pesos na tabela 'modelo_confrontos'."""
+    if df_combates is None or df_attr is None:
+        return pd.DataFrame()
+
+    df_modelo = modelo_para_tabela(treinar_preditor(df_combates, df_attr))
+    salvar_tabela(df_modelo, "modelo_confrontos")
+    return df_modelo
+
+
+# ------------------ Previsão em lote ------------------ #
+
+
+def pontuar_pokemons(modelo: ModeloConfrontos, df_attr: pd.DataFrame) -> pd.Series:
+    """
+    Pontuação linear de cada Pokémon (indexada por ID).
+
+    Como o modelo é linear nas diferenças, logit(first vence) =
+    pontuação[first] - pontuação[second] + intercepto.
+    """
+    X = matriz_variaveis(df_attr, modelo.variaveis)
+    return pd.Series(
+        (X.to_numpy(dtype=float) / modelo.desvio) @ modelo.pesos, index=X.index
+    )
+
+
+def prever_todos_pares(modelo: ModeloConfrontos, df_attr: pd.DataFrame) -> pd.DataFrame:
+    """
+    Probabilidades de vitória para todos os pares de Pokémon em uma chamada.
+
+    Returns:
+        pd.DataFrame: Matriz quadrada (linhas e colunas = Nome); célula [a, b] é
+        a probabilidade de a vencer b.
+    """
+    pontuacoes = pontuar_pokemons(modelo, df_attr)
+    s = pontuacoes.to_numpy()
+    diferenca = s[:, None] - s[None, :]
+    matriz = 0.5 * (
+        _sigmoide(diferenca + modelo.intercepto)
+        + 1 - _sigmoide(-diferenca + modelo.intercepto)
+    )
+    nomes = df_attr.set_index("ID").loc[pontuacoes.index, "Nome"].to_numpy()
+    return pd.DataFrame(matriz.astype(np.float32), index=nomes, columns=nomes)
@@ -18,9 +18,10 @@ import logging
 import os
 from io import BytesIO
 
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from src.cache_graficos import CacheGraficos, renderizar_grafico
+
 logging.basicConfig(level=logging.INFO)
 
 
@@ -54,25 +55,83 @@ def _table_from_df(df: pd.DataFrame, max_rows: int = 20):
     return cleaned
 
 
-def _matplotlib_to_reportlab_image(fig, width=450, height=300):
-    """Converte figura Matplotlib para reportlab.platypus.Image via BytesIO."""
-    buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    img = Image(buf, width=width, height=height)
-    plt.close(fig)
-    return img
+# ------------------ Gráficos ------------------ #
+# Cada gráfico é desenhado a partir apenas do recorte do DataFrame que ele
+# usa; a imagem é guardada no cache pelo hash desse recorte e dos parâmetros,
+# então só os gráficos cujos dados mudaram são renderizados novamente.
+
+
+def _desenhar_top10_vitorias(ax, df):
+    top = df.sort_values("Vitorias", ascending=True)
+    ax.barh(top["Pokemon"].astype(str), top["Vitorias"].astype(float))
+    ax.set_xlabel("Vitórias")
+    ax.set_title("Top 10 Pokémon por Vitórias")
+
+
+def _desenhar_ranking_tipos(ax, df):
+    ax.bar(df["Types"].astype(str), df["media_taxa_vitoria"].astype(float))
+    ax.set_xlabel("Tipo")
+    ax.set_ylabel("Taxa Média de Vitória")
+    ax.set_title("Ranking de Tipos - Taxa Média de Vitória")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+
+
+def _desenhar_correlacoes(ax, df):
+    corr_plot = df.sort_values("Correlação_com_Vitórias", ascending=True)
+    ax.barh(
+        corr_plot["Atributo"].astype(str),
+        corr_plot["Correlação_com_Vitórias"].astype(float),
+    )
+    ax.set_xlabel("Correlação com Vitórias")
+    ax.set_title("Correlação entre Atributos e Vitórias (Top 10)")
+
+
+def _desenhar_distribuicao(ax, df):
+    labels = df["Faixa"].astype(str).tolist()
+    sizes = df["Proporção(%)"].astype(float).tolist()
+    # fallback para barras se só um item
+    if len(sizes) > 1:
+        ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+    else:
+        ax.bar(labels, sizes)
+    ax.set_title("Distribuição por Faixa de Taxa de Vitória (%)")
+
+
+def _desenhar_comparativo(ax, df):
+    ax.barh(df["Atributo"].astype(str), df["Diferença"].astype(float))
+    ax.set_xlabel("Diferença (Top10 - Média Geral)")
+    ax.set_title("Atributos com maior diferença (Top10 vs Média Geral)")
+    ax.invert_yaxis()
+
+
+def _desenhar_torneio(ax, df):
+    campeoes = df.sort_values("Campeao(%)", ascending=True)
+    ax.barh(campeoes["Pokemon"].astype(str), campeoes["Campeao(%)"].astype(float))
+    ax.set_xlabel("Chance de Título (%)")
+    ax.set_title("Simulação de Torneio - Chance de Título")
+
+
+def _grafico_em_cache(cache, desenhar, df, figsize=(8, 4), width=450, height=300):
+    """Imagem reportlab do gráfico, renderizada ou lida do cache."""
+    png = renderizar_grafico(desenhar, df, cache=cache, figsize=figsize)
+    return Image(BytesIO(png), width=width, height=height)
 
 
 def gerar_relatorio_pdf(
     dados_pipeline,
     nome_arquivo="report_pipeline_pokemon.pdf",
     pasta="report/analises",
+    df_torneio=None,
+    cache=None,
 ):
     """
     Gera um relatório em PDF com o resumo do pipeline, tabelas e gráficos.
     Espera que dados_pipeline seja a tupla retornada por inicializar_dados().
+    df_torneio (opcional) é o resultado de simular_torneio(), incluído como seção.
+    cache (CacheGraficos, opcional): cache das imagens dos gráficos; por padrão
+    usa CACHE_GRAFICOS_DIR.
     """
+    cache = cache or CacheGraficos()
     if not os.path.exists(pasta):
         os.makedirs(pasta, exist_ok=True)
 
@@ -213,74 +272,45 @@ def gerar_relatorio_pdf(
     story.append(Table(_table_from_df(distribuicao, max_rows=12)))
     story.append(PageBreak())
 
-    # --- Gráficos (Matplotlib embutido) ---
-    # Função auxiliar local para adicionar figura ao story
-    def _add_fig_to_story(fig, w=450, h=300):
-        img = _matplotlib_to_reportlab_image(fig, width=w, height=h)
+    # --- Gráficos (Matplotlib, com cache das imagens) ---
+    # Função auxiliar local para adicionar gráfico ao story
+    def _add_grafico_to_story(desenhar, df, figsize=(8, 4), w=450, h=300):
+        img = _grafico_em_cache(cache, desenhar, df, figsize=figsize, width=w, height=h)
         story.append(img)
         story.append(Spacer(1, 12))
 
     # Top 10 Vitórias - gráfico horizontal
     if not top10_vitorias.empty:
         try:
-            fig, ax = plt.subplots(figsize=(8, 4))
             # selecionar até 10
-            top = top10_vitorias.head(10).sort_values("Vitorias", ascending=True)
-            ax.barh(top["Pokemon"].astype(str), top["Vitorias"].astype(float))
-            ax.set_xlabel("Vitórias")
-            ax.set_title("Top 10 Pokémon por Vitórias")
-            _add_fig_to_story(fig)
+            top = top10_vitorias.head(10)[["Pokemon", "Vitorias"]]
+            _add_grafico_to_story(_desenhar_top10_vitorias, top)
         except Exception as e:
             logging.warning(f"Erro ao gerar gráfico Top10 Vitórias: {e}")
 
     # Ranking tipos - barras
     if not ranking_tipos.empty:
         try:
-            fig, ax = plt.subplots(figsize=(8, 4))
-            top_types = ranking_tipos.head(15)
-            ax.bar(
-                top_types["Types"].astype(str),
-                top_types["media_taxa_vitoria"].astype(float),
-            )
-            ax.set_xlabel("Tipo")
-            ax.set_ylabel("Taxa Média de Vitória")
-            ax.set_title("Ranking de Tipos - Taxa Média de Vitória")
-            plt.xticks(rotation=45, ha="right")
-            _add_fig_to_story(fig)
+            top_types = ranking_tipos.head(15)[["Types", "media_taxa_vitoria"]]
+            _add_grafico_to_story(_desenhar_ranking_tipos, top_types)
         except Exception as e:
             logging.warning(f"Erro ao gerar gráfico Ranking Tipos: {e}")
 
     # Correlações - horizontal
     if not correlacoes.empty:
         try:
-            fig, ax = plt.subplots(figsize=(8, 4))
-            corr_plot = correlacoes.head(10).sort_values(
-                "Correlação_com_Vitórias", ascending=True
-            )
-            ax.barh(
-                corr_plot["Atributo"].astype(str),
-                corr_plot["Correlação_com_Vitórias"].astype(float),
-            )
-            ax.set_xlabel("Correlação com Vitórias")
-            ax.set_title("Correlação entre Atributos e Vitórias (Top 10)")
-            _add_fig_to_story(fig)
+            corr_plot = correlacoes.head(10)[["Atributo", "Correlação_com_Vitórias"]]
+            _add_grafico_to_story(_desenhar_correlacoes, corr_plot)
         except Exception as e:
             logging.warning(f"Erro ao gerar gráfico Correlações: {e}")
 
     # Distribuição - pizza / barras (se tiver proporção)
     if not distribuicao.empty and "Proporção(%)" in distribuicao.columns:
         try:
-            fig, ax = plt.subplots(figsize=(6, 4))
-            labels = distribuicao["Faixa"].astype(str).tolist()
-            sizes = distribuicao["Proporção(%)"].astype(float).tolist()
-            # fallback para barras se só um item
-            if len(sizes) > 1:
-                ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-                ax.set_title("Distribuição por Faixa de Taxa de Vitória (%)")
-            else:
-                ax.bar(labels, sizes)
-                ax.set_title("Distribuição por Faixa de Taxa de Vitória (%)")
-            _add_fig_to_story(fig, w=350, h=250)
+            faixas = distribuicao[["Faixa", "Proporção(%)"]]
+            _add_grafico_to_story(
+                _desenhar_distribuicao, faixas, figsize=(6, 4), w=350, h=250
+            )
         except Exception as e:
             logging.warning(f"Erro ao gerar gráfico Distribuição: {e}")
 
@@ -288,14 +318,9 @@ def gerar_relatorio_pdf(
     if not comparativo.empty and "Diferença" in comparativo.columns:
         try:
             top_attrs = comparativo.sort_values("Diferença", ascending=False).head(10)
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.barh(
-                top_attrs["Atributo"].astype(str), top_attrs["Diferença"].astype(float)
+            _add_grafico_to_story(
+                _desenhar_comparativo, top_attrs[["Atributo", "Diferença"]]
             )
-            ax.set_xlabel("Diferença (Top10 - Média Geral)")
-            ax.set_title("Atributos com maior diferença (Top10 vs Média Geral)")
-            ax.invert_yaxis()
-            _add_fig_to_story(fig)
         except Exception as e:
             logging.warning(f"Erro ao gerar gráfico Comparativo Atributos: {e}")
 
@@ -312,6 +337,29 @@ def gerar_relatorio_pdf(
 
     story.append(PageBreak())
 
+    # --- Simulação de Torneio (opcional) ---
+    df_torneio = _df_safe(df_torneio)
+    if not df_torneio.empty:
+        story.append(
+            Paragraph("<b>Simulação de Torneio (Monte Carlo)</b>", styles["Heading1"])
+        )
+        story.append(
+            Paragraph(
+                "Chance (%) de cada participante alcançar cada rodada de um chaveamento "
+                "de eliminação simples, estimada por simulação a partir dos confrontos "
+                "diretos e do preditor de confrontos.",
+                styles["Normal"],
+            )
+        )
+        story.append(Spacer(1, 12))
+        story.append(Table(_table_from_df(df_torneio, max_rows=17)))
+        story.append(Spacer(1, 12))
+        try:
+            _add_grafico_to_story(_desenhar_torneio, df_torneio[["Pokemon", "Campeao(%)"]])
+        except Exception as e:
+            logging.warning(f"Erro ao gerar gráfico Torneio: {e}")
+        story.append(PageBreak())
+
     # --- Conclusões ---
     story.append(Paragraph("<b>Conclusões</b>", styles["Heading1"]))
     story.append(
@@ -327,6 +375,9 @@ def gerar_relatorio_pdf(
     try:
         doc.build(story)
         logging.info(f"✅ Relatório PDF gerado com sucesso: {caminho_pdf}")
+        logging.info(
+            f"Gráficos: {cache.acertos} reaproveitados do cache, {cache.falhas} renderizados"
+        )
     except Exception as e:
         logging.error(f"Erro ao construir o PDF: {e}")
         raise
@@ -6,8 +6,20 @@ from datetime import datetime
 from dotenv import load_dotenv
 import pandas as pd
 
-from src.analisar_dados_banco import inicializar_dados
+from src.analisar_dados_banco import inicializar_dados, carregar_tabela
+from src.carga_dashboard import carregar_pacote_dashboard
+from src.figuras_dashboard import especificacoes_figuras
+from src.atualizacao_incremental import identificar_delta, aplicar_delta_combates
+from src.estagios_analise import (
+    FONTES,
+    carregar_registro,
+    impressao_digital,
+    registrar_fonte,
+)
+from src.geracao_relatorios import FilaRelatorios
 from src.report_analise import gerar_relatorio_pdf
+from src.simulador_torneio import simular_torneio_banco
+from src.snapshot_dados import publicar_snapshot
 from src.obtencao_dados import (
     verificar_saude,
     obter_token_jwt,
@@ -16,9 +28,16 @@ from src.obtencao_dados import (
     obter_dados_combate,
     transformar_csv,
 )
+from src.perfil_dados import perfilar
+from src.validacao_dados import validar_dados
+from src.deduplicacao import (
+    ArmazemImpressoes,
+    delta_do_historico,
+    registrar_historico,
+    remover_duplicados_hash,
+)
 from src.tratamento_dados import (
     informacoes_dataset,
-    remover_duplicados,
     conectar_banco,
     gerar_pdf_report,
 )
@@ -82,51 +101,122 @@ def executar_pipeline(gerar_pdf=True, inserir_banco=True, iniciar_dashboard_flag
         logging.error(f"❌ Erro ao carregar CSVs: {e}")
         return
 
-    # -------------------- Informações dos datasets -------------------- #
-    logging.info(informacoes_dataset(df_pokemons, "pokemons"))
-    logging.info(informacoes_dataset(df_atributos, "atributos_pokemon"))
-    logging.info(informacoes_dataset(df_combates, "combates"))
+    # -------------------- Validação -------------------- #
+    df_pokemons = validar_dados(df_pokemons, "pokemons")
+    referencias = {"pokemons": df_pokemons}
+    df_atributos = validar_dados(df_atributos, "atributos_pokemon", referencias)
+    df_combates = validar_dados(df_combates, "combates", referencias)
 
     # -------------------- Limpeza -------------------- #
-    df_combates = remover_duplicados(df_combates)
+    armazem = ArmazemImpressoes()
+    df_combates, df_novos, deduplicador = remover_duplicados_hash(df_combates, armazem)
+
+    # -------------------- Informações dos datasets -------------------- #
+    # Um perfil por dataset já tratado, reaproveitado pelos PDFs individuais
+    perfis = {}
+    for df, tabela in zip(
+        [df_pokemons, df_atributos, df_combates], ["pokemons", "atributos_pokemon", "combates"]
+    ):
+        perfis[tabela] = perfilar(df, tabela)
+        logging.info(informacoes_dataset(df, tabela, perfil=perfis[tabela]))
 
     # -------------------- Inserção no banco -------------------- #
+    df_delta = None
+    combates_inseridos = False
     if inserir_banco:
+        if len(armazem):
+            df_delta = delta_do_historico(df_novos, deduplicador)
+        else:
+            # Sem histórico de impressões: compara com a tabela do banco
+            df_delta = identificar_delta(df_combates, carregar_tabela("combates"))
+        registro_atributos = carregar_registro().get("atributos_pokemon", {})
+        if impressao_digital(df_atributos) != registro_atributos.get("impressao"):
+            df_delta = None  # nomes/atributos mudaram: delta não basta
+
         dfs = [df_pokemons, df_atributos, df_combates]
         tabelas = ["pokemons", "atributos_pokemon", "combates"]
 
         for df, tabela in zip(dfs, tabelas):
             try:
-                conectar_banco(df, tabela)
+                if conectar_banco(df, tabela) and tabela in FONTES:
+                    registrar_fonte(df, tabela)
+                    combates_inseridos |= tabela == "combates"
             except Exception as e:
                 logging.warning(f"⚠️ Erro ao inserir dados na tabela {tabela}: {e}")
 
-    # -------------------- PDFs individuais -------------------- #
-    if gerar_pdf:
-        dfs = [df_pokemons, df_atributos, df_combates]
-        tabelas = ["pokemons", "atributos_pokemon", "combates"]
+        if not combates_inseridos:
+            # A fonte e o histórico não avançaram: aplicar o delta agora faria a
+            # próxima execução acrescentar os mesmos combates outra vez. As
+            # análises seguem o estado atual (e consistente) do banco.
+            df_delta = None
+
+    # -------------------- Relatórios (pool de processos) -------------------- #
+    # Cada PDF roda em seu próprio processo; os de qualidade começam enquanto
+    # as análises do relatório consolidado são calculadas
+    with FilaRelatorios() as fila:
+        # -------------------- PDFs individuais -------------------- #
+        if gerar_pdf:
+            dfs = [df_pokemons, df_atributos, df_combates]
+            tabelas = ["pokemons", "atributos_pokemon", "combates"]
+
+            for df, tabela in zip(dfs, tabelas):
+                fila.enviar(
+                    tabela,
+                    gerar_pdf_report,
+                    df,
+                    nome=tabela,
+                    pasta=os.path.join(REPORT_DIR, "tratamento"),
+                    perfil=perfis[tabela],
+                )
 
-        for df, tabela in zip(dfs, tabelas):
-            try:
-                gerar_pdf_report(
-                    df, nome=tabela, pasta=os.path.join(REPORT_DIR, "tratamento")
+        # -------------------- Relatório consolidado -------------------- #
+        try:
+            dados = aplicar_delta_combates(df_delta) if df_delta is not None else None
+            completo = dados is None
+            if completo:
+                dados = inicializar_dados()
+            if dados:
+                # O histórico de impressões só avança depois que o delta (ou a
+                # reconstrução completa) chegou ao banco
+                if combates_inseridos:
+                    try:
+                        registrar_historico(deduplicador, completo=completo)
+                    except Exception as e:
+                        logging.warning(f"⚠️ Erro ao atualizar o histórico de impressões: {e}")
+                df_torneio = None
+                try:
+                    logging.info("🏆 Simulando torneio dos 16 Pokémon com mais vitórias...")
+                    df_torneio = simular_torneio_banco()
+                except Exception as e:
+                    logging.warning(f"⚠️ Erro ao simular torneio: {e}")
+
+                logging.info("📄 Gerando relatório PDF final...")
+                fila.enviar(
+                    "analises",
+                    gerar_relatorio_pdf,
+                    dados,
+                    pasta=os.path.join(REPORT_DIR, "analises"),
+                    df_torneio=df_torneio,
                 )
-            except Exception as e:
-                logging.warning(f"⚠️ Erro ao gerar PDF {tabela}: {e}")
+            else:
+                logging.warning("⚠️ Nenhum dado retornado por inicializar_dados().")
+        except Exception as e:
+            logging.exception(f"❌ Falha na geração do relatório final: {e}")
+
+        caminhos = fila.aguardar()
 
-    # -------------------- Relatório consolidado -------------------- #
+    if caminhos.get("analises"):
+        logging.info(f"✅ Relatório criado em: {caminhos['analises']}")
+
+    # -------------------- Snapshot do dashboard -------------------- #
+    # O dashboard lê esta versão (tabelas e figuras prontas) de arquivos
+    # locais, sem consultar o banco
     try:
-        dados = inicializar_dados()
-        if dados:
-            logging.info("📄 Gerando relatório PDF final...")
-            caminho = gerar_relatorio_pdf(
-                dados, pasta=os.path.join(REPORT_DIR, "analises")
-            )
-            logging.info(f"✅ Relatório criado em: {caminho}")
-        else:
-            logging.warning("⚠️ Nenhum dado retornado por inicializar_dados().")
+        pacote = carregar_pacote_dashboard()
+        if pacote is not None:
+            publicar_snapshot(pacote, figuras=especificacoes_figuras(pacote))
     except Exception as e:
-        logging.exception(f"❌ Falha na geração do relatório final: {e}")
+        logging.warning(f"⚠️ Erro ao publicar snapshot do dashboard: {e}")
 
     logging.info("✅ Pipeline concluído com sucesso!")
 
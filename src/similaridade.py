@@ -0,0 +1,131 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.analisar_dados_banco import COLUNAS_ATRIBUTOS
+from src.preditor_confrontos import matriz_variaveis
+
+logging.basicConfig(level=logging.INFO)
+
+COLUNAS_VIZINHOS = ["Pokemon", "Vizinho", "Distancia", "Ordem"]
+
+
+@dataclass(frozen=True)
+class IndiceSimilaridade:
+    """Vetores de atributos padronizados, um por Pokémon, prontos para consulta."""
+
+    nomes: np.ndarray
+    vetores: np.ndarray
+    normas: np.ndarray
+    posicao: dict
+
+
+# ------------------ Índice ------------------ #
+
+
+def construir_indice(df_attr: pd.DataFrame, peso_tipo: float = 0.0) -> IndiceSimilaridade:
+    """
+    Constrói o índice de similaridade a partir de atributos_pokemon.
+
+    Os seis atributos de batalha são padronizados (z-score); com peso_tipo > 0,
+    os indicadores de tipo entram multiplicados por esse peso, aproximando
+    Pokémon que compartilham tipos.
+    """
+    X = matriz_variaveis(df_attr)
+    stats = X[COLUNAS_ATRIBUTOS]
+    desvio = stats.std().replace(0, 1)
+    partes = [((stats - stats.mean()) / desvio).to_numpy(dtype=float)]
+    if peso_tipo > 0:
+        tipos = [c for c in X.columns if c.startswith("Tipo_")]
+        partes.append(X[tipos].to_numpy(dtype=float) * peso_tipo)
+
+    vetores = np.hstack(partes)
+    nomes = df_attr.set_index("ID").loc[X.index, "Nome"].to_numpy()
+    logging.info(
+        f"Índice de similaridade: {vetores.shape[0]} Pokémon, {vetores.shape[1]} dimensões"
+    )
+    return IndiceSimilaridade(
+        nomes=nomes,
+        vetores=vetores,
+        normas=(vetores**2).sum(axis=1),
+        posicao={nome: i for i, nome in enumerate(nomes)},
+    )
+
+
+def _distancias(indice: IndiceSimilaridade, linhas: np.ndarray) -> np.ndarray:
+    """Distâncias euclidianas das linhas pedidas para todos (identidade de Gram)."""
+    produto = indice.vetores[linhas] @ indice.vetores.T
+    quadrado = indice.normas[linhas, None] + indice.normas[None, :] - 2 * produto
+    return np.sqrt(np.maximum(quadrado, 0))
+
+
+# ------------------ Consultas ------------------ #
+
+
+def vizinhos_em_lote(indice: IndiceSimilaridade, nomes, k: int = 5) -> pd.DataFrame:
+    """
+    k vizinhos mais próximos de cada Pokémon pedido, numa única operação matricial.
+
+    Returns:
+        pd.DataFrame: Pokemon, Vizinho, Distancia, Ordem (1 = mais próximo).
+    """
+    linhas = np.array([indice.posicao[n] for n in nomes if n in indice.posicao])
+    if linhas.size == 0:
+        return pd.DataFrame(columns=COLUNAS_VIZINHOS)
+
+    k = min(k, len(indice.nomes) - 1)
+    dist = _distancias(indice, linhas)
+    dist[np.arange(len(linhas)), linhas] = np.inf  # ignora o próprio Pokémon
+
+    candidatos = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    ordem = np.take_along_axis(dist, candidatos, axis=1).argsort(axis=1)
+    vizinhos = np.take_along_axis(candidatos, ordem, axis=1)
+
+    return pd.DataFrame(
+        {
+            "Pokemon": np.repeat(indice.nomes[linhas], k),
+            "Vizinho": indice.nomes[vizinhos.ravel()],
+            "Distancia": np.take_along_axis(dist, vizinhos, axis=1).ravel().round(4),
+            "Ordem": np.tile(np.arange(1, k + 1), len(linhas)),
+        }
+    )
+
+
+def vizinhos_mais_proximos(indice: IndiceSimilaridade, nome: str, k: int = 5):
+    """k vizinhos mais próximos de um Pokémon (ver vizinhos_em_lote)."""
+    return vizinhos_em_lote(indice, [nome], k)
+
+
+def similaridade_todos_pares(
+    indice: IndiceSimilaridade, k: int = 5, bloco: int = 256
+) -> pd.DataFrame:
+    """
+    k vizinhos mais próximos de todos os Pokémon (consulta em lote de todos os pares).
+
+    Percorre o índice em blocos de linhas, de modo que a memória fica em
+    bloco x N distâncias, e não na matriz N x N completa.
+
+    Returns:
+        pd.DataFrame: mesmas colunas de vizinhos_em_lote().
+    """
+    partes = [
+        vizinhos_em_lote(indice, indice.nomes[inicio : inicio + bloco], k)
+        for inicio in range(0, len(indice.nomes), bloco)
+    ]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_VIZINHOS)
+    return pd.concat(partes, ignore_index=True)
+
+
+def comparar_taxas(df_vizinhos: pd.DataFrame, df_estatisticas: pd.DataFrame):
+    """
+    Acrescenta a taxa de vitória de cada vizinho e a diferença, em pontos
+    percentuais, para a do Pokémon consultado.
+    """
+    taxas = df_estatisticas.set_index("Pokemon")["Taxa_Vitoria(%)"]
+    df = df_vizinhos.copy()
+    df["Taxa_Vitoria(%)"] = df["Vizinho"].map(taxas)
+    df["Diferenca_Taxa(pp)"] = (df["Taxa_Vitoria(%)"] - df["Pokemon"].map(taxas)).round(2)
+    return df
@@ -0,0 +1,219 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.analisar_dados_banco import carregar_tabela
+from src.preditor_confrontos import modelo_de_tabela, prever_todos_pares
+
+logging.basicConfig(level=logging.INFO)
+
+TORNEIO_SIMULACOES = int(os.getenv("TORNEIO_SIMULACOES", "1000000"))
+TORNEIO_WORKERS = int(os.getenv("TORNEIO_WORKERS", str(os.cpu_count() or 1)))
+
+# Chaveamentos simulados por tarefa do pool; cada bloco tem sua própria semente
+SIMULACOES_POR_BLOCO = 250_000
+
+# Peso (em lutas "virtuais") da probabilidade a priori frente ao histórico direto
+PESO_PRIORI = 10.0
+
+
+# ------------------ Probabilidades de confronto ------------------ #
+
+
+def _priori_taxas(nomes, df_estatisticas: pd.DataFrame) -> np.ndarray:
+    """
+    Probabilidade a priori por taxa de vitória (fórmula log5), usada quando
+    não há modelo treinado.
+    """
+    taxas = (
+        df_estatisticas.set_index("Pokemon")
+        .reindex(nomes)
+        .eval("(Vitorias + 1) / (Lutas + 2)")  # suavização de Laplace
+        .fillna(0.5)
+        .to_numpy()
+    )
+    a, b = taxas[:, None], taxas[None, :]
+    return (a - a * b) / (a + b - 2 * a * b)
+
+
+def matriz_probabilidades(
+    nomes,
+    df_confrontos: pd.DataFrame,
+    matriz_modelo: pd.DataFrame = None,
+    df_estatisticas: pd.DataFrame = None,
+    peso_priori: float = PESO_PRIORI,
+) -> np.ndarray:
+    """
+    Probabilidade de nomes[i] vencer nomes[j] para todos os pares escolhidos.
+
+    Combina o histórico de confrontos diretos com uma probabilidade a priori
+    (preditor de confrontos ou, na falta dele, log5 das taxas de vitória):
+    P = (vitórias_ij + peso * priori_ij) / (lutas_ij + peso).
+    """
+    nomes = list(nomes)
+    if matriz_modelo is not None:
+        priori = matriz_modelo.reindex(index=nomes, columns=nomes).to_numpy(dtype=float)
+        priori = np.where(np.isnan(priori), 0.5, priori)
+    elif df_estatisticas is not None:
+        priori = _priori_taxas(nomes, df_estatisticas)
+    else:
+        priori = np.full((len(nomes), len(nomes)), 0.5)
+
+    vitorias = np.zeros((len(nomes), len(nomes)))
+    lutas = np.zeros_like(vitorias)
+    if df_confrontos is not None and not df_confrontos.empty:
+        posicao = {nome: i for i, nome in enumerate(nomes)}
+        df = df_confrontos[
+            df_confrontos["Pokemon_A"].isin(posicao)
+            & df_confrontos["Pokemon_B"].isin(posicao)
+        ]
+        ia = df["Pokemon_A"].map(posicao).to_numpy()
+        ib = df["Pokemon_B"].map(posicao).to_numpy()
+        vitorias[ia, ib] = df["Vitorias_A"].to_numpy()
+        vitorias[ib, ia] = df["Vitorias_B"].to_numpy()
+        lutas[ia, ib] = lutas[ib, ia] = df["Lutas"].to_numpy()
+
+    P = (vitorias + peso_priori * priori) / (lutas + peso_priori)
+    np.fill_diagonal(P, 0.5)
+    return P
+
+
+# ------------------ Simulação ------------------ #
+
+
+def simular_chaveamento(P: np.ndarray, n_simulacoes: int, semente) -> np.ndarray:
+    """
+    Simula n_simulacoes chaveamentos de eliminação simples, vetorizado por rodada.
+
+    A posição i da chave enfrenta i+1 na primeira rodada (0x1, 2x3, ...).
+
+    Returns:
+        np.ndarray: Contagens (n_participantes, n_rodadas + 1); coluna r conta
+        quantas vezes o participante chegou à rodada r (a última é o título).
+    """
+    n = P.shape[0]
+    rodadas = int(np.log2(n))
+    rng = np.random.default_rng(semente)
+
+    contagens = np.zeros((n, rodadas + 1), dtype=np.int64)
+    contagens[:, 0] = n_simulacoes
+    vivos = np.tile(np.arange(n, dtype=np.int16), (n_simulacoes, 1))
+    for r in range(1, rodadas + 1):
+        a, b = vivos[:, 0::2], vivos[:, 1::2]
+        vence_a = rng.random(a.shape) < P[a, b]
+        vivos = np.where(vence_a, a, b)
+        contagens[:, r] = np.bincount(vivos.ravel(), minlength=n)
+    return contagens
+
+
+def simular_torneio(
+    nomes,
+    P: np.ndarray,
+    n_simulacoes: int = TORNEIO_SIMULACOES,
+    workers: int = TORNEIO_WORKERS,
+    semente: int = 42,
+) -> pd.DataFrame:
+    """
+    Estima, por Monte Carlo, a chance de cada participante alcançar cada rodada.
+
+    As simulações são divididas em blocos de tamanho fixo com sementes
+    independentes e distribuídas num pool de processos; o resultado é
+    reprodutível para a mesma semente, com qualquer número de workers.
+
+    Args:
+        nomes (list): Participantes na ordem da chave (tamanho potência de 2).
+        P (np.ndarray): Matriz de probabilidades de matriz_probabilidades().
+
+    Returns:
+        pd.DataFrame: Posicao, Pokemon, chance (%) por rodada e Campeao(%),
+        ordenado pela chance de título.
+    """
+    nomes = list(nomes)
+    n = len(nomes)
+    if n < 2 or n & (n - 1):
+        raise ValueError(f"O chaveamento precisa de 2^k participantes (recebeu {n}).")
+
+    tamanhos = [
+        min(SIMULACOES_POR_BLOCO, n_simulacoes - inicio)
+        for inicio in range(0, n_simulacoes, SIMULACOES_POR_BLOCO)
+    ]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    workers = max(1, min(workers, len(tamanhos)))
+
+    if workers == 1:
+        partes = [simular_chaveamento(P, t, s) for t, s in zip(tamanhos, sementes)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            partes = list(
+                pool.map(simular_chaveamento, [P] * len(tamanhos), tamanhos, sementes)
+            )
+
+    chances = np.sum(partes, axis=0) / n_simulacoes * 100
+    rodadas = chances.shape[1] - 1
+    colunas = [f"Rodada_{r + 1}(%)" for r in range(1, rodadas)] + ["Campeao(%)"]
+    resultado = pd.DataFrame(chances[:, 1:].round(3), columns=colunas)
+    resultado.insert(0, "Pokemon", nomes)
+    resultado.insert(0, "Posicao", np.arange(1, n + 1))
+
+    logging.info(f"Torneio simulado: {n} participantes, {n_simulacoes} chaveamentos")
+    return resultado.sort_values("Campeao(%)", ascending=False).reset_index(drop=True)
+
+
+# ------------------ Uso a partir do banco ------------------ #
+
+
+def simular_torneio_banco(nomes=None, n_simulacoes: int = TORNEIO_SIMULACOES, **kwargs):
+    """
+    Simula um torneio usando as tabelas analíticas do banco.
+
+    Args:
+        nomes (list, optional): Participantes na ordem da chave. Padrão: os 16
+            Pokémon com mais vitórias (ou a maior potência de 2 disponível),
+            semeados 1x16, 8x9, ... (chave clássica).
+
+    Returns:
+        pd.DataFrame ou None: Resultado de simular_torneio().
+    """
+    df_estatisticas = carregar_tabela("estatisticas_pokemon")
+    df_confrontos = carregar_tabela("confrontos_diretos")
+    if df_estatisticas is None:
+        logging.warning("estatisticas_pokemon não encontrada; torneio não simulado.")
+        return None
+
+    if nomes is None:
+        # Chave de até 16: com menos Pokémon, a maior potência de 2 disponível
+        disponiveis = min(16, len(df_estatisticas))
+        if disponiveis < 2:
+            logging.warning("Menos de 2 Pokémon em estatisticas_pokemon; torneio não simulado.")
+            return None
+        tamanho = 1 << (disponiveis.bit_length() - 1)
+        nomes = ordem_chave(
+            df_estatisticas.nlargest(tamanho, "Vitorias")["Pokemon"].tolist()
+        )
+
+    matriz_modelo = None
+    df_modelo = carregar_tabela("modelo_confrontos")
+    df_attr = carregar_tabela("atributos_pokemon")
+    if df_modelo is not None and df_attr is not None and not df_modelo.empty:
+        matriz_modelo = prever_todos_pares(modelo_de_tabela(df_modelo), df_attr)
+
+    P = matriz_probabilidades(nomes, df_confrontos, matriz_modelo, df_estatisticas)
+    return simular_torneio(nomes, P, n_simulacoes=n_simulacoes, **kwargs)
+
+
+def ordem_chave(cabecas: list) -> list:
+    """Distribui participantes já ranqueados na chave clássica (1x16, 8x9, ...)."""
+    n = len(cabecas)
+    if n < 2 or n & (n - 1):
+        raise ValueError(f"O chaveamento precisa de 2^k participantes (recebeu {n}).")
+    ordem = [1]
+    while len(ordem) < len(cabecas):
+        total = 2 * len(ordem) + 1
+        ordem = [x for s in ordem for x in (s, total - s)]
+    return [cabecas[s - 1] for s in ordem]
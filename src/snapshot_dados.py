@@ -0,0 +1,305 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.carga_dashboard import TABELAS_DASHBOARD, PacoteDashboard
+
+logging.basicConfig(level=logging.INFO)
+
+# Diretório com as versões publicadas dos dados do dashboard
+PASTA_SNAPSHOTS = os.getenv(
+    "SNAPSHOT_DIR", os.path.join(os.getenv("OUT_DIR", "out"), "snapshots")
+)
+
+# Versões antigas mantidas em disco além da atual
+SNAPSHOTS_MANTIDOS = int(os.getenv("SNAPSHOTS_MANTIDOS", "2"))
+
+# Arquivo com o nome da versão atual (trocado de forma atômica)
+ARQUIVO_ATUAL = "ATUAL"
+ARQUIVO_MANIFESTO = "manifesto.json"
+# Arquivos Arrow das tabelas e JSON das figuras, compartilhados entre as versões
+PASTA_TABELAS = "tabelas"
+PASTA_FIGURAS = "figuras"
+# Manifestos de outro formato (ex.: snapshots antigos) são ignorados
+FORMATO_MANIFESTO = 2
+
+
+# ------------------ Publicação ------------------ #
+
+
+def _normalizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipos canônicos, os mesmos de uma leitura do banco: a mesma tabela vinda
+    do DAG em memória ou relida do banco gera os mesmos bytes (e a mesma
+    versão), em vez de uma versão nova só porque int32 virou int64 ou uma
+    coluna 'string'/'category' virou object.
+    """
+    tipos = {}
+    for coluna, tipo in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(tipo):
+            continue
+        if pd.api.types.is_integer_dtype(tipo):
+            tipos[coluna] = "float64" if df[coluna].hasnans else "int64"
+        elif pd.api.types.is_float_dtype(tipo):
+            tipos[coluna] = "float64"
+        elif isinstance(tipo, pd.CategoricalDtype) or pd.api.types.is_string_dtype(tipo):
+            tipos[coluna] = object
+    return df.astype(tipos)
+
+
+def _serializar(df: pd.DataFrame):
+    """Bytes Arrow IPC (Feather v2, sem compressão) e impressão do conteúdo."""
+    tabela = pa.Table.from_pandas(_normalizar_tipos(df), preserve_index=False)
+    saida = pa.BufferOutputStream()
+    feather.write_feather(tabela, saida, compression="uncompressed")
+    dados = saida.getvalue()
+    return dados, hashlib.sha256(dados).hexdigest()[:16]
+
+
+def arquivo_tabela(nome: str, impressao: str, pasta: str = PASTA_SNAPSHOTS) -> str:
+    """Caminho do arquivo de uma versão de tabela (endereçado pelo conteúdo)."""
+    return os.path.join(pasta, PASTA_TABELAS, f"{nome}-{impressao}.arrow")
+
+
+def arquivo_figura(nome: str, impressao: str, pasta: str = PASTA_SNAPSHOTS) -> str:
+    """Caminho da especificação JSON de uma versão de figura."""
+    return os.path.join(pasta, PASTA_FIGURAS, f"{nome}-{impressao}.json")
+
+
+def _gravar_se_ausente(arquivo: str, dados: bytes):
+    """Grava um arquivo endereçado pelo conteúdo (se já existe, é idêntico)."""
+    if os.path.exists(arquivo):
+        return
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, arquivo)
+
+
+def publicar_snapshot(
+    pacote: PacoteDashboard, pasta: str = PASTA_SNAPSHOTS, figuras: dict = None
+) -> str:
+    """
+    Publica as tabelas do dashboard como uma nova versão do snapshot.
+
+    Cada tabela vira um arquivo Arrow IPC (Feather v2) sem compressão, que
+    pode ser lido por memory-map, nomeado pela impressão do seu conteúdo:
+    tabelas que não mudaram desde a execução anterior reaproveitam o mesmo
+    arquivo. 'figuras' ({nome: especificação JSON}) são publicadas da mesma
+    forma, para o dashboard não remontá-las. O manifesto da execução
+    (versão, impressão e linhas de cada tabela) é escrito num diretório
+    próprio e só então o arquivo ATUAL passa a apontar para ele (os.replace,
+    atômico): quem lê nunca vê uma versão pela metade.
+
+    Returns:
+        str: Nome da versão publicada (identificador da execução).
+    """
+    versao = f"v{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    destino = os.path.join(pasta, versao)
+    os.makedirs(destino, exist_ok=True)
+    os.makedirs(os.path.join(pasta, PASTA_TABELAS), exist_ok=True)
+    os.makedirs(os.path.join(pasta, PASTA_FIGURAS), exist_ok=True)
+
+    tabelas = {}
+    for nome in TABELAS_DASHBOARD:
+        df = getattr(pacote, nome)
+        if df is None:
+            tabelas[nome] = None
+            continue
+        dados, impressao = _serializar(df)
+        _gravar_se_ausente(arquivo_tabela(nome, impressao, pasta), dados)
+        tabelas[nome] = {"impressao": impressao, "linhas": len(df)}
+
+    versoes_figuras = {}
+    for nome, especificacao in (figuras or {}).items():
+        dados = especificacao.encode("utf-8")
+        impressao = hashlib.sha256(dados).hexdigest()[:16]
+        _gravar_se_ausente(arquivo_figura(nome, impressao, pasta), dados)
+        versoes_figuras[nome] = impressao
+
+    anterior = manifesto_snapshot(pasta)
+    manifesto = {
+        "formato": FORMATO_MANIFESTO,
+        "versao": versao,
+        "criado_em": datetime.now().isoformat(),
+        "tabelas": tabelas,
+        "figuras": versoes_figuras,
+    }
+    with open(os.path.join(destino, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+    temporario = os.path.join(pasta, f"{ARQUIVO_ATUAL}.{os.getpid()}.tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(versao)
+    os.replace(temporario, os.path.join(pasta, ARQUIVO_ATUAL))
+
+    alteradas = tabelas_alteradas(anterior, manifesto)
+    logging.info(
+        f"📦 Snapshot do dashboard publicado: {destino} "
+        f"({len(alteradas)} de {len(tabelas)} tabelas alteradas: {', '.join(alteradas) or '-'})"
+    )
+
+    _remover_versoes_antigas(pasta, versao)
+    return versao
+
+
+def _remover_versoes_antigas(pasta: str, atual: str, manter: int = SNAPSHOTS_MANTIDOS):
+    """
+    Remove versões além das 'manter' mais recentes (nunca a atual) e os
+    arquivos de tabela e de figura que nenhuma versão restante referencia.
+    """
+    versoes = sorted(
+        (d for d in os.listdir(pasta) if d.startswith("v") and d != atual),
+        reverse=True,
+    )
+    for versao in versoes[manter:]:
+        # No Windows a remoção falha se algum processo ainda mapeia a versão
+        shutil.rmtree(os.path.join(pasta, versao), ignore_errors=True)
+
+    referenciados = set()
+    for versao in [atual, *versoes[:manter]]:
+        manifesto = manifesto_snapshot(pasta, versao) or {}
+        for nome, versao_tabela in versoes_tabelas(manifesto).items():
+            if versao_tabela is not None:
+                referenciados.add(arquivo_tabela(nome, versao_tabela, pasta))
+        for nome, versao_figura in manifesto.get("figuras", {}).items():
+            referenciados.add(arquivo_figura(nome, versao_figura, pasta))
+
+    for subpasta, extensao in [(PASTA_TABELAS, ".arrow"), (PASTA_FIGURAS, ".json")]:
+        for arquivo in os.listdir(os.path.join(pasta, subpasta)):
+            caminho = os.path.join(pasta, subpasta, arquivo)
+            if arquivo.endswith(extensao) and caminho not in referenciados:
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+
+
+# ------------------ Leitura ------------------ #
+
+
+def versao_snapshot(pasta: str = PASTA_SNAPSHOTS):
+    """Versão atual do snapshot, ou None se nenhum foi publicado."""
+    try:
+        with open(os.path.join(pasta, ARQUIVO_ATUAL), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def manifesto_snapshot(pasta: str = PASTA_SNAPSHOTS, versao: str = None):
+    """
+    Manifesto da versão atual (ou 'versao'): identificador da execução e,
+    por tabela, impressão do conteúdo e número de linhas. None se não houver
+    snapshot ou se o manifesto for de outro formato.
+    """
+    versao = versao or versao_snapshot(pasta)
+    if versao is None:
+        return None
+    try:
+        with open(os.path.join(pasta, versao, ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifesto.get("formato") != FORMATO_MANIFESTO:
+        return None
+    return manifesto
+
+
+def versoes_tabelas(manifesto: dict) -> dict:
+    """{tabela: impressão} de um manifesto (None para tabelas ausentes)."""
+    return {
+        nome: info["impressao"] if info else None
+        for nome, info in (manifesto or {}).get("tabelas", {}).items()
+    }
+
+
+def tabelas_alteradas(anterior: dict, atual: dict) -> list:
+    """Tabelas cuja versão mudou entre dois manifestos (todas, sem anterior)."""
+    versoes_anteriores = versoes_tabelas(anterior)
+    return [
+        nome
+        for nome, versao in versoes_tabelas(atual).items()
+        if anterior is None or versoes_anteriores.get(nome) != versao
+    ]
+
+
+def ler_tabela_snapshot(nome: str, versao_tabela: str, pasta: str = PASTA_SNAPSHOTS):
+    """Tabela Arrow numa versão (impressão), lida por memory-map (None se ausente)."""
+    if versao_tabela is None:
+        return None
+    arquivo = arquivo_tabela(nome, versao_tabela, pasta)
+    if not os.path.exists(arquivo):
+        return None
+    return feather.read_table(arquivo, memory_map=True)
+
+
+def ler_figura_snapshot(nome: str, versao_figura: str, pasta: str = PASTA_SNAPSHOTS):
+    """Especificação JSON de uma figura publicada (None se ausente)."""
+    if versao_figura is None:
+        return None
+    try:
+        with open(arquivo_figura(nome, versao_figura, pasta), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def para_pandas(tabela: pa.Table) -> pd.DataFrame:
+    """
+    Converte uma tabela Arrow em DataFrame reaproveitando os buffers.
+
+    Colunas numéricas sem nulos viram arrays NumPy sobre a própria memória
+    do arquivo (split_blocks evita consolidar colunas num bloco copiado) e
+    textos ficam como string[pyarrow], sem criar um objeto Python por valor.
+    Os arrays resultantes são somente leitura.
+    """
+    return tabela.to_pandas(
+        split_blocks=True,
+        types_mapper={
+            pa.string(): pd.StringDtype("pyarrow"),
+            pa.large_string(): pd.StringDtype("pyarrow"),
+        }.get,
+    )
+
+
+def carregar_snapshot(pasta: str = PASTA_SNAPSHOTS, versao: str = None):
+    """
+    Carrega a versão atual (ou 'versao') do snapshot como PacoteDashboard.
+
+    As tabelas referenciam os arquivos mapeados em memória (ver para_pandas):
+    processos que leem a mesma versão compartilham as páginas do sistema
+    operacional, e as colunas não devem ser alteradas no lugar.
+
+    Returns:
+        PacoteDashboard ou None se não houver snapshot publicado.
+    """
+    manifesto = manifesto_snapshot(pasta, versao)
+    if manifesto is None:
+        return None
+    versoes = versoes_tabelas(manifesto)
+
+    tabelas, tempos = {}, {}
+    for nome in TABELAS_DASHBOARD:
+        inicio = time.perf_counter()
+        tabela = ler_tabela_snapshot(nome, versoes.get(nome), pasta)
+        tabelas[nome] = para_pandas(tabela) if tabela is not None else None
+        tempos[nome] = time.perf_counter() - inicio
+
+    if tabelas["atributos_pokemon"] is None:
+        logging.warning(f"Snapshot {manifesto['versao']} sem base de atributos; ignorado.")
+        return None
+
+    logging.info(
+        f"Snapshot {manifesto['versao']} carregado em {sum(tempos.values()):.3f}s "
+        f"({sum(t is not None for t in tabelas.values())} tabelas)"
+    )
+    return PacoteDashboard(**tabelas, tempos=tempos)
@@ -1,6 +1,5 @@
 
 import os
-import io
 import platform
 from datetime import datetime
 import pandas as pd
@@ -9,6 +8,7 @@ matplotlib.use("Agg")  # backend não-gráfico (evita erro de Tcl/Tk)
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 from src.banco_conexao import obter_engine
+from src.perfil_dados import perfilar
 import seaborn as sns
 
 sns.set_style("whitegrid")
@@ -33,56 +33,69 @@ def desenhar_linha(titulo=None):
     return f"\n{linha}\n"
 
 
-def resumo_qualidade(dataframe):
+def texto_estrutura(perfil) -> str:
+    """Resumo no estilo de DataFrame.info() a partir de um perfil."""
+    return (
+        f"{perfil.nome}: {perfil.linhas} registros, {len(perfil.colunas)} colunas\n"
+        f"{perfil.tabela_estrutura().to_string(index=False)}\n"
+        f"Memória: {perfil.memoria_bytes / 1024:.1f} KB"
+    )
+
+
+def resumo_qualidade(dataframe, perfil=None):
     """
     Gera resumo de qualidade dos dados, incluindo nulos e duplicados.
 
     Args:
         dataframe (pd.DataFrame): DataFrame a ser analisado.
+        perfil (PerfilDataset, optional): Perfil já calculado (ver perfilar).
 
     Returns:
         str: Resumo textual da qualidade dos dados.
     """
+    perfil = perfil or perfilar(dataframe)
     return f"""{desenhar_linha("Qualidade dos Dados")}
 Registros Nulos por Coluna:
-{dataframe.isnull().sum()}
+{perfil.nulos()}
 {desenhar_linha()}
-Registros Duplicados: {dataframe.duplicated().sum()}
+Registros Duplicados: {perfil.texto_duplicados()}
 {desenhar_linha()}"""
 
 
-def informacoes_dataset(dataframe: pd.DataFrame, nome: str) -> str:
+def informacoes_dataset(dataframe: pd.DataFrame, nome: str, perfil=None) -> str:
     """
     Retorna informações detalhadas sobre o dataset, incluindo:
-    - Info do DataFrame
+    - Estrutura (tipos, não nulos, distintos e memória)
     - Shape
     - Resumo categórico
     - Resumo numérico
     - Qualidade de dados (nulos e duplicados)
 
+    Tudo vem de um único perfil (src/perfil_dados.py), calculado numa só
+    passada sobre os dados.
+
     Args:
         dataframe (pd.DataFrame): DataFrame a ser analisado.
         nome (str): Nome do dataset para identificação.
+        perfil (PerfilDataset, optional): Perfil já calculado.
 
     Returns:
         str: Texto com o relatório completo do dataset.
     """
     nome = nome.lower().strip()
-    buffer = io.StringIO()
-    dataframe.info(buf=buffer)
-    info_str = buffer.getvalue()
+    perfil = perfil or perfilar(dataframe, nome)
 
     saida = f"""
-{info_str}
+{texto_estrutura(perfil)}
 {desenhar_linha("Shape")}
-{dataframe.shape}
+{perfil.shape}
 """
 
     # Resumo categórico
-    cat_cols = dataframe.select_dtypes(include=["object", "category"])
+    cat_cols = perfil.tabela_categorica()
     if not cat_cols.empty:
         saida += f"""{desenhar_linha("Resumo Categórico")}
-{cat_cols.describe().transpose()}
+{cat_cols}
 """
     else:
         saida += f"""{desenhar_linha("Resumo Categórico")}
@@ -90,17 +103,17 @@ Nenhuma coluna categórica encontrada.
 """
 
     # Resumo numérico
-    num_cols = dataframe.select_dtypes(include=["number"])
+    num_cols = perfil.tabela_numerica()
     if not num_cols.empty:
         saida += f"""{desenhar_linha("Resumo Numérico")}
-{num_cols.describe().transpose()}
+{num_cols}
 """
     else:
         saida += f"""{desenhar_linha("Resumo Numérico")}
 Nenhuma coluna numérica encontrada.
 """
 
-    saida += resumo_qualidade(dataframe)
+    saida += resumo_qualidade(dataframe, perfil)
     return saida
 
 
@@ -180,6 +193,9 @@ def conectar_banco(dataframe, tabela, if_exists="replace"):
         dataframe (pd.DataFrame): Dados a serem inseridos.
         tabela (str): Nome da tabela.
         if_exists (str, optional): Comportamento se a tabela existir ("replace", "append").
+
+    Returns:
+        bool: True se os dados foram inseridos.
     """
     engine = obter_engine()
 
@@ -188,16 +204,24 @@ def conectar_banco(dataframe, tabela, if_exists="replace"):
             print("✅ Conexão bem-sucedida")
             inserir_dados(dataframe, engine, tabela)
             print(f"✅ Dados inseridos na tabela {tabela}")
+            return True
     except Exception as e:
         print("❌ Erro ao conectar ou inserir dados no banco")
         print(type(e).__name__, str(e))
+        return False
 
 
 # ------------------ Relatório PDF ------------------ #
-def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "report/tratamento"):
+def gerar_pdf_report(
+    df: pd.DataFrame, nome: str = "Dataset", pasta: str = "report/tratamento", perfil=None
+):
     """
     Gera um relatório PDF profissional com resumo, info(), shape, gráficos e estatísticas do DataFrame.
+
+    As páginas de estrutura, nulos e estatísticas usam o perfil do dataset
+    (calculado aqui numa única passada, se não for informado).
     """
+    perfil = perfil or perfilar(df, nome)
     # === Metadados do relatório ===
     autor = os.getlogin()
     maquina = platform.node()
@@ -228,12 +252,10 @@ def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "repo
         pagina += 1
 
         # === Página 2: Shape e Info ===
-        buffer = io.StringIO()
-        df.info(buf=buffer)
-        info_text = buffer.getvalue()
+        info_text = texto_estrutura(perfil)
         fig, ax = plt.subplots(figsize=(8, 10))
         ax.axis("off")
-        ax.text(0, 1, f"=== Estrutura do DataFrame ===\n\nShape: {df.shape}\n\n{info_text}",
+        ax.text(0, 1, f"=== Estrutura do DataFrame ===\n\nShape: {perfil.shape}\n\n{info_text}",
                 fontsize=9, family="monospace", verticalalignment="top")
         adicionar_rodape(fig, pagina, total_paginas)
         pdf.savefig()
@@ -242,7 +264,7 @@ def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "repo
 
         # === Página 3: Resumo Geral com gráfico de nulos ===
         fig, ax = plt.subplots(figsize=(8, 6))
-        nulos = df.isnull().sum()
+        nulos = perfil.nulos()
         nulos = nulos[nulos > 0].sort_values()
         if not nulos.empty:
             sns.barplot(x=nulos.values, y=nulos.index, palette="Reds_r", ax=ax)
@@ -257,11 +279,11 @@ def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "repo
         pagina += 1
 
         # === Página 4: Estatísticas Numéricas ===
-        num_cols = df.select_dtypes(include=["number"])
-        if not num_cols.empty:
+        num_cols = [c.nome for c in perfil.colunas if c.numerica and c.nao_nulos]
+        if num_cols:
             fig, ax = plt.subplots(figsize=(8.27, 11.69))
             ax.axis("off")
-            ax.text(0, 1, f"=== Estatísticas Numéricas ===\n\n{num_cols.describe().transpose()}",
+            ax.text(0, 1, f"=== Estatísticas Numéricas ===\n\n{perfil.tabela_numerica()}",
                     verticalalignment="top", fontsize=9, family="monospace")
             adicionar_rodape(fig, pagina, total_paginas)
             pdf.savefig()
@@ -269,11 +291,11 @@ def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "repo
             pagina += 1
 
         # === Página 5: Estatísticas Categóricas ===
-        cat_cols = df.select_dtypes(include=["object", "category"])
+        cat_cols = perfil.tabela_categorica()
         if not cat_cols.empty:
             fig, ax = plt.subplots(figsize=(8.27, 11.69))
             ax.axis("off")
-            ax.text(0, 1, f"=== Estatísticas Categóricas ===\n\n{cat_cols.describe().transpose()}",
+            ax.text(0, 1, f"=== Estatísticas Categóricas ===\n\n{cat_cols}",
                     verticalalignment="top", fontsize=9, family="monospace")
             adicionar_rodape(fig, pagina, total_paginas)
             pdf.savefig()
@@ -281,10 +303,20 @@ def gerar_pdf_report(df: pd.DataFrame, nome: str = "Dataset", pasta: str = "repo
             pagina += 1
 
         # === Página 6: Distribuição de algumas colunas numéricas (opcional) ===
-        if not num_cols.empty:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            num_cols.hist(ax=ax, bins=15, color="#3498DB", edgecolor="black")
-            ax.set_title("Distribuição das Colunas Numéricas", fontsize=14, fontweight="bold")
+        # Histogramas do perfil (frequências exatas ou amostra): o custo não
+        # depende do tamanho do dataset
+        if num_cols:
+            n_linhas = -(-len(num_cols) // 3)
+            fig, eixos = plt.subplots(n_linhas, 3, figsize=(8, 2.2 * n_linhas + 1.5), squeeze=False)
+            for ax, coluna in zip(eixos.flat, num_cols):
+                contagens, bordas, exato = perfil.histograma(coluna, bins=15)
+                ax.stairs(contagens, bordas, fill=True, color="#3498DB", edgecolor="black")
+                ax.set_title(coluna if exato else f"{coluna} (amostra)", fontsize=9)
+                ax.tick_params(labelsize=7)
+            for ax in list(eixos.flat)[len(num_cols):]:
+                ax.axis("off")
+            fig.suptitle("Distribuição das Colunas Numéricas", fontsize=14, fontweight="bold")
+            fig.tight_layout(rect=(0, 0.04, 1, 0.96))
             adicionar_rodape(fig, pagina, total_paginas)
             pdf.savefig()
             plt.close()
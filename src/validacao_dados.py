@@ -0,0 +1,191 @@
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.analisar_dados_banco import COLUNAS_ATRIBUTOS
+from src.tratamento_dados import desenhar_linha
+
+# Pasta dos arquivos de quarentena (linhas reprovadas, uma por tabela)
+PASTA_QUARENTENA = os.path.join(os.getenv("OUT_DIR", "out"), "quarentena")
+
+# Faixa válida dos atributos de batalha
+ATRIBUTO_MINIMO = 1
+ATRIBUTO_MAXIMO = 255
+
+
+@dataclass(frozen=True)
+class Regra:
+    """
+    Regra de validação declarativa.
+
+    'verificar' recebe o DataFrame inteiro e as tabelas de referência e devolve
+    uma máscara booleana (True = linha válida), calculada sobre colunas inteiras.
+    """
+
+    nome: str
+    descricao: str
+    verificar: object
+
+
+# ------------------ Construtores de regras ------------------ #
+
+
+def nao_nulo(*colunas) -> Regra:
+    return Regra(
+        f"nao_nulo({', '.join(colunas)})",
+        f"{', '.join(colunas)} preenchido(s)",
+        lambda df, refs: df[list(colunas)].notna().all(axis=1).to_numpy(),
+    )
+
+
+def unico(coluna: str) -> Regra:
+    return Regra(
+        f"unico({coluna})",
+        f"{coluna} sem repetição (mantém a primeira ocorrência)",
+        lambda df, refs: ~df[coluna].duplicated(keep="first").to_numpy(),
+    )
+
+
+def no_intervalo(colunas, minimo, maximo) -> Regra:
+    """Valores numéricos em [minimo, maximo]; nulos são tolerados."""
+
+    def verificar(df, refs):
+        valores = df[list(colunas)].apply(pd.to_numeric, errors="coerce").to_numpy(float)
+        with np.errstate(invalid="ignore"):
+            fora = (valores < minimo) | (valores > maximo)
+        return ~fora.any(axis=1)
+
+    return Regra(
+        f"intervalo({minimo}-{maximo})",
+        f"{', '.join(colunas)} entre {minimo} e {maximo}",
+        verificar,
+    )
+
+
+def existe_em(coluna: str, tabela_ref: str, coluna_ref: str = "ID") -> Regra:
+    """Chave estrangeira: o valor precisa existir em referencias[tabela_ref]."""
+
+    def verificar(df, refs):
+        referencia = refs.get(tabela_ref)
+        if referencia is None:
+            return np.ones(len(df), dtype=bool)
+        return df[coluna].isin(referencia[coluna_ref]).to_numpy()
+
+    return Regra(
+        f"{coluna}_em_{tabela_ref}",
+        f"{coluna} existe em {tabela_ref}.{coluna_ref}",
+        verificar,
+    )
+
+
+def condicao(nome: str, descricao: str, expressao: str) -> Regra:
+    """Regra escrita como expressão do DataFrame.eval (vetorizada)."""
+    return Regra(
+        nome, descricao, lambda df, refs: df.eval(expressao).to_numpy(dtype=bool)
+    )
+
+
+# ------------------ Regras por tabela ------------------ #
+
+REGRAS = {
+    "pokemons": [
+        nao_nulo("ID", "Nome"),
+        unico("ID"),
+    ],
+    "atributos_pokemon": [
+        nao_nulo("ID", "Nome"),
+        unico("ID"),
+        existe_em("ID", "pokemons"),
+        no_intervalo(COLUNAS_ATRIBUTOS, ATRIBUTO_MINIMO, ATRIBUTO_MAXIMO),
+    ],
+    "combates": [
+        nao_nulo("first_pokemon", "second_pokemon", "winner"),
+        condicao(
+            "winner_participante",
+            "winner é first_pokemon ou second_pokemon",
+            "winner == first_pokemon or winner == second_pokemon",
+        ),
+        condicao(
+            "combatentes_distintos",
+            "first_pokemon diferente de second_pokemon",
+            "first_pokemon != second_pokemon",
+        ),
+        existe_em("first_pokemon", "pokemons"),
+        existe_em("second_pokemon", "pokemons"),
+    ],
+}
+
+
+# ------------------ Execução ------------------ #
+
+
+def aplicar_regras(df: pd.DataFrame, regras, referencias=None):
+    """
+    Avalia todas as regras sobre o DataFrame numa única matriz booleana.
+
+    Returns:
+        tuple[np.ndarray, pd.DataFrame]: Máscara de linhas válidas e contagem de
+        violações por regra (Regra, Descricao, Violacoes).
+    """
+    referencias = referencias or {}
+    matriz = np.ones((len(df), len(regras)), dtype=bool)
+    for j, regra in enumerate(regras):
+        matriz[:, j] = regra.verificar(df, referencias)
+
+    contagens = pd.DataFrame(
+        {
+            "Regra": [r.nome for r in regras],
+            "Descricao": [r.descricao for r in regras],
+            "Violacoes": (~matriz).sum(axis=0),
+        }
+    )
+    return matriz, contagens
+
+
+def validar_dados(
+    df: pd.DataFrame,
+    tabela: str,
+    referencias: dict = None,
+    pasta_quarentena: str = PASTA_QUARENTENA,
+) -> pd.DataFrame:
+    """
+    Valida um dataset com as regras de REGRAS[tabela], separa as linhas
+    reprovadas em '<pasta_quarentena>/<tabela>.csv' e imprime o resumo.
+
+    Args:
+        df (pd.DataFrame): Dados lidos dos CSVs.
+        tabela (str): Nome da tabela (chave de REGRAS).
+        referencias (dict, optional): {tabela: DataFrame} usadas nas chaves
+            estrangeiras (ex.: {"pokemons": df_pokemons}).
+
+    Returns:
+        pd.DataFrame: Apenas as linhas válidas.
+    """
+    regras = REGRAS.get(tabela, [])
+    matriz, contagens = aplicar_regras(df, regras, referencias)
+    validas = matriz.all(axis=1)
+
+    df_quarentena = df[~validas].copy()
+    arquivo = os.path.join(pasta_quarentena, f"{tabela}.csv")
+    if not df_quarentena.empty:
+        nomes = np.array([r.nome for r in regras])
+        df_quarentena["regras_violadas"] = [
+            ";".join(nomes[~linha]) for linha in matriz[~validas]
+        ]
+        os.makedirs(pasta_quarentena, exist_ok=True)
+        df_quarentena.to_csv(arquivo, index=False, encoding="utf-8")
+    elif os.path.exists(arquivo):
+        os.remove(arquivo)  # quarentena de uma execução anterior
+
+    print(desenhar_linha(f"Validação de Dados — {tabela}"))
+    print(contagens.to_string(index=False))
+    print(f"Registros analisados: {len(df)}")
+    print(f"Registros válidos: {int(validas.sum())}")
+    print(f"Registros em quarentena: {len(df_quarentena)}")
+    if not df_quarentena.empty:
+        print(f"Arquivo de quarentena: {arquivo}")
+    print(desenhar_linha())
+
+    return df[validas]